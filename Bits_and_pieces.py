@@ -18,6 +18,28 @@ def convert_to_text(pos):
 def print_move(move):
     print(convert_to_text(move[0]) + convert_to_text(move[1]))
 
+'''
+Converts a move from the list of 2 bitboards and a flag used by the python code (detailed in play_game) to the 32 bit integer used by the c code.
+The bits hold, from the lowest: 6 for the square moved from, 6 for the square moved to, then the flag.
+The move [0, 0, 0] (no move) is converted to 0.
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+def pack_move(move):
+    if move[0] == 0:
+        return 0
+    return (move[0].bit_length() - 1) | ((move[1].bit_length() - 1) << 6) | (move[2] << 12)
+
+'''
+Converts a move from the 32 bit integer used by the c code back to the list of 2 bitboards and a flag used by the python code.
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+def unpack_move(move):
+    if move == 0:
+        return [0, 0, 0]
+    return [1 << (move & 63), 1 << ((move >> 6) & 63), move >> 12]
+
 
 # takes in the board part of the fen and returns the bitboard for a specific piece type
 def get_bitboard_from_fen(fen, piece):
@@ -105,6 +127,7 @@ Last Modified by: Arkleseisure
 def convert_text_to_bitboard_move(move, game):
     # first two bitboards detail the locations that the piece moves from and to.
     new_move = [get_bitboard_from_square(move[:2]), get_bitboard_from_square(move[2:4])]
+    last_move = unpack_move(game.last_move)
     flag = 0
     piece_captured = False
     for i in range(len(game.piece_list)):
@@ -141,11 +164,11 @@ def convert_text_to_bitboard_move(move, game):
                         flag += 3
                 # en passant
                 # first checks whether the previous move was a pawn move
-                elif (game.last_move[1] & (game.board[0] | game.board[6])) != 0:
+                elif (last_move[1] & (game.board[0] | game.board[6])) != 0:
                     # then checks whether the move ends up immediately behind the previous pawn move, only possible in en-passant
-                    if (game.last_move[1] << 8 == new_move[1]) and game.to_play == 0:
+                    if (last_move[1] << 8 == new_move[1]) and game.to_play == 0:
                         flag += 5
-                    elif (game.last_move[1] >> 8 == new_move[1]) and game.to_play == 1:
+                    elif (last_move[1] >> 8 == new_move[1]) and game.to_play == 1:
                         flag += 5
         elif (game.piece_list[i].loc & new_move[1]) != 0:
             piece_captured = True
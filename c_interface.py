@@ -1,18 +1,57 @@
-from ctypes import CDLL, c_ulonglong, c_int, c_char, Structure, c_bool, c_double, c_float
+from ctypes import CDLL, c_ulonglong, c_uint, c_int, c_char, Structure, c_bool, c_double, c_float
 import sys
 import os
 import random
 import time
 import math
-from Bits_and_pieces import get_bitboard_from_fen, convert_to_text, print_move, print_board, convert_text_to_bitboard_move
+from Bits_and_pieces import get_bitboard_from_fen, convert_to_text, print_move, print_board, convert_text_to_bitboard_move, pack_move, unpack_move
 
 # imports the c libraries
 game_mech_lib_path = os.path.dirname(os.path.abspath(__file__)) + "\\theories\game_mechanics_v1_%s.so" % (sys.platform)
 print(game_mech_lib_path)
 game_mech = CDLL(game_mech_lib_path)
 game_mech.confirm_it_works()
-engine_lib_path =  os.path.dirname(os.path.abspath(__file__)) + "\\theories/engine_v13_%s.so" % (sys.platform)
-engine = CDLL(engine_lib_path)
+engine_lib_path =  os.path.dirname(os.path.abspath(__file__)) + "\\theories/engine_v16_%s.so" % (sys.platform)
+
+
+'''
+Loads the library of an engine. Engines from v16 on use the same Game struct and packed 32 bit moves as this file, while the older ones
+use the Game struct and 3 word moves of game_mechanics_v0.c, so the functions below check the version of the engine they are given
+and talk to the older ones through the legacy path (see LegacyGame and get_legacy_engine_move).
+INPUTS:
+lib_path: path of the compiled engine
+
+OUTPUTS:
+engine_code: CDLL of the engine
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+def load_engine(lib_path):
+	return CDLL(lib_path)
+
+'''
+Gets the version of an engine. Engines before v16 have no get_engine_version function, so they are found by its absence and given version 0.
+INPUTS:
+engine_code: CDLL of the engine
+
+OUTPUTS:
+version: version number of the engine, 0 for the engines before v16
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+FIRST_PACKED_ENGINE_VERSION = 16
+def get_engine_version(engine_code):
+	try:
+		return int(engine_code.get_engine_version())
+	except AttributeError:
+		return 0
+
+def is_legacy_engine(engine_code):
+	return get_engine_version(engine_code) < FIRST_PACKED_ENGINE_VERSION
+
+engine = load_engine(engine_lib_path)
 engine.check_it_works()
 
 '''
@@ -35,37 +74,107 @@ class Piece(Structure):
 		return ('captured ' if self.captured else '') + colour + types[self.type % 6] + ' on ' + location
 
 
+'''
+The equivalent to the Undo structure in the game_mechanics file, holding what is needed to unmake a move.
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+class Undo(Structure):
+	_fields_ = [('move', c_uint), ('captured', c_int), ('castling', c_int), ('ply_counter', c_int), ('last_move', c_uint),
+			 ('value', c_float), ('current_np_material', c_float), ('material_key', c_ulonglong)]
+
+
 '''
 The equivalent to the Game structure in the game_mechanics file, but in python
-Last Modified: 19/9/21
+The last move is held as the 32 bit move used by the c code, and can be converted with unpack_move.
+The hash history and undo stack are ring buffers of HISTORY_SIZE entries, indexed by history_length.
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 '''
+HISTORY_SIZE = 1024
 class Game(Structure):
-	_fields_ = [('piece_list', (Piece * 32)), ('board', (c_ulonglong * 12)), ('hash', c_ulonglong), ('past_hash_list', (c_ulonglong * 100)), ('last_move', (c_ulonglong * 3)), 
-			 ('to_play', c_int), ('ply_counter', c_int), ('castling', c_int), ('value', c_float), ('current_np_material', c_float), ('num_pawns', (c_int * 2))]
+	_fields_ = [('piece_list', (Piece * 32)), ('board', (c_ulonglong * 12)), ('hash', c_ulonglong), ('material_key', c_ulonglong), ('past_hash_list', (c_ulonglong * HISTORY_SIZE)), ('last_move', c_uint), 
+			 ('to_play', c_int), ('ply_counter', c_int), ('castling', c_int), ('value', c_float), ('current_np_material', c_float),
+			 ('history_length', c_int), ('undo_stack', (Undo * HISTORY_SIZE))]
+
+
+'''
+The equivalent to the Game structure in game_mechanics_v0.c, used by the engines before v16 (see get_legacy_engine_move).
+The hash history only goes back to the last irreversible move, with past_hash_list[ply_counter] holding the hash of the current position,
+and the last move is held as 2 bitboards and a flag, like the moves in python.
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+class LegacyGame(Structure):
+	_fields_ = [('piece_list', (Piece * 32)), ('board', (c_ulonglong * 12)), ('hash', c_ulonglong), ('past_hash_list', (c_ulonglong * 100)), 
+			 ('last_move', (c_ulonglong * 3)), ('to_play', c_int), ('ply_counter', c_int), ('castling', c_int), ('value', c_float), 
+			 ('current_np_material', c_float)]
+
+
+'''
+Converts a Game struct into the LegacyGame struct used by the engines before v16.
+The hashes since the last irreversible move are taken from the end of the ring buffer, and any from before the position the game was set up with
+are left as 0, as they aren't known.
+INPUTS:
+game: Game struct, holding all variables relating to that point in the game.
+
+OUTPUTS:
+legacy_game: LegacyGame struct holding the same position
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+def to_legacy_game(game):
+	legacy_game = LegacyGame()
+	legacy_game.piece_list = game.piece_list
+	legacy_game.board = game.board
+	legacy_game.hash = game.hash
+	legacy_game.last_move = (c_ulonglong * 3)(*unpack_move(game.last_move))
+	legacy_game.to_play = game.to_play
+	legacy_game.ply_counter = game.ply_counter
+	legacy_game.castling = game.castling
+	legacy_game.value = game.value
+	legacy_game.current_np_material = game.current_np_material
+
+	# the game is drawn by the 50 move rule once the ply_counter reaches 100, so the list only has room for the hashes up to then
+	for i in range(min(game.ply_counter, game.history_length) + 1):
+		if game.ply_counter - i < 100:
+			legacy_game.past_hash_list[game.ply_counter - i] = game.past_hash_list[(game.history_length - i) % HISTORY_SIZE]
+	return legacy_game
+
+
+'''
+The equivalent to the SearchStats structure in the engine, holding statistics about one depth of the search (see get_search_stats).
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+MAX_SEARCH_STATS = 64
+class SearchStats(Structure):
+	_fields_ = [('depth', c_int), ('value', c_float), ('completed', c_bool), ('time', c_double), ('nodes', c_ulonglong), ('quiescence_nodes', c_ulonglong),
+			 ('hash_probes', c_ulonglong), ('hash_hits', c_ulonglong), ('hash_cutoffs', c_ulonglong), ('beta_cutoffs', c_ulonglong), 
+			 ('first_move_cutoffs', c_ulonglong)]
 
 
 '''
-Interface for the apply function
+Interface for the make function (applies a move)
 INPUTS:
 game: Game struct, holding all variables relating to that point in the game.
 move = 2 bitboards, one for the square being left and one for the square being landed on, 
-	also a 7 bit flag containing extra info about the position
+	also a 7 bit flag containing extra info about the position. This is packed into 32 bits before being passed to the c code.
 zobrist_numbers: list holding all the zobrist numbers used to calculate the zobrist hash for the next position. 
 
 OUTPUTS:
 new game struct with updated values.
 
-Last Modified: 17/9/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 '''
 def apply(game, move, zobrist_numbers):
 	# casts the python variables into the equivalent types in c
 	c_zobrist_numbers = (c_ulonglong * 793)(*zobrist_numbers)
-	c_removed_hash = (c_ulonglong * 1)()
-	c_move = (c_ulonglong * 3)(*move)
+	c_move = c_uint(pack_move(move))
 	c_game = (Game * 1)(*[game])
-	piece_taken = game_mech.apply(c_game, c_move, c_zobrist_numbers, c_removed_hash)
+	piece_taken = game_mech.make(c_game, c_move, c_zobrist_numbers)
 
 	return c_game[0]
 	
@@ -76,35 +185,45 @@ INPUTS:
 game: Game struct, holding all variables relating to that point in the game.
 
 OUTPUTS:
-legal_moves list containing all the legal moves in the position as c arrays of 2 bitboards and a flag (documented in play_game)
+legal_moves list containing all the legal moves in the position as lists of 2 bitboards and a flag (documented in play_game),
+	unpacked from the 32 bit moves used by the c code.
 
-Last Modified: 16/9/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 '''
 def legal_moves(game):
 	# I think the maximum possible number of legal moves from a single position is about this
 	# (https://lichess.org/analysis/fromPosition/R6R/3Q4/1Q4Q1/4Q3/2Q4Q/Q4Q2/pp1Q4/kBNN1KB1_w_-_-)
-	c_legal_moves = ((c_ulonglong * 3) * 220)()
+	c_legal_moves = (c_uint * 220)()
 	c_game = (Game * 1)(*[game])
 
 	num_moves = game_mech.legal_moves(c_game, c_legal_moves)
-	return c_legal_moves[:num_moves]
+	return [unpack_move(move) for move in c_legal_moves[:num_moves]]
 
 '''
 Gets the move from the ai, given the position
 INPUTS:
 game: Game struct, holding all variables relating to that point in the game.
 zobrist_numbers: list holding all the zobrist numbers used to calculate the zobrist hash for the next position. 
-time_allowed: float holding the amount of time the engine has to choose its move.
+time_allowed: float holding the amount of time the engine has to choose its move (0 for no time limit).
+threads: number of threads the engine searches with.
+max_depth, max_nodes: depth and number of nodes at which the search stops (None for no limit).
+	The search stops at the first limit it reaches, so for a fixed depth or number of nodes, time_allowed should be 0: with 1 thread and the
+	same hash size, the search then gives exactly the same results on any machine, which makes comparisons between engines reproducible.
+	Engines before v16 have no limits other than time, and threads is ignored for them.
+stats: list to which the statistics for each depth searched are added (see get_search_stats), or None to not get them.
+	Nothing is added if the engine didn't search (book moves and positions with one legal move) or is from before v16.
 
 OUTPUTS:
 move: move it thinks is the best in the position
 current_value: evaluation of the current position
+depth: depth reached by the search
+nodes: number of nodes searched, added up over all the threads
 
-Last Modified: 17/9/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 '''
-def get_engine_move(game, zobrist_numbers, time_allowed, book, engine_code=engine, value_output='int'):
+def get_engine_move(game, zobrist_numbers, time_allowed, book, engine_code=engine, value_output='int', threads=1, stats=None, max_depth=None, max_nodes=None):
 	c_game = (Game * 1)(*[game])
 	c_zobrist_numbers = (c_ulonglong * 793)(*zobrist_numbers)
 	depth = 1
@@ -139,7 +258,16 @@ def get_engine_move(game, zobrist_numbers, time_allowed, book, engine_code=engin
 		for move in moves:
 			if (move[0] == book_move[0] and move[1] == book_move[1] and move[2] == book_move[2]):
 				return 0.01, 0, 0, move
-	value = engine_code.get_engine_move(c_game, c_zobrist_numbers, move_number, c_time_allowed, c_value, c_depth, c_nodes)
+	if is_legacy_engine(engine_code):
+		if max_depth is not None or max_nodes is not None:
+			raise ValueError('engines from before v%d can only search for a fixed time, not to a fixed depth or number of nodes' % FIRST_PACKED_ENGINE_VERSION)
+		return get_legacy_engine_move(game, c_zobrist_numbers, c_time_allowed, engine_code, moves)
+
+	# the limits are set before every search, so that the ones from an earlier search are never kept by mistake
+	engine_code.set_search_limits(c_int(0 if max_depth is None else max_depth), c_ulonglong(0 if max_nodes is None else max_nodes))
+	value = engine_code.get_engine_move(c_game, c_zobrist_numbers, move_number, c_time_allowed, c_value, c_depth, c_nodes, c_int(threads))
+	if stats is not None:
+		stats += get_search_stats(engine_code)
 	try:
 		move = moves[int(move_number[0])]
 	except IndexError:
@@ -151,14 +279,235 @@ def get_engine_move(game, zobrist_numbers, time_allowed, book, engine_code=engin
 		print('Move given was index:')
 		print(int(move_number[0]))
 		move = moves[0]
+	return float(c_value[0]), int(c_depth[0]), int(c_nodes[0]), move
+
+'''
+Gets the move from an engine from before v16 (see get_engine_move), which takes the LegacyGame struct and gives the index of its move in
+its own list of legal moves, with the moves held as 3 words. This list comes from the legal_moves function in the engine's copy of
+game_mechanics_v0.c, and isn't in the same order as the one from legal_moves, so the move is found by comparing it to the moves in that list.
+INPUTS:
+game: Game struct, holding all variables relating to that point in the game.
+c_zobrist_numbers: zobrist numbers, already cast into c.
+c_time_allowed: time the engine has to choose its move, already cast into c.
+engine_code: CDLL of the engine
+moves: legal moves in the position, from legal_moves
+
+OUTPUTS:
+the same as get_engine_move: current_value, depth, nodes and move.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+def get_legacy_engine_move(game, c_zobrist_numbers, c_time_allowed, engine_code, moves):
+	c_game = (LegacyGame * 1)(*[to_legacy_game(game)])
+	move_number = (c_int * 1)()
+	c_value = (c_float * 1)(*[0])
+	c_depth = (c_int * 1)(*[1])
+	c_nodes = (c_ulonglong * 1)(*[0])
+	engine_code.get_engine_move(c_game, c_zobrist_numbers, move_number, c_time_allowed, c_value, c_depth, c_nodes)
+
+	c_legacy_moves = ((c_ulonglong * 3) * 220)()
+	num_moves = engine_code.legal_moves((LegacyGame * 1)(*[to_legacy_game(game)]), c_legacy_moves)
+	move = moves[0]
+	if 0 <= int(move_number[0]) < num_moves:
+		legacy_move = list(c_legacy_moves[int(move_number[0])])
+		for legal_move in moves:
+			if legal_move == legacy_move:
+				move = legal_move
+				break
+		else:
+			print('Engine move not found in the legal moves:', legacy_move)
+	else:
+		print('Index Error')
+		print('Move given was index:')
+		print(int(move_number[0]))
+	# the engines before v16 give the depth with 2 added on
 	return float(c_value[0]), int(c_depth[0]) - 2, int(c_nodes[0]), move
 
+'''
+Tells the engine that a new game is starting, clearing its transposition table so that nothing from the previous game is used.
+The transposition table is kept between moves, so this must be called before each game.
+INPUTS:
+engine_code: CDLL of the engine which is about to play the game. Engines before v16 clear their tables themselves, so nothing is done for them.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+def new_game(engine_code=engine):
+	if is_legacy_engine(engine_code):
+		return
+	engine_code.clear_hash_table()
+
+'''
+Sets the size of the engine's transposition table in MB. The number of buckets in the table is a power of 2, so the size is rounded down to the
+nearest power of 2 (e.g 100 MB gives a 64 MB table). Setting the size clears the table, so it should be done before the game starts.
+INPUTS:
+size_mb: size of the table in MB
+engine_code: CDLL of the engine whose table is to be resized.
+
+OUTPUTS:
+size of the table actually allocated in MB (smaller if the memory couldn't be found, 0 if there was none at all, or if the engine is from
+	before v16, whose table can't be resized).
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+def set_hash_size(size_mb, engine_code=engine):
+	if is_legacy_engine(engine_code):
+		return 0
+	return int(engine_code.set_hash_size(c_int(size_mb)))
+
+'''
+Starts the engine pondering: searching in the background, while the opponent thinks about their move, the position after the reply it expects.
+This returns straight away, and the search carries on until ponder_hit or stop_pondering is called (or get_engine_move, which stops it).
+INPUTS:
+game: position after the engine's move, with the opponent to play.
+zobrist_numbers: list holding all the zobrist numbers used to calculate the zobrist hash for the next position.
+engine_code: CDLL of the engine which is to ponder.
+threads: number of threads the engine searches with.
+
+OUTPUTS:
+ponder_move: the reply the engine expects, or None if it isn't pondering (because it doesn't expect a reply, or is from before v16 and can't ponder).
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+def start_pondering(game, zobrist_numbers, engine_code=engine, threads=1):
+	if is_legacy_engine(engine_code):
+		return None
+	c_game = (Game * 1)(*[game])
+	c_zobrist_numbers = (c_ulonglong * 793)(*zobrist_numbers)
+
+	reply = int(engine_code.start_pondering(c_game, c_zobrist_numbers, c_int(threads)))
+	if reply < 0:
+		return None
+	return legal_moves(game)[reply]
+
+'''
+Tells the engine that the opponent has played the move it was pondering on, so that it carries on with its search for time_allowed more seconds
+on top of the time it has already spent pondering.
+INPUTS:
+game: position after the opponent's move, which the engine has been searching.
+time_allowed: float holding the amount of time the engine has left to choose its move.
+engine_code: CDLL of the engine which is pondering.
+stats: list to which the statistics for each depth searched are added (see get_search_stats), or None to not get them.
+
+OUTPUTS:
+None if the engine wasn't pondering, otherwise the same as get_engine_move: current_value, depth, nodes and move.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+def ponder_hit(game, time_allowed, engine_code=engine, stats=None):
+	if is_legacy_engine(engine_code):
+		return None
+	move_number = (c_int * 1)()
+	c_value = (c_float * 1)(*[0])
+	c_depth = (c_int * 1)(*[1])
+	c_nodes = (c_ulonglong * 1)(*[0])
+
+	if not engine_code.ponder_hit(c_double(time_allowed), move_number, c_value, c_depth, c_nodes):
+		return None
+	if stats is not None:
+		stats += get_search_stats(engine_code)
+	return float(c_value[0]), int(c_depth[0]), int(c_nodes[0]), legal_moves(game)[int(move_number[0])]
+
+'''
+Stops the engine pondering (e.g because the opponent didn't play the move it expected). The transposition table keeps the positions it searched.
+INPUTS:
+engine_code: CDLL of the engine which is pondering.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+def stop_pondering(engine_code=engine):
+	if is_legacy_engine(engine_code):
+		return
+	engine_code.stop_pondering()
+
+'''
+Gets the statistics for each depth searched by the last search of the engine's main thread, which show how well the search is working
+beyond its strength: how much each depth costs, how useful the transposition table is, how good the move ordering is, and so on.
+INPUTS:
+engine_code: CDLL of the engine which has searched.
+
+OUTPUTS:
+stats: list with a dictionary for each depth searched, holding the depth, value (+ good for white), whether it was completed, the time taken 
+	and the numbers of nodes, quiescence nodes, hash probes, hash hits, hash cutoffs, beta cutoffs and first move cutoffs (see SearchStats in the engine).
+	It also holds the rates worked out from these: the branching factor (nodes searched compared to the depth before, or None for the 
+	first depth), hash hit rate, first move cutoff rate and quiescence share (the fraction of the nodes which were quiescence nodes).
+	The list is empty for engines before v16, which don't keep statistics.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+def get_search_stats(engine_code=engine):
+	if is_legacy_engine(engine_code):
+		return []
+	c_stats = (SearchStats * MAX_SEARCH_STATS)()
+	num_stats = int(engine_code.get_search_stats(c_stats, c_int(MAX_SEARCH_STATS)))
+
+	stats = []
+	for i in range(num_stats):
+		depth_stats = {'depth': c_stats[i].depth, 'value': c_stats[i].value, 'completed': c_stats[i].completed, 'time': c_stats[i].time, 
+				 'nodes': c_stats[i].nodes, 'quiescence nodes': c_stats[i].quiescence_nodes, 'hash probes': c_stats[i].hash_probes, 
+				 'hash hits': c_stats[i].hash_hits, 'hash cutoffs': c_stats[i].hash_cutoffs, 'beta cutoffs': c_stats[i].beta_cutoffs, 
+				 'first move cutoffs': c_stats[i].first_move_cutoffs}
+		depth_stats['branching factor'] = depth_stats['nodes'] / stats[-1]['nodes'] if i > 0 and stats[-1]['nodes'] > 0 else None
+		depth_stats['hash hit rate'] = depth_stats['hash hits'] / depth_stats['hash probes'] if depth_stats['hash probes'] > 0 else 0
+		depth_stats['first move cutoff rate'] = depth_stats['first move cutoffs'] / depth_stats['beta cutoffs'] if depth_stats['beta cutoffs'] > 0 else 0
+		depth_stats['quiescence share'] = depth_stats['quiescence nodes'] / depth_stats['nodes'] if depth_stats['nodes'] > 0 else 0
+		stats.append(depth_stats)
+	return stats
+
+'''
+MultiPV analysis: gets the best num_pv moves in the position, with their values and principal variations, which is used to analyse positions
+and to build opening suites. For each depth, the engine searches the position once per line, skipping the moves it has already found at the
+root, with the searches sharing the transposition table so that the later ones are much quicker than the first.
+INPUTS:
+game: Game struct, holding all variables relating to that point in the game.
+zobrist_numbers: list holding all the zobrist numbers used to calculate the zobrist hash for the next position.
+num_pv: number of lines to get (fewer are returned if there are fewer legal moves).
+time_allowed: float holding the amount of time the engine has for the whole analysis (0 for no time limit, in which case max_depth or max_nodes must be given).
+engine_code: CDLL of the engine doing the analysis.
+max_depth, max_nodes: depth and number of nodes at which the search stops (None for no limit), as in get_engine_move.
+
+OUTPUTS:
+lines: list of (move, value, pv) for each line, best first, where value is the value of the line (+ good for white) and pv is the list of moves
+	in the principal variation, starting with move. The principal variations come from the transposition table, so they can be shorter than the depth.
+	The list is empty if no depth was completed, or if the engine is from before v16, which can't do MultiPV analysis.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+MAX_PV_LENGTH = 32
+def get_multi_pv(game, zobrist_numbers, num_pv, time_allowed, engine_code=engine, max_depth=None, max_nodes=None):
+	if is_legacy_engine(engine_code):
+		return []
+	c_game = (Game * 1)(*[game])
+	c_zobrist_numbers = (c_ulonglong * 793)(*zobrist_numbers)
+	c_moves = (c_uint * num_pv)()
+	c_values = (c_float * num_pv)()
+	c_pvs = (c_uint * (num_pv * MAX_PV_LENGTH))()
+	c_pv_lengths = (c_int * num_pv)()
+	c_depth = (c_int * 1)(*[0])
+	c_nodes = (c_ulonglong * 1)(*[0])
+
+	engine_code.set_search_limits(c_int(0 if max_depth is None else max_depth), c_ulonglong(0 if max_nodes is None else max_nodes))
+	num_lines = int(engine_code.get_multi_pv(c_game, c_zobrist_numbers, c_int(num_pv), c_double(time_allowed), c_moves, c_values, c_pvs, c_pv_lengths, c_depth, c_nodes))
+
+	lines = []
+	for i in range(num_lines):
+		pv = [unpack_move(move) for move in c_pvs[i * MAX_PV_LENGTH:i * MAX_PV_LENGTH + c_pv_lengths[i]]]
+		lines.append((unpack_move(c_moves[i]), float(c_values[i]), pv))
+	return lines
+
 '''
 Generates pseudorandom numbers used for zobrist hashes (an efficient way to hash a board position), 
 as well as the hash of the initial position and the list of past hashes, with the initial position included
 More info on Zobrist Hashing here: https://www.chessprogramming.org/Zobrist_Hashing
 
-Last Modified: 19/8/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 '''
 def generate_zobrist_stuff(game):
@@ -191,12 +540,13 @@ def generate_zobrist_stuff(game):
 
 	# adds en-passant
 	# checks if the last move was a double pawn move
-	if game.last_move[-1] ^ 15 == 1:
-		last_move_file = game_mech.file(game.last_move[1])
+	last_move = unpack_move(game.last_move)
+	if (last_move[2] & 15) == 1:
+		last_move_file = (last_move[1].bit_length() - 1) % 8
 		
 		# checks if there is a pawn on the squares next to the last move played
-		if ((game.last_move[1] >> 1) & game.board[6 * game.to_play] != 0 and last_move_file > 0) or \
-			((game.last_move[1] << 1) & game.board[6 * game.to_play] != 0 and last_move_file < 7):
+		if (((last_move[1] >> 1) & game.board[6 * game.to_play]) != 0 and last_move_file > 0) or \
+			(((last_move[1] << 1) & game.board[6 * game.to_play]) != 0 and last_move_file < 7):
 			game.hash ^= zobrist_numbers[64 * 12 + 16 + last_move_file]
 
 	# adds person to move
@@ -238,51 +588,69 @@ def get_board(game, board_fen):
                 black_pawns, black_knights, black_bishops, black_rooks, black_queens, black_king])
 
 
+'''
+Sets the material key of the game (the number of each type of piece held by each player, see calculate_material_key in game_mechanics).
+This must be called whenever the board is set up, after which the c code keeps it up to date.
+INPUTS:
+game: Game struct holding information about the game. As this is mutable, it is changed but doesn't need to be returned.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+def get_material_key(game):
+	game_mech.calculate_material_key.restype = c_ulonglong
+	game.material_key = game_mech.calculate_material_key(game.board)
+
+
 '''
 Initiates the piece list, an array containing a struct for each piece
+The first 16 pieces are white's and the last 16 black's. For each player, the game mechanics rely on the pawns being in the first 8 places 
+(to find pawns taken en passant), the rooks on a1 and h1 (a8 and h8 for black) being 13th and 14th as this is used for quick location of the 
+rooks when castling, and the king being 16th. The other pieces fill up the remaining places in order of value.
 INPUTS: 
 game: struct containing all the information about a game
 
-Last Modified: 17/9/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 '''
 def initiate_piece_list(game):
-	piece_types = {0: 'white pawn', 1: 'white knight', 2: 'white bishop', 3: 'white rook', 4: 'white queen', 5: 'white king', 
-				6: 'black pawn', 7: 'black knight', 8: 'black bishop', 9: 'black rook', 10: 'black queen', 11: 'black king'}
-
-	piece_num = 0
-	try:
-		for i in range(12):
-			for j in range(64):
-				if ((2 ** j) & game.board[i]) != 0:
-					new_piece = Piece()
-					new_piece.loc = 2 ** j
-					new_piece.type = i
-					new_piece.captured = False
-					game.piece_list[piece_num] = new_piece
-					piece_num += 1
-		
-			# ensures that the kings are always the 16th and 32nd in the piece_list as this fact is used in game_mechanics
-			if i % 6 == 4 and piece_num % 16 != 15:
-				for j in range(15 - (piece_num % 16)):
-					new_piece = Piece()
-					new_piece.loc = 0
-					new_piece.type = 0
-					new_piece.captured = True
-					game.piece_list[piece_num] = new_piece
-					piece_num += 1
-			# does the same for the rooks, as this is used for quick location of the rooks when castling
-			elif i % 6 == 2 and piece_num % 16 != 12:
-				for j in range(12 - (piece_num % 16)):
-					new_piece = Piece()
-					new_piece.loc = 0
-					new_piece.type = 0
-					new_piece.captured = True
-					game.piece_list[piece_num] = new_piece
-					piece_num += 1
-	except IndexError:
-		print(piece_num)
-		print_board(game.board)
+	for colour in range(2):
+		# list of the pieces for this player, with None for places which haven't been filled yet
+		pieces = [None for i in range(16)]
+		other_pieces = []
+		for piece_type in range(6 * colour, 6 * colour + 6):
+			for square in range(64):
+				if ((2 ** square) & game.board[piece_type]) == 0:
+					continue
+
+				# rooks on the squares they start on (a1/h1 for white, a8/h8 for black) are put in their places for castling
+				if piece_type % 6 == 3 and square == 56 * colour and pieces[12] is None:
+					pieces[12] = (square, piece_type)
+				elif piece_type % 6 == 3 and square == 56 * colour + 7 and pieces[13] is None:
+					pieces[13] = (square, piece_type)
+				elif piece_type % 6 == 5:
+					pieces[15] = (square, piece_type)
+				else:
+					other_pieces.append((square, piece_type))
+
+		# the other pieces fill up the free places in order, only using the places saved for the rooks if there is no room elsewhere
+		free_places = [i for i in range(15) if i not in [12, 13]] + [12, 13]
+		for piece in other_pieces:
+			while pieces[free_places[0]] is not None:
+				free_places.pop(0)
+			pieces[free_places.pop(0)] = piece
+
+		for i in range(16):
+			new_piece = Piece()
+			if pieces[i] is None:
+				new_piece.loc = 0
+				new_piece.type = 0
+				new_piece.captured = True
+			else:
+				new_piece.loc = 2 ** pieces[i][0]
+				new_piece.type = pieces[i][1]
+				new_piece.captured = False
+			game.piece_list[16 * colour + i] = new_piece
 
 '''
 Gets the last_move variable (used for detecting legality of en-passant) when the game is initialized.
@@ -291,7 +659,7 @@ INPUTS:
 game: Game struct holding all the information about the game
 en_passant_target: string holding the square which a pawn could potentially land on after an en-passant capture next turn.
 
-Last Modified: 17/9/2021
+Last Modified: 18/10/2026
 Last Modified by : Arkleseisure
 '''
 def get_last_move(game, en_passant_target):
@@ -299,21 +667,79 @@ def get_last_move(game, en_passant_target):
     last_to = 0
     last_flag = 0
     if en_passant_target != '-':
-        last_flag = 2
+        last_flag = 1
         col = ord(en_passant_target[0]) - ord('a')
         row = int(en_passant_target[1]) - 1
 
         square_num = 8 * row + col
         target_square_bitboard = 2 ** square_num
 
-        if to_play == 0:
+        if game.to_play == 0:
             last_from = target_square_bitboard << 8
-            last_to = target - square_bitboard >> 8
+            last_to = target_square_bitboard >> 8
         else:
             last_from = target_square_bitboard >> 8
             last_to = target_square_bitboard << 8
 
-    game.last_move = (c_ulonglong * 3)(*[last_from, last_to, last_flag])
+    game.last_move = pack_move([last_from, last_to, last_flag])
+
+'''
+Sets up a Game struct from a fen string, without needing pygame (used by initialize_game in play_game, and by the perft suite).
+The layout of the bitboards and moves is explained in initialize_game in play_game.
+INPUTS:
+fen: fen string of the position
+
+OUTPUTS:
+game: Game struct holding the position
+zobrist_numbers: list holding the zobrist numbers used to calculate the hashes of the positions.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+def setup_game(fen):
+	fen_list = fen.split()
+	game = Game()
+
+	get_board(game, fen_list[0])
+
+	# The piece_list is an array of 32 piece structures, each containing 3 variables: 
+	# pos: position as a bitboard
+	# type: number from 0-11 referring to the type of piece as explained above
+	# captured: boolean saying whether the piece has been captured yet or not
+	initiate_piece_list(game)
+
+	# number of each type of piece held by each player, used to quickly find draws by lack of material
+	get_material_key(game)
+
+	# player to move, 0 if white to play, 1 if black to play
+	game.to_play = 0 if fen_list[1] == 'w' else 1
+
+	# legality of castling, represented by a four bit number,
+	# kingside/queenside for black, then kingside/queenside for white
+	game.castling = 0
+	if 'Q' in fen_list[2]:
+		game.castling += 1
+	if 'K' in fen_list[2]:
+		game.castling += 2
+	if 'q' in fen_list[2]:
+		game.castling += 4
+	if 'k' in fen_list[2]:
+		game.castling += 8
+
+	get_last_move(game, fen_list[3])
+
+	# initiates the zobrist hashes and zobrist numbers, used to speed up
+	# indexing of positions, more info here:
+	# https://www.chessprogramming.org/Zobrist_Hashing
+	zobrist_numbers = generate_zobrist_stuff(game)
+
+	# half move counter, used to find draws by 50 move rule (epd positions often leave out the move counters)
+	game.ply_counter = int(fen_list[4]) if len(fen_list) > 4 else 0
+
+	# value of the position, as evaluated by the engine.
+	game.value = 0
+
+	return game, zobrist_numbers
 
 '''
 The perft function (PERFormace Test) is used for testing the efficiency of the game mechanics and for debugging in the case of faulty rules.
@@ -321,6 +747,8 @@ It works by calculating all the moves down to a certain depth and counting the n
 our results to generally accepted values.
 It has two modes in which it can be run: 'all', which counts the number of nodes in each of the categories in the answer_type list, and
 										 'nodes', which just counts the number of nodes, and is used for efficiency testing.
+The work can be split between several threads, and a hash table can be used so that positions reached by different move orders are only counted once.
+Note that the hash table makes the speed much higher than the actual speed of the move generation, so it shouldn't be used for benchmarking.
 
 More info: https://www.chessprogramming.org/Perft
 
@@ -329,34 +757,30 @@ game: Game struct, holding all the information about the position from which the
 zobrist_numbers: list holding the zobrist numbers, used for updating the hashes for each position.
 depth: int holding the depth to which the perft function should calculate
 type: mode in which the perft function will be run, 'all' or 'nodes'
+threads: number of threads to split the work between
+hash_size: size of the perft hash table in MB, 0 to not use one.
 
 OUTPUTS:
 answer_dict: dictionary with the types of answer as keys (as held in answer_type) and the values calculated as values.
 time_taken: time taken to find these values.
 
-Last Modified: 15/9/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 '''
-def perft(game, zobrist_numbers, depth, type='all'):
+def perft(game, zobrist_numbers, depth, type='all', threads=1, hash_size=0):
 	c_depth = c_int(depth)
 	c_zobrist_numbers = (c_ulonglong * 793)(*zobrist_numbers)
 	c_game = (Game * 1)(*[game])
 	answer_type = ['Nodes', 'Captures', 'En passant', 'Castling', 'Promotion', 'Checks', 'Checkmates']
 	answer_dict = {}
 
-	# perft_all is used for testing the rules of the game, and returns statistics for various different things, 
-	# while perft_nodes is used for speed benchmarking and only counts nodes.
-	if type == 'all':
-		answers = (c_ulonglong * 7)()
-		start_time = time.time()
-		game_mech.perft_all(c_game, answers, c_zobrist_numbers, c_depth)
-		time_taken = time.time() - start_time
-		game = c_game[0]
-	else:
-		answers = (c_ulonglong * 1)()
-		start_time = time.time()
-		game_mech.perft_nodes(c_game, c_depth, answers, c_zobrist_numbers)
-		time_taken = time.time() - start_time
+	# 'all' is used for testing the rules of the game, and returns statistics for various different things, 
+	# while 'nodes' is used for speed benchmarking and only counts nodes.
+	count_all = type == 'all'
+	answers = (c_ulonglong * (7 if count_all else 1))()
+	start_time = time.time()
+	game_mech.perft(c_game, c_depth, c_bool(count_all), answers, c_zobrist_numbers, c_int(threads), c_int(hash_size))
+	time_taken = time.time() - start_time
 
 	for i in range(len(answers)):
 		answer_dict[answer_type[i]] = answers[i]
@@ -364,6 +788,34 @@ def perft(game, zobrist_numbers, depth, type='all'):
 	return answer_dict, time_taken
 
 
+'''
+Runs perft on the position after each of the legal moves, so that if the total is wrong the move leading to the mistake can be found
+(by comparing the counts for each move with those of another engine, then following the wrong move down).
+INPUTS:
+game, zobrist_numbers, depth, type, threads, hash_size: same as for perft
+
+OUTPUTS:
+divide: list of (move as text e.g 'e2e4' or 'e7e8q', answer_dict) for each legal move, in the order given by legal_moves.
+time_taken: total time taken by the perft searches.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+def perft_divide(game, zobrist_numbers, depth, type='all', threads=1, hash_size=0):
+	promotion_letters = ['n', 'b', 'r', 'q']
+	divide = []
+	time_taken = 0
+	for move in legal_moves(game):
+		move_text = convert_to_text(move[0]) + convert_to_text(move[1])
+		if (move[2] & 8) != 0:
+			move_text += promotion_letters[move[2] & 3]
+
+		answer_dict, move_time = perft(apply(game, move, zobrist_numbers), zobrist_numbers, depth - 1, type, threads, hash_size)
+		divide.append((move_text, answer_dict))
+		time_taken += move_time
+	return divide, time_taken
+
+
 '''
 Given a position in a game, returns whether or not the game is over.
 Returns 0 if a win for black, 1 if a draw, 2 if a win for white and 3 if the game isn't over.
@@ -376,10 +828,10 @@ def terminal(game):
 
 '''
 Gets the code for a particular engine given the name of the engine
-Last Modified: 19/9/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 '''
 def get_engine_code(engine_name):
 	if engine_name != '':
-		return CDLL('theories/engine_%s.so' % (engine_name + '_' + sys.platform))
-	return CDLL('theories/engine_%s.so' % sys.platform)
+		return load_engine('theories/engine_%s.so' % (engine_name + '_' + sys.platform))
+	return load_engine('theories/engine_%s.so' % sys.platform)
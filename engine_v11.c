@@ -3,7 +3,7 @@
 #include <stdbool.h>
 #include <time.h>
 #include <math.h>
-#include "game_mechanics_v1.c"
+#include "game_mechanics_v0.c"
 
 float values[6] = { 1, (float)2.9, (float)3.35, (float)4.9, 10, (float)4.5 };
 
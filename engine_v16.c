@@ -4,6 +4,7 @@
 #include <time.h>
 #include <math.h>
 #include <string.h>
+#include <limits.h>
 #include "game_mechanics_v1.c"
 #include "pawn_structure_v16.c"
 
@@ -12,18 +13,188 @@ float values[6] = { 1, (float)2.9, (float)3.35, (float)4.9, 10, (float)4.5 };
 // Value of a tempo
 float tempo_value = 0.6;
 
-// Late move reduction threshold: The depth searched is reduced by 1 after this number of moves searched
+// Late move reductions (see minimax): the moves after the first late_move_reduction_threshold moves are searched to a reduced depth,
+// which goes up with both the depth and the number of moves already searched: base + ln(depth) * ln(moves searched) / divisor, rounded down.
 int late_move_reduction_threshold = 1;
+float late_move_reduction_base = 1;
+float late_move_reduction_divisor = (float)1.75;
+
+// Null move pruning (see minimax): the lowest depth at which a null move is tried, how much more the null move search is reduced by than a normal move,
+// and the lowest depth at which a null move cutoff is checked by a reduced search of the position without null moves (0 to never check).
+int null_move_min_depth = 3;
+int null_move_reduction = 2;
+int null_move_verification_depth = 8;
+
+// Size of the hash table in MB, which can be changed from python with set_hash_size, and the number of buckets it holds (always a power of 2).
+int hash_table_size_mb = 256;
+int hash_table_size = 0;
+
+// The transposition table is kept for the whole game (rather than being freed after each move), so that the work done while searching for one move
+// can be used when searching for the next ones. It is allocated the first time it is needed, and cleared by clear_hash_table at the start of each game.
+// hash_table_memory is the memory actually allocated, which the table is aligned within so that each bucket sits in a single cache line.
+struct HashTableBucket* transposition_table = NULL;
+void* hash_table_memory = NULL;
+
+// Generation of the current search, which goes up by 1 each time get_engine_move is called. It is stored in each entry of the transposition table,
+// so that entries left over from the searches for earlier moves can be recognised as stale and replaced first.
+unsigned int hash_table_generation = 0;
+
+// Maximum number of plies from the root which the nodes can reach (this is far deeper than the search ever gets)
+#define MAX_PLY 128
+
+// Deepest depth iterative deepening searches to, which is the most the transposition table can store. It is only reached when the search 
+// has no time limit (see start_pondering and set_search_limits) or in positions with very few moves.
+#define MAX_SEARCH_DEPTH 63
+
+// Tables used to order the quiet moves, which are updated whenever a quiet move causes a beta cutoff (see update_quiet_move_tables).
+// Each thread of the search has its own tables, as the threads are searching different parts of the tree.
+// killer_moves: the last 2 quiet moves to cause a cutoff at each ply from the root, as the same move often refutes many of the moves before it.
+// history_table: score for each colour and pair of from and to squares, which goes up by about depth^2 each time the move causes a cutoff and 
+// 		down each time it is searched before another move which does (see update_history_score, which keeps it between -HISTORY_MAX and HISTORY_MAX).
+// 		It is halved at the start of each search so that old results count for less.
+// countermoves: the last quiet move to cause a cutoff in reply to each type of piece moving to each square.
+THREAD_LOCAL unsigned int killer_moves[MAX_PLY][2];
+THREAD_LOCAL int history_table[2][64][64];
+THREAD_LOCAL unsigned int countermoves[12][64];
+
+// Number of plies by which each move is reduced, indexed by the depth left and the number of moves searched before it (both capped at 63).
+// This is worked out from the late move reduction parameters by set_late_move_reductions at the start of each search.
+#define REDUCTION_TABLE_SIZE 64
+int late_move_reductions[REDUCTION_TABLE_SIZE][REDUCTION_TABLE_SIZE];
+
+// Set while a null move cutoff is being verified, so that no null moves are tried in the verification search
+THREAD_LOCAL bool null_move_disabled;
+
+// Largest size of a score in the history table (positive or negative), which keeps the scores below KILLER_MOVE_SCORE
+#define HISTORY_MAX 100000
+
+// Memory in MB which each thread of the search can use to hold its tree of nodes (see the NodeArena struct)
+int node_arena_size_mb = 64;
+
+// Node arenas of the threads of the search, which are kept between moves, and the number which have been allocated.
+// node_arena points to the arena of the thread which is running, so that the nodes can be allocated without passing it through every function.
+struct NodeArena* node_arenas = NULL;
+int num_node_arenas = 0;
+THREAD_LOCAL struct NodeArena* node_arena;
+
+// Set to true to tell all the threads of the search to stop (e.g once the main thread has finished, or once the time has run out)
+volatile bool stop_search = false;
+
+// Time management (see start_time_manager): the search is stopped as soon as the hard limit (the time allowed) has passed, while no new depth
+// is started by iterative deepening once the soft limit has passed, which is this fraction of the time allowed.
+float soft_time_limit = (float)0.8;
+
+// Expected ratio between the time taken to search one depth and the depth before, used to predict whether the next depth can finish in time
+// (each depth usually takes about 1.5 to 3 times as long as the one before). Once the last 2 depths have both taken long enough to be timed
+// reliably (MIN_TIMED_ITERATION seconds), the ratio between them is used instead, kept between 1 and max_iteration_time_growth.
+float iteration_time_growth = 2;
+float max_iteration_time_growth = 4;
+#define MIN_TIMED_ITERATION 0.001
+
+// The clock is only looked at once every this many nodes by each thread, as reading it takes much longer than searching a node
+#define TIME_CHECK_INTERVAL 1024
+
+// Time limit in seconds used when the search has no time limit (e.g while pondering), which is far longer than any search will ever take
+#define NO_TIME_LIMIT 1e9
+
+// Depth and node limits for the searches, which are set from python by set_search_limits (0 for no limit). Unlike the time, these stop the 
+// search at the same point every time it is run, which makes the results reproducible on any machine.
+int search_depth_limit = 0;
+unsigned long long search_node_limit = 0;
 
-// Variables defining the number of bits used to index the hash table and the total size of the hash table.
-int hash_table_index_bits = 27;
-int hash_table_size = 1 << 26;
+/*
+Limits of the current search.
+start_time: time at which the search started, in seconds (see wall_clock)
+soft_limit: time after the start after which no new depth is started
+hard_limit: time after the start at which the search is stopped
+max_depth: deepest depth iterative deepening searches to
+max_nodes: number of nodes after which each thread stops the search
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+struct TimeManager {
+	double start_time;
+	double soft_limit;
+	double hard_limit;
+	int max_depth;
+	unsigned long long max_nodes;
+};
+
+// The time manager is shared by all the threads, and can be changed by ponder_hit while the search is running
+volatile struct TimeManager time_manager;
+
+// Number of nodes each thread has left to search before it next looks at the clock
+THREAD_LOCAL int nodes_until_time_check;
+
+/*
+Statistics about one depth (iteration) of iterative deepening, which are used to compare different versions of the engine (see get_search_stats).
+depth: depth searched
+value: value found, from white's perspective (+ good for white)
+completed: whether the depth was finished, rather than being cut short when the search was stopped (e.g when the time ran out)
+time: time taken in seconds
+nodes: number of nodes searched, including the quiescence nodes
+quiescence_nodes: number of nodes searched by the quiescence search
+hash_probes, hash_hits: number of times a position was looked for in the transposition table, and found
+hash_cutoffs: number of times the value stored in the transposition table was used instead of searching the position
+beta_cutoffs, first_move_cutoffs: number of beta cutoffs, and how many of them were caused by the first move searched (which shows how good the 
+	move ordering is)
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+struct SearchStats {
+	int depth;
+	float value;
+	bool completed;
+	double time;
+	unsigned long long nodes;
+	unsigned long long quiescence_nodes;
+	unsigned long long hash_probes;
+	unsigned long long hash_hits;
+	unsigned long long hash_cutoffs;
+	unsigned long long beta_cutoffs;
+	unsigned long long first_move_cutoffs;
+};
 
-// Killer moves are moves which have previously caused a beta cutoff, and are prioritized for move ordering.
-unsigned long long killer_moves[2][3];
+// Statistics for each depth searched by the main thread in the last search (nodes and hash_cutoffs are counted by minimax, so only the rest are used)
+struct SearchStats search_stats[MAX_SEARCH_DEPTH + 1];
+int num_search_stats = 0;
 
+// Counts the statistics which aren't counted by minimax, for the thread which is running
+THREAD_LOCAL struct SearchStats search_counters;
+
+// Delta pruning (see quiescence): a capture is only searched if the value of the piece captured, plus this margin, could take the position above alpha.
 float quiescence_safety_margin = 2;
 
+// Futility pruning (see minimax): at depths up to futility_depth, quiet moves are skipped if the static evaluation plus futility_margin per ply
+// of depth left can't reach alpha. Reverse futility pruning does the opposite: at depths up to reverse_futility_depth, the node is cut off
+// if the static evaluation minus reverse_futility_margin per ply of depth left is still above beta.
+int futility_depth = 2;
+float futility_margin = (float)1.5;
+int reverse_futility_depth = 3;
+float reverse_futility_margin = (float)1.5;
+
+// Width of the window used for null window searches, which only show whether the value of a position is above or below a bound
+#define NULL_WINDOW ((float)0.001)
+
+// Half the width of the first aspiration window used by iterative deepening, in pawns
+float aspiration_window = (float)0.25;
+
+// Moves skipped by minimax at the root, which are the best moves already found by the earlier passes of a MultiPV search (see get_multi_pv)
+unsigned int root_excluded_moves[220];
+int num_root_excluded = 0;
+
+// Longest principal variation returned for each line of a MultiPV search
+#define MAX_PV_LENGTH 32
+
+// Scores given to the different types of moves by score_moves, which decide the order in which they are searched
+#define HASH_MOVE_SCORE 100000000
+#define EVALUATED_MOVE_SCORE 10000000
+#define CAPTURE_SCORE 1000000
+#define KILLER_MOVE_SCORE 900000
+#define COUNTERMOVE_SCORE 800000
+
 /*
 Used to verify at the start of the program that the code being used is indeed the latest version, and that it has imported the correct version of game_mechanics
 Last Modified: 17/9/2021
@@ -35,6 +206,16 @@ void check_it_works() {
 	printf(" This is engine v16.\n");
 }
 
+/*
+Returns the version of the engine, which python checks when it loads the engine (see load_engine in c_interface), as the engines before v16
+use a different Game struct and move format and would corrupt their memory if they were used with the current one.
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+int get_engine_version() {
+	return 16;
+}
+
 
 // Piece-square tables are used to encourage the engine to move the pieces to squares where they will likely be active.
 // The squares where pieces are useful are different in the middlegame and the endgame, so different tables are used, and then the 
@@ -156,31 +337,63 @@ float piece_square_table_eg[6][8][8] = {
 
 
 /*
-hash: hash of the position. As the last 24 bits are used to index the position in the hash table, it is not guaranteed that the hashes are the same,
-		and so the other 40 bits are used to check that the information stored is the same as that we are looking for.
+Entry in the transposition table. The information about the position is packed into data (see add_hash_table_entry), and check holds the hash
+of the position xored with data. When the entry is looked up, check xored with data must give back the hash, which confirms that the entry 
+is for the same position (as only the last bits of the hash are used to index the table, different positions share the same entry).
+This also means that the table can be shared between the threads of the search without any locks: if two threads write to the same entry at 
+the same time, the mixed up entry will fail the check, rather than giving the wrong information.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+struct HashTableEntry {
+	unsigned long long check;
+	unsigned long long data;
+};
+
+/*
+The transposition table is made of buckets of HASH_BUCKET_SIZE entries, each taking up 64 bytes, which is the size of a cache line.
+A position can be stored in any of the entries of the bucket given by the last bits of its hash, so looking it up only ever has to read one 
+cache line from memory, while a new position doesn't have to replace a deep search of another one which happens to share the same index.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+#define HASH_BUCKET_SIZE 4
+#define CACHE_LINE_SIZE 64
+
+struct HashTableBucket {
+	struct HashTableEntry entries[HASH_BUCKET_SIZE];
+};
+
+/*
+Information stored in the transposition table about a position, once it has been unpacked from the entry:
 value: value of the position as found previously.
 node_type: 0 (PV: perfect value node, where the tree has been searched well enough to determine the value of the node perfectly)
 		   1 (Cut: The search has been cut off by the alpha-beta pruning. This one is a lower bound for the value of the node.)
 		   2 (All: The search has been cut off by the alpha-beta pruning. This one is an upper bound for the value of the node.)
 depth: Depth to which the node has been searched.
-best_move: best move in the position last time it was searched. Can be useful for move ordering when the depth isn't high enough.
+move: best move in the position last time it was searched (only the lowest 16 bits of the packed move, i.e the squares and the flag, which are 
+	enough to tell it apart from the other moves in the position), or 0 if there isn't one. Used to search that move first.
+generation: value of hash_table_generation when the entry was added, i.e which search it comes from.
 
-Last Modified: 17/7/2022
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-
-struct HashTableEntry {
-	unsigned int hash : 32;
+struct HashTableData {
 	float value;
-	int node_type : 2;
-	int depth : 6;
-	int move_number : 8;
+	int node_type;
+	int depth;
+	unsigned int move;
+	int generation;
 };
 
 
 /*
 The Node struct is used to hold the information about a node, and save it for future use.
-Last Modified: 20/9/2021
+generated holds which stages of the move generation have been added to the children (CAPTURE_MOVES, QUIET_MOVES or both),
+as the quiet moves are only generated once none of the captures have produced a cutoff.
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
 struct Node {
@@ -188,22 +401,421 @@ struct Node {
 	bool evaluated;
 	struct Node* children;
 	int num_moves;
-	unsigned long long parent_move[3];
+	int generated;
+	unsigned int parent_move;
+};
+
+/*
+Memory used by one thread of the search to hold its tree of nodes. Rather than each node allocating its own children, they are taken from
+the top of one big block of nodes (the arena), which is allocated once and emptied in one go at the start of each search. This means that the 
+tree can never use more than node_arena_size_mb, however long the engine thinks for, and that nothing has to be freed.
+Once the arena is full, the children of new nodes go in the scratch stack instead, which holds one array of children for each ply from the root.
+These are only kept while the node is being searched (the next node searched at the same ply reuses the array), so the moves of these nodes are
+ordered using the transposition table and killer moves rather than the values from previous searches. The nodes of the quiescence search, 
+which aren't kept between searches anyway, always use the scratch stack.
+nodes: the arena, which can hold capacity nodes, of which the first used have been taken.
+scratch: the scratch stack, holding 220 nodes (the most legal moves there can be in a position) for each ply up to MAX_PLY.
+root: root node of the search.
+root_history_length: history_length of the game at the root, used to find how many plies a node is from the root.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+struct NodeArena {
+	struct Node* nodes;
+	int capacity;
+	int used;
+	struct Node* scratch;
+	struct Node root;
+	int root_history_length;
 };
 
 /*
-Adds the results for a particular position to the hash table
+Adds the results for a particular position to the hash table. The value is held in the lowest 32 bits of the data, followed by 2 bits 
+for the node type, 6 for the depth, 8 for the generation and 16 for the move.
+If the position is already in its bucket, that entry is replaced. Otherwise, the entry replaced is the one which is least useful to keep: 
+entries from earlier searches (older generations) go first, followed by the ones searched to the lowest depth.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+void add_hash_table_entry(struct HashTableBucket* hash_table, unsigned long long hash, int depth, int node_type, float node_value, unsigned int move) {
+	struct HashTableBucket* bucket = &hash_table[hash & ((unsigned long long)hash_table_size - 1)];
+	struct HashTableEntry* new_hash_entry = &bucket->entries[0];
+	int lowest_priority = 1000000;
+	int priority;
+	unsigned long long old_data;
+	for (int i = 0; i < HASH_BUCKET_SIZE; i++) {
+		old_data = bucket->entries[i].data;
+		if ((bucket->entries[i].check ^ old_data) == hash) {
+			new_hash_entry = &bucket->entries[i];
+			break;
+		}
+		// the priority of keeping an entry goes down by 8 (more than the depth of most searches) for each generation it is out of date
+		priority = (int)((old_data >> 34) & 63) - 8 * (int)((hash_table_generation - (old_data >> 40)) & 255);
+		if (priority < lowest_priority) {
+			lowest_priority = priority;
+			new_hash_entry = &bucket->entries[i];
+		}
+	}
+
+	unsigned int value_bits;
+	memcpy(&value_bits, &node_value, sizeof(value_bits));
+	unsigned long long data = (unsigned long long)value_bits | ((unsigned long long)(node_type & 3) << 32) | ((unsigned long long)(depth & 63) << 34) 
+		| ((unsigned long long)(hash_table_generation & 255) << 40) | ((unsigned long long)(move & 0xFFFF) << 48);
+	new_hash_entry->check = hash ^ data;
+	new_hash_entry->data = data;
+}
+
+/*
+Looks up a position in the hash table, unpacking the information stored about it into data. Returns false if the position isn't in the table.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+bool get_hash_table_entry(struct HashTableBucket* hash_table, unsigned long long hash, struct HashTableData* data) {
+	struct HashTableBucket* bucket = &hash_table[hash & ((unsigned long long)hash_table_size - 1)];
+	unsigned long long entry_data;
+	for (int i = 0; i < HASH_BUCKET_SIZE; i++) {
+		entry_data = bucket->entries[i].data;
+		if ((bucket->entries[i].check ^ entry_data) == hash) {
+			unsigned int value_bits = (unsigned int)entry_data;
+			memcpy(&data->value, &value_bits, sizeof(value_bits));
+			data->node_type = (int)((entry_data >> 32) & 3);
+			data->depth = (int)((entry_data >> 34) & 63);
+			data->generation = (int)((entry_data >> 40) & 255);
+			data->move = (unsigned int)(entry_data >> 48);
+			return true;
+		}
+	}
+	return false;
+}
+
+/*
+Returns the index of the child of the node reached by the move stored in the hash table (see HashTableData), or -1 if it isn't one of the children.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+int find_hash_table_move(struct Node* node, unsigned int move) {
+	if (move == 0) {
+		return -1;
+	}
+	for (int i = 0; i < node->num_moves; i++) {
+		if ((node->children[i].parent_move & 0xFFFF) == move) {
+			return i;
+		}
+	}
+	return -1;
+}
+
+/*
+Allocates the transposition table if it hasn't been allocated yet, with the largest power of 2 number of buckets which fits in hash_table_size_mb.
+If the memory can't be found, the size is halved until it can. Returns false if no memory could be found for it at all.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+bool allocate_hash_table() {
+	while (transposition_table == NULL) {
+		unsigned long long max_buckets = ((unsigned long long)hash_table_size_mb << 20) / sizeof(struct HashTableBucket);
+		hash_table_size = 1;
+		while ((unsigned long long)hash_table_size * 2 <= max_buckets && hash_table_size < (1 << 30)) {
+			hash_table_size *= 2;
+		}
+		// one extra cache line is allocated so that the start of the table can be moved to the start of a cache line
+		hash_table_memory = calloc((size_t)hash_table_size + 1, sizeof(struct HashTableBucket));
+		if (hash_table_memory == NULL) {
+			if (hash_table_size_mb <= 1) {
+				return false;
+			}
+			hash_table_size_mb /= 2;
+			printf("Transposition table generation failed, now trying with size %d MB.\n", hash_table_size_mb);
+		}
+		else {
+			transposition_table = (struct HashTableBucket*)(((size_t)hash_table_memory + CACHE_LINE_SIZE - 1) & ~(size_t)(CACHE_LINE_SIZE - 1));
+		}
+	}
+	return true;
+}
+
+// Stops the search started by start_pondering, which has to be done before the transposition table is changed
+void stop_pondering();
+
+/*
+Sets the size of the transposition table in MB (rounded down to a power of 2 number of buckets), reallocating it if it has already been allocated.
+This is called from python (see set_hash_size in c_interface), and returns the size actually allocated in MB, which may be smaller if the memory
+couldn't be found, or 0 if it couldn't be allocated at all.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+int set_hash_size(int size_mb) {
+	stop_pondering();
+	free(hash_table_memory);
+	hash_table_memory = NULL;
+	transposition_table = NULL;
+	hash_table_size_mb = size_mb < 1 ? 1 : size_mb;
+	hash_table_generation = 0;
+	if (!allocate_hash_table()) {
+		return 0;
+	}
+	return (int)(((unsigned long long)hash_table_size * sizeof(struct HashTableBucket)) >> 20);
+}
+
+/*
+Clears the transposition table, so that nothing from a previous game is used in the next one. This is called from python at the start
+of each game (see new_game in c_interface), and allocates the table if it hasn't been allocated yet.
+The tables used to order the quiet moves are cleared too, so that the search of a position doesn't depend on anything searched before 
+the game started, which makes the searches with depth or node limits reproducible (see set_search_limits). These belong to the thread 
+calling this, which is the main thread of the search, as the helper threads are started afresh for each search.
 
-Last Modified: 17/7/2022
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-void add_hash_table_entry(struct HashTableEntry* hash_table, unsigned long long hash, int depth, int node_type, float node_value, int move_number) {
-	struct HashTableEntry* new_hash_entry = &hash_table[hash & ((unsigned long long)hash_table_size - 1)];
-	new_hash_entry->hash = (unsigned int)(hash >> hash_table_index_bits);
-	new_hash_entry->depth = depth;
-	new_hash_entry->node_type = node_type;
-	new_hash_entry->value = node_value;
-	new_hash_entry->move_number = move_number;
+void clear_hash_table() {
+	stop_pondering();
+	memset(killer_moves, 0, sizeof(killer_moves));
+	memset(history_table, 0, sizeof(history_table));
+	memset(countermoves, 0, sizeof(countermoves));
+	if (transposition_table != NULL) {
+		memset(transposition_table, 0, (size_t)hash_table_size * sizeof(struct HashTableBucket));
+	}
+	else {
+		allocate_hash_table();
+	}
+	hash_table_generation = 0;
+}
+
+/*
+Returns the time in seconds since the first time this was called. This uses a monotonic clock, which measures the real time that has passed
+(unlike clock, which measures the processor time used by the program and so goes up faster than real time when the search is using several threads),
+and which isn't affected by changes to the system time.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+double wall_clock() {
+	static double first_time = -1;
+	double seconds;
+#if defined(_WIN32)
+	LARGE_INTEGER counter;
+	LARGE_INTEGER frequency;
+	QueryPerformanceCounter(&counter);
+	QueryPerformanceFrequency(&frequency);
+	seconds = (double)counter.QuadPart / (double)frequency.QuadPart;
+#else
+	struct timespec current_time;
+	clock_gettime(CLOCK_MONOTONIC, &current_time);
+	seconds = (double)current_time.tv_sec + (double)current_time.tv_nsec / 1e9;
+#endif
+	if (first_time < 0) {
+		first_time = seconds;
+	}
+	return seconds - first_time;
+}
+
+/*
+Sets up the time manager at the start of a search which has time_allowed seconds to find its move (no time limit if this is 0 or less),
+along with the depth and node limits set by set_search_limits.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+void start_time_manager(double time_allowed) {
+	if (time_allowed <= 0) {
+		time_allowed = NO_TIME_LIMIT;
+	}
+	time_manager.start_time = wall_clock();
+	time_manager.hard_limit = time_allowed;
+	time_manager.soft_limit = time_allowed * soft_time_limit;
+	time_manager.max_depth = search_depth_limit > 0 && search_depth_limit < MAX_SEARCH_DEPTH ? search_depth_limit : MAX_SEARCH_DEPTH;
+	time_manager.max_nodes = search_node_limit > 0 ? search_node_limit : ULLONG_MAX;
+	nodes_until_time_check = TIME_CHECK_INTERVAL;
+}
+
+/*
+Sets the depth and node limits used by the searches from now on (0 for no limit), which is called from python by get_engine_move in c_interface.
+The search stops as soon as it reaches any of its limits, so to search to a fixed depth or number of nodes, no time limit should be given.
+With more than one thread, the node limit is for each thread, and the results aren't reproducible, as the threads don't run at the same speed 
+every time.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+void set_search_limits(int max_depth, unsigned long long max_nodes) {
+	search_depth_limit = max_depth;
+	search_node_limit = max_nodes;
+}
+
+/*
+Called at every node of the search, with the number of nodes searched by the thread so far. This tells all the threads to stop if the node limit
+has been reached, or if the hard time limit has passed, which is only looked at once every TIME_CHECK_INTERVAL nodes.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+void check_time(unsigned long long nodes) {
+	if (nodes >= time_manager.max_nodes) {
+		stop_search = true;
+	}
+	nodes_until_time_check--;
+	if (nodes_until_time_check <= 0) {
+		nodes_until_time_check = TIME_CHECK_INTERVAL;
+		if (wall_clock() - time_manager.start_time > time_manager.hard_limit) {
+			stop_search = true;
+		}
+	}
+}
+
+/*
+Returns true if the search should stop, either because the time allowed has been used up (see check_time), or because another thread has 
+told it to stop.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+bool out_of_time() {
+	return stop_search;
+}
+
+/*
+Decides whether iterative deepening should start searching the next depth. It doesn't if the soft time limit has passed, or if the next depth
+isn't expected to finish before the hard limit, which is predicted from the time the last depth took (last_iteration_time) multiplied by
+how much longer each depth is taking than the one before, measured from the last 2 depths (see iteration_time_growth). Otherwise most of 
+the time spent on the next depth would be thrown away.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+bool start_next_iteration(double last_iteration_time, double previous_iteration_time) {
+	double time_used = wall_clock() - time_manager.start_time;
+	double growth = iteration_time_growth;
+	if (previous_iteration_time >= MIN_TIMED_ITERATION && last_iteration_time >= MIN_TIMED_ITERATION) {
+		growth = last_iteration_time / previous_iteration_time;
+		if (growth < 1) {
+			growth = 1;
+		}
+		else if (growth > max_iteration_time_growth) {
+			growth = max_iteration_time_growth;
+		}
+	}
+	return !stop_search && time_used < time_manager.soft_limit && time_used + last_iteration_time * growth < time_manager.hard_limit;
+}
+
+/*
+Allocates the node arenas for the given number of threads, keeping the ones which have already been allocated.
+Returns false if the memory couldn't be found (an arena with no space for nodes is still fine, as the scratch stack is used instead).
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+bool allocate_node_arenas(int threads) {
+	if (threads <= num_node_arenas) {
+		return true;
+	}
+	struct NodeArena* new_arenas = (struct NodeArena*)realloc(node_arenas, threads * sizeof(struct NodeArena));
+	if (!new_arenas) {
+		return false;
+	}
+	node_arenas = new_arenas;
+	while (num_node_arenas < threads) {
+		struct NodeArena* arena = &node_arenas[num_node_arenas];
+		memset(arena, 0, sizeof(struct NodeArena));
+		arena->scratch = (struct Node*)malloc(MAX_PLY * 220 * sizeof(struct Node));
+		if (!arena->scratch) {
+			return false;
+		}
+		arena->capacity = (int)(((unsigned long long)node_arena_size_mb << 20) / sizeof(struct Node));
+		arena->nodes = (struct Node*)malloc((size_t)arena->capacity * sizeof(struct Node));
+		if (!arena->nodes) {
+			arena->capacity = 0;
+		}
+		num_node_arenas++;
+	}
+	return true;
+}
+
+/*
+Empties a node arena for a new search from the position in game, and sets up the root node.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+void reset_node_arena(struct NodeArena* arena, struct Game* game) {
+	arena->used = 0;
+	memset(&arena->root, 0, sizeof(struct Node));
+	arena->root.parent_move = game->last_move;
+	arena->root_history_length = game->history_length;
+}
+
+/*
+Returns true if the children of a node are held in the scratch stack of the node arena, in which case they may have been overwritten.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+bool in_scratch_stack(struct NodeArena* arena, struct Node* children) {
+	return children != NULL && children >= arena->scratch && children < arena->scratch + MAX_PLY * 220;
+}
+
+/*
+Finds space for num_children children of a node, which already has node->num_moves children that must stay at the start.
+Nodes in the tree (the root and the nodes in the arena) take their children from the top of the arena, or extend them in place if they are 
+already at the top. If there isn't enough space, or the node isn't in the tree, the array for its ply in the scratch stack is used.
+Returns NULL if the node is too far from the root to have children.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+struct Node* allocate_children(struct Game* game, struct Node* node, int num_children) {
+	struct NodeArena* arena = node_arena;
+	bool in_tree = node == &arena->root || (node >= arena->nodes && node < arena->nodes + arena->used);
+	if (in_tree) {
+		int top = arena->used;
+		if (node->children != NULL && node->children >= arena->nodes && node->children + node->num_moves == arena->nodes + arena->used) {
+			top = (int)(node->children - arena->nodes);
+		}
+		if (top + num_children <= arena->capacity) {
+			arena->used = top + num_children;
+			return &arena->nodes[top];
+		}
+	}
+	int ply = game->history_length - arena->root_history_length;
+	if (ply < 0 || ply >= MAX_PLY) {
+		return NULL;
+	}
+	return &arena->scratch[ply * 220];
+}
+
+/*
+Generates the moves for one stage of the move generation and adds them to the end of the children of a node.
+Since the captures always come before the quiet moves, the children end up in the same order as the moves from legal_moves, 
+so that the index of a child can still be used as the move number.
+Returns false if there was no space for the children (see allocate_children).
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+bool add_child_nodes(struct Game* game, struct Node* node, int stage) {
+	unsigned int moves[220];
+	int num_moves = generate_legal_moves(game->board, game->to_play, game->castling, game->last_move, game->piece_list, stage, moves);
+	struct Node* children = allocate_children(game, node, node->num_moves + num_moves);
+	if (!children) {
+		return false;
+	}
+	// if the children have been moved, the ones which were already there are copied across (along with the pointers to their own children)
+	if (node->num_moves > 0 && children != node->children) {
+		memcpy(children, node->children, node->num_moves * sizeof(struct Node));
+	}
+	memset(&children[node->num_moves], 0, num_moves * sizeof(struct Node));
+	for (int i = 0; i < num_moves; i++) {
+		children[node->num_moves + i].parent_move = moves[i];
+	}
+	node->children = children;
+	node->num_moves += num_moves;
+	node->generated |= stage;
+	return true;
 }
 
 /*
@@ -221,15 +833,14 @@ float get_psqt_value(int type, int rank, int file, float current_np_material) {
 
 /*
 Function used to get the initial value for the game state at the start of each move.
-Last Modified: 24/12/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
 void fully_evaluate(struct Game* game) {
 	int i;
 	game->value = 0;
 	game->current_np_material = 0;
-	int piece_rank;
-	int piece_file;
+	int piece_square;
 	struct Piece piece;
 	// loops through the piece_list, adding the values of each piece in the position.
 	for (i = 0; i < 32; i++) {
@@ -244,16 +855,14 @@ void fully_evaluate(struct Game* game) {
 	for (i = 0; i < 16; i++) {
 		if (!(game->piece_list[i].captured)) {
 			piece = game->piece_list[i];
-			piece_rank = rank(piece.loc);
-			piece_file = file(piece.loc);
-			game->value += get_psqt_value(piece.type, piece_rank, piece_file, game->current_np_material);
+			piece_square = get_square(piece.loc);
+			game->value += get_psqt_value(piece.type, piece_square >> 3, piece_square & 7, game->current_np_material);
 			game->value += values[piece.type];
 		}
 		if (!(game->piece_list[i + 16].captured)) {
 			piece = game->piece_list[i + 16];
-			piece_rank = 7 - rank(piece.loc);
-			piece_file = file(piece.loc);
-			game->value -= get_psqt_value(piece.type - 6, piece_rank, piece_file, game->current_np_material);
+			piece_square = get_square(piece.loc);
+			game->value -= get_psqt_value(piece.type - 6, 7 - (piece_square >> 3), piece_square & 7, game->current_np_material);
 			game->value -= values[piece.type - 6];
 		}
 	}
@@ -269,22 +878,22 @@ void fully_evaluate(struct Game* game) {
 
 /*
 Updates the parts of the evaluation which are incrementally updated for efficiency reasons.
-Last Modified: 24/12/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-void update_value(struct Game* game, unsigned long long move[3], int captured_piece, \
+void update_value(struct Game* game, unsigned int move, int captured_piece, \
 					unsigned long long last_pawn_board_white, unsigned long long last_pawn_board_black, float prev_material) {
 	//printf("Original value: %f\n", game->value);
 	int piece_type = 0;
 	int flag = 0;
 	// handles promotions
-	if ((move[2] & 8) != 0) {
-		int file1 = file(move[0]);
-		int file2 = file(move[1]);
+	if ((move_flag(move) & 8) != 0) {
+		int file1 = move_from(move) & 7;
+		int file2 = move_to(move) & 7;
 
 		// gets the piece which is to be promoted to (last 2 bits encode promotion type... 0=N, 1=B, 2=R, 3=Q).
 		// Note we use 1 - game->to_play because the apply function has just happened.
-		int prom_piece = (int)((move[2] & 3) + 1);
+		int prom_piece = (move_flag(move) & 3) + 1;
 
 		// subtracts the value of the pawn
 		game->value -= values[0];
@@ -306,19 +915,20 @@ void update_value(struct Game* game, unsigned long long move[3], int captured_pi
 		game->value += get_psqt_value(prom_piece, 7, file2, game->current_np_material);
 	}
 	else {
-		piece_type = (int)((move[2] >> 4) & (unsigned long long)15);
-		piece_type %= 6;
-		int rank1 = rank(move[0]);
-		int file1 = file(move[0]);
-		int rank2 = rank(move[1]);
-		int file2 = file(move[1]);
+		piece_type = move_piece(move) % 6;
+		int square1 = move_from(move);
+		int square2 = move_to(move);
+		int rank1 = square1 >> 3;
+		int file1 = square1 & 7;
+		int rank2 = square2 >> 3;
+		int file2 = square2 & 7;
 
 		if (game->to_play == 0) {
 			rank1 = 7 - rank1;
 			rank2 = 7 - rank2;
 		}
 
-		flag = (int)(move[2] & (unsigned long long)15);
+		flag = move_flag(move);
 
 		game->value -= get_psqt_value(piece_type, rank1, file1, game->current_np_material);
 		game->value += get_psqt_value(piece_type, rank2, file2, game->current_np_material);
@@ -374,139 +984,233 @@ float evaluate(struct Game* game) {
 }
 
 /*
-Adds the killer moves the the move order list. These are moves which have shown to be good enough to produce a beta cutoff in a different position.
-Since the same move often counters many other moves, we keep a track of them and search them right after the transposition table moves.
-Last Modified: 7/10/2023
+Fills in the late_move_reductions table from the late move reduction parameters, so that they don't have to be worked out at every node.
+No move is reduced before late_move_reduction_threshold moves have been searched.
+
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-int add_killer_moves(int start_index, struct Node* node, int* move_order, int num_moves, int ht_move, int* killer_indices) {
-	int i;
-	int j;
-	bool is_killer_1;
-	bool is_killer_2;
-	// loops through the moves comparing the legal moves to the killer moves
-	for (i = 0; i < num_moves; i++) {
-		if (i != ht_move) {
-			is_killer_1 = true;
-			is_killer_2 = true;
-			// loops through the moves to see if it's the same move
-			for (j = 0; j < 3; j++) {
-				if (node->children[i].parent_move[j] != killer_moves[0][j]) {
-					is_killer_1 = false;
-				}
-				if (node->children[i].parent_move[j] != killer_moves[1][j]) {
-					is_killer_2 = false;
-				}
-				// if we already know it's neither move, we break out of the loop
-				if (!(is_killer_1 || is_killer_2)) {
-					break;
-				}
+void set_late_move_reductions() {
+	for (int depth = 0; depth < REDUCTION_TABLE_SIZE; depth++) {
+		for (int moves_searched = 0; moves_searched < REDUCTION_TABLE_SIZE; moves_searched++) {
+			if (depth == 0 || moves_searched == 0 || moves_searched < late_move_reduction_threshold) {
+				late_move_reductions[depth][moves_searched] = 0;
 			}
-			// if the move is the killer move, adds the index to the move order list
-			if (is_killer_1 || is_killer_2) {
-				// changes the killer indices array so that the move_order function knows which indices the killer moves are.
-				if (is_killer_1) {
-					killer_indices[0] = i;
-				}
-				else if (is_killer_2) {
-					killer_indices[1] = i;
-				}
-				move_order[start_index] = i;
-				start_index++;
+			else {
+				late_move_reductions[depth][moves_searched] = (int)(late_move_reduction_base + 
+					log((double)depth) * log((double)moves_searched) / late_move_reduction_divisor);
 			}
 		}
 	}
-	return start_index;
 }
 
+/*
+Returns true if the given player has any pieces other than pawns and the king, using the material key (see calculate_material_key).
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+bool has_non_pawn_material(unsigned long long material_key, int colour) {
+	for (int slot = MATERIAL_KNIGHT; slot <= MATERIAL_QUEEN; slot++) {
+		if (material_count(material_key, colour, slot) != 0) {
+			return true;
+		}
+	}
+	return false;
+}
 
 /*
-Orders the moves so that they can be more efficiently evaluated with the alpha-beta pruning.
-This ordering is largely based off the results of the previous search.
+Returns the number of plies the position in game is from the root of the search.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+int search_ply(struct Game* game) {
+	return game->history_length - node_arena->root_history_length;
+}
+
+/*
+Ages the history table by halving all its scores at the start of each search, so that the results from the earlier moves count for less.
+The killer moves are also cleared, as the plies they were found at no longer line up with the new root.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+void age_quiet_move_tables() {
+	int* scores = &history_table[0][0][0];
+	for (int i = 0; i < 2 * 64 * 64; i++) {
+		scores[i] /= 2;
+	}
+	memset(killer_moves, 0, sizeof(killer_moves));
+}
+
+/*
+Adds a bonus (or a penalty, if it is negative) to a score in the history table. The closer the score already is to HISTORY_MAX in the same
+direction, the less it changes (history gravity), so that the scores stay between -HISTORY_MAX and HISTORY_MAX however many times a move
+causes a cutoff or fails to, while scores which have been pushed one way come back quickly once the move starts doing the opposite.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+void update_history_score(int* score, int bonus) {
+	*score += bonus - *score * abs(bonus) / HISTORY_MAX;
+}
+
+/*
+Updates the tables used to order the quiet moves after a quiet move has caused a beta cutoff: the move becomes the first killer move at 
+this ply and the countermove to the last move, and its history score goes up, while the scores of the quiet moves searched before it go down.
+INPUTS:
+game: Game struct holding the position in which the cutoff happened
+move: move which caused the cutoff
+depth: depth searched from the position
+quiets_searched: quiet moves searched before the move which caused the cutoff
+num_quiets: number of moves in quiets_searched
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+void update_quiet_move_tables(struct Game* game, unsigned int move, int depth, unsigned int* quiets_searched, int num_quiets) {
+	int ply = search_ply(game);
+	if (ply < MAX_PLY && killer_moves[ply][0] != move) {
+		killer_moves[ply][1] = killer_moves[ply][0];
+		killer_moves[ply][0] = move;
+	}
+	// there is no last move at the root of a game set up from a position, or after a null move, so there is nothing for the move to counter
+	if (game->last_move != 0) {
+		countermoves[move_piece(game->last_move)][move_to(game->last_move)] = move;
+	}
+
+	int bonus = depth * depth;
+	update_history_score(&history_table[game->to_play][move_from(move)][move_to(move)], bonus);
+	for (int i = 0; i < num_quiets; i++) {
+		update_history_score(&history_table[game->to_play][move_from(quiets_searched[i])][move_to(quiets_searched[i])], -bonus);
+	}
+}
+
+/*
+Gives each move from first_move to num_moves a score, which is used by pick_move to decide the order in which the moves are searched.
+From the highest scores to the lowest, the moves are:
+1. The hash table move: the best move found for this position by an earlier search (see HashTableData).
+2. Moves which have been evaluated in an earlier iteration of the search, ordered by the value found for them.
+3. Captures and promotions to a queen, ordered by MVV-LVA (most valuable victim, least valuable attacker, see https://www.chessprogramming.org/MVV-LVA),
+   so that e.g pawn takes queen comes before queen takes pawn. A promotion to a queen counts as winning a queen.
+4. Killer moves: quiet moves which have caused a beta cutoff at the same ply in a different position, which often counter many other moves as well.
+5. The countermove: the quiet move which last caused a cutoff in reply to the last move played.
+6. All the other moves, ordered by their score in the history table.
+Unlike the values from previous iterations, this gives a sensible order to the moves of nodes which haven't been searched before.
 
 Inputs:
-move_order: array which stores the order of the indexes of the moves, i.e if move_order[0] = 2, then the move to be searched first
-			is to be found at index 2 in moves
-to_play: 0 if white is next player, 1 if black
-node: Node struct holding the current node and potentially children.
+game: Game struct holding the position
+node: Node struct holding the current node and its children.
+move_order: array in which the indices of the moves are put, in the same order as their scores
+scores: array in which the scores are put
+first_move: index of the first move to score. The moves before this have already been searched in an earlier stage of the move generation.
 num_moves: number of moves in the current position.
-ht_move: hash table move. If the transposition table is hit, but the entry isn't strong enough to warrant an immediate return (e.g depth isn't high enough),
-		the best move stored can still be used to improve the move ordering. If the transposition table has not been hit, ht_move = -1.
+ht_move: index of the hash table move, or -1 if there isn't one among the moves being scored.
 
-Last Modified: 21/7/2022
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-void order_moves(int* move_order, int to_play, struct Node* node, int num_moves, int ht_move) {
-	// initializes the variables used in the function
+void score_moves(struct Game* game, struct Node* node, int* move_order, int* scores, int first_move, int num_moves, int ht_move) {
 	int i;
 	int j;
-	int swap;
-	float current_best;
-	float next_value;
-	struct Node next_node;
-	int current_index = 0;
-	int killer_indices[2] = { -1, -1 };
-
-	// if there is a transposition table hit, the move which was found to be the best the previous time will be tried first this time
-	int start_index = 0;
-	if (ht_move != -1) {
-		move_order[0] = ht_move;
-		start_index = 1;
-	}
-	start_index = add_killer_moves(start_index, node, move_order, num_moves, ht_move, killer_indices);
-
-	// initializes the array to the ordered state, so that a selection sort can be passed over it.
-	j = 0;
-	for (i = start_index; i < num_moves; i++) {
-		// the transposition hash table move and the killer moves have already been added to the front of the array
-		// so we skip adding them to the array later on
-		if (j == ht_move || j == killer_indices[0] || j == killer_indices[1]) {
-			j++;
-		}
-		move_order[i] = j;
-		j++;
-	}
-
-	// only orders the moves if they've been evaluated in a past search
-	if (node->children != 0 && node->children[0].evaluated) {
-		// creates a list ordered by the previous evaluation of each of the moves.
-		for (i = start_index; i < num_moves - 1; i++) {
-			if (node->children[move_order[i]].evaluated) {
-				// current_best is the best move found so far, starting from i (the list before that will be ordered)
-				// current_index is the index of that move within the move_order array
-				current_best = node->children[move_order[i]].value;
-				current_index = i;
-			}
-			else {
-				current_best = -2000;
-				current_index = i;
+	int flag;
+	int victim;
+	unsigned int move;
+	int shift = 6 * (1 - game->to_play);
+	int ply = search_ply(game);
+	unsigned int killer_1 = ply < MAX_PLY ? killer_moves[ply][0] : 0;
+	unsigned int killer_2 = ply < MAX_PLY ? killer_moves[ply][1] : 0;
+	unsigned int countermove = game->last_move != 0 ? countermoves[move_piece(game->last_move)][move_to(game->last_move)] : 0;
+
+	for (i = first_move; i < num_moves; i++) {
+		move_order[i] = i;
+		move = node->children[i].parent_move;
+		flag = move_flag(move);
+
+		if (i == ht_move) {
+			scores[i] = HASH_MOVE_SCORE;
+		}
+		else if (node->children[i].evaluated) {
+			scores[i] = EVALUATED_MOVE_SCORE + (int)(node->children[i].value * 1000);
+		}
+		else if ((flag & 4) != 0 || (flag & 11) == 11) {
+			// finds the type of the piece captured (0 for pawn up to 4 for queen), which is 1 higher so that a non-capture (i.e a promotion) scores 0
+			victim = 0;
+			if (flag == 5) {
+				victim = 1;
 			}
-			// loops through the other moves from i to find the best one, which will be swapped with the one at index i.
-			for (j = i + 1; j < num_moves; j++) {
-				next_node = node->children[move_order[j]];
-				if (next_node.evaluated) {
-					next_value = next_node.value;
-					if (next_value > current_best) {
-						current_best = next_value;
-						current_index = j;
+			else if ((flag & 4) != 0) {
+				for (j = 0; j < 5; j++) {
+					if (((game->board[j + shift] >> move_to(move)) & 1) != 0) {
+						victim = j + 1;
+						break;
 					}
 				}
 			}
-
-			// swaps the best move found after move i and swaps it with move i
-			if (current_index != i) {
-				swap = move_order[i];
-				move_order[i] = move_order[current_index];
-				move_order[current_index] = swap;
+			if ((flag & 11) == 11) {
+				victim += 5;
 			}
+			scores[i] = CAPTURE_SCORE + 10 * victim - move_piece(move) % 6;
+		}
+		else if (move == killer_1) {
+			scores[i] = KILLER_MOVE_SCORE + 1;
+		}
+		else if (move == killer_2) {
+			scores[i] = KILLER_MOVE_SCORE;
+		}
+		else if (move == countermove) {
+			scores[i] = COUNTERMOVE_SCORE;
+		}
+		else {
+			scores[i] = history_table[game->to_play][move_from(move)][move_to(move)];
 		}
 	}
 }
 
-float quiescence(struct Game* game, unsigned long long* zobrist_numbers, int move_number[1], clock_t start_time, double time_allowed,
-	int max_depth, float alpha, float beta, unsigned long long nodes[1], struct HashTableEntry* transposition_table, int table_hits[1],
+/*
+Finds the move with the highest score out of the moves from index to num_moves of move_order, and swaps it to index, returning the index of the child.
+The moves are only picked one at a time as they are needed, since if the first few moves produce a beta cutoff, the rest never need ordering.
+If several moves have the same score, the first one is picked.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+int pick_move(int* move_order, int* scores, int index, int num_moves) {
+	int best = index;
+	int swap;
+	for (int i = index + 1; i < num_moves; i++) {
+		if (scores[i] > scores[best]) {
+			best = i;
+		}
+	}
+	if (best != index) {
+		swap = move_order[index];
+		move_order[index] = move_order[best];
+		move_order[best] = swap;
+		swap = scores[index];
+		scores[index] = scores[best];
+		scores[best] = swap;
+	}
+	return move_order[index];
+}
+
+float quiescence(struct Game* game, unsigned long long* zobrist_numbers, int move_number[1],
+	int max_depth, float alpha, float beta, unsigned long long nodes[1], struct HashTableBucket* transposition_table, int table_hits[1],
 	struct Node* node);
 
+// Returns true if the move is one of the moves skipped at the root by a MultiPV search (see root_excluded_moves).
+// Last Modified: 18/10/2026
+// Last Modified by: Arkleseisure
+bool root_move_excluded(unsigned int move) {
+	for (int i = 0; i < num_root_excluded; i++) {
+		if (root_excluded_moves[i] == move) {
+			return true;
+		}
+	}
+	return false;
+}
+
 /*
 Function which performs a minimax search on the position.
 More info here: https://www.chessprogramming.org/Minimax
@@ -516,8 +1220,6 @@ game: Game struct holding the position to calculate from
 depth: depth to calculate the minimax value to from this position
 zobrist_numbers: numbers used to calculate the values of the hashes of positions, used for draw by repetition.
 move_number: index of the best move in the position in the output array of the legal_moves function. This is then changed within the function so as for it to be returned automatically.
-start_time: time at which the calculation was started (given in terms of clock tick since the start of some local era, often the start of the program).
-time_allowed: time in seconds which the engine has to make its move.
 max_depth: total depth to which the computer is calculating its result to. Different from depth as the function is recursive, and so max_depth is constant throughout the layers, while
 		depth just holds the depth yet to calculate.
 alpha: highest value that white can guarantee themselves higher up the tree... Used to help efficiency of search. See https://www.chessprogramming.org/Alpha-Beta
@@ -526,17 +1228,18 @@ beta: equivalent of alpha, but for black: lowest value black can guarantee thems
 OUTPUT:
 value: value of the position as a float. This value is, as with most traditional engines in terms of pawns of advantage, with + being good for white, - good for black.
 
-Last Modified: 22/9/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-float minimax(struct Game* game, int depth, unsigned long long* zobrist_numbers, int move_number[1], clock_t start_time, double time_allowed,
-	int max_depth, float alpha, float beta, unsigned long long nodes[1], struct HashTableEntry* transposition_table, int table_hits[1],
+float minimax(struct Game* game, int depth, unsigned long long* zobrist_numbers, int move_number[1],
+	int max_depth, float alpha, float beta, unsigned long long nodes[1], struct HashTableBucket* transposition_table, int table_hits[1],
 	struct Node* node) {
 	nodes[0]++;
+	check_time(nodes[0]);
 
 	// once the depth hits 0, the tree is exited
 	if (depth == 0) {
-		float value = quiescence(game, zobrist_numbers, move_number, start_time, time_allowed, max_depth,
+		float value = quiescence(game, zobrist_numbers, move_number, max_depth,
 			alpha, beta, nodes, transposition_table, table_hits, node);
 		// The value of the node is the value when looked at from the opponent's perspective, as that's where it will be accessed from next
 		node->value = -value;
@@ -545,20 +1248,26 @@ float minimax(struct Game* game, int depth, unsigned long long* zobrist_numbers,
 	}
 
 	int i;
-	struct HashTableEntry* entry = &transposition_table[game->hash & ((unsigned long long)hash_table_size - 1)];
+	struct HashTableData entry_data;
+	struct HashTableData* entry = &entry_data;
 	bool hash_table_entry = false;
+	float original_alpha = alpha;
+	// nodes searched with a null window (see principal variation search below) are only used to show that a move is worse than another one, 
+	// whereas the nodes searched with a wider window may be on the principal variation (the line the engine expects to be played)
+	bool pv_node = beta - alpha > NULL_WINDOW;
 
-	if ((((double)clock() - (double)start_time) / CLOCKS_PER_SEC) > time_allowed) {
+	if (out_of_time()) {
 		return -2000;
 	}
-	// Checks whether the part of the hash stored in the entry matches the equivalent part of the current hash, in which case the table is looked at.
-	// The hash is xored with 32 bits of 1s in case hash_table_index_bits has been decreased, in which case the values would otherwise never match due
-	// the automatic truncation when the value was entered into the table.
-	else if (entry->hash == (unsigned int)((game->hash >> hash_table_index_bits) & (((unsigned long long)1 << 32) - 1))) {
+	// Checks whether the position is in the hash table, in which case the information stored about it is looked at.
+	search_counters.hash_probes++;
+	if (get_hash_table_entry(transposition_table, game->hash, entry)) {
 		hash_table_entry = true;
+		search_counters.hash_hits++;
 		// if the value is exact, or provides enough information for an alpha-beta cutoff, the value can be returned immediately.
-		if ((entry->node_type == 0 || (entry->node_type == 1 && entry->value > beta)) && entry->depth >= depth) {
-			move_number[0] = entry->move_number;
+		// This isn't done at the root, which always searches its moves so that the index of the best move can be returned.
+		if ((entry->node_type == 0 || (entry->node_type == 1 && entry->value > beta) || (entry->node_type == 2 && entry->value <= alpha)) 
+			&& entry->depth >= depth && depth < max_depth) {
 			table_hits[0]++;
 			node->value = -entry->value;
 			node->evaluated = true;
@@ -570,185 +1279,314 @@ float minimax(struct Game* game, int depth, unsigned long long* zobrist_numbers,
 		return -node->value;
 	}
 
-	int value = terminal(game);
-	// terminal gives 0 for a win for black, 1 for a draw, 2 for a win for white and 3 for no result.
-	if (value == 1) {
+	// Looks for draws by the 50 move rule, repetition and lack of material. These use the state which is already kept up to date as the moves are applied,
+	// rather than calling terminal, which would also generate the moves again to look for mates (these are found from the moves generated below instead).
+	// They aren't looked for at the root, as the engine still has to return a move there.
+	if (depth < max_depth && (game->ply_counter >= 100 || is_repetition(game) || insufficient_material(game->material_key))) {
 		node->value = 0;
 		node->evaluated = true;
 		return 0;
 	}
-	// if the position is mate, then it returns a very high value, which is slightly higher if it is at lower depth  
-	// (as the depth variable holds the depth yet to search as opposed to the current depth, the sign is the same as that of the returned value) to reward shorter mates
-	else if (value == 2 * game->to_play) {
-		node->value = (float)(1000 + depth);
+
+	// the static evaluation and whether the player to play is in check are used to decide which of the pruning methods below can be used
+	bool in_check = is_attacked(game->board, game->to_play, game->piece_list[15 + 16 * game->to_play].loc);
+	float static_eval = evaluate(game);
+
+	// Reverse futility pruning: close to the leaves, if the static evaluation is so far above beta that no move by the other player is likely
+	// to bring it back down, the node is cut off straight away. See https://www.chessprogramming.org/Reverse_Futility_Pruning
+	if (depth <= reverse_futility_depth && !pv_node && !in_check && beta < 1000 && static_eval - reverse_futility_margin * depth > beta) {
+		node->value = -static_eval;
 		node->evaluated = true;
-		return -node->value;
+		return static_eval;
 	}
-	else if (value == 2 * (1 - game->to_play)) {
-		node->value = (float)(-1000 - depth);
-		node->evaluated = true;
-		return -node->value;
+
+	// Null move pruning: if the position is still good enough for a beta cutoff after passing the turn to the other player, then it is almost certain
+	// that one of the moves will give a cutoff too, so a shallow search of the null move is used instead of searching all the moves.
+	// See https://www.chessprogramming.org/Null_Move_Pruning
+	// It isn't tried on the principal variation, when in check (where passing is illegal), right after another null move, when a mate has been found, 
+	// or when the player to play only has pawns, as those are the endgames where passing would often be the best move (zugzwang).
+	if (depth >= null_move_min_depth && !pv_node && !null_move_disabled && !after_null_move(game) && beta < 1000
+		&& has_non_pawn_material(game->material_key, game->to_play) && static_eval > beta && !in_check) {
+		// the null move searches are never used for move ordering, so the node isn't stored in the tree
+		struct Node null_node;
+		memset(&null_node, 0, sizeof(null_node));
+		int null_depth = depth - 1 - null_move_reduction;
+		if (null_depth < 0) {
+			null_depth = 0;
+		}
+
+		// as the value of the position is always from the perspective of the player to play, it flips when the turn passes
+		make_null_move(game, zobrist_numbers);
+		game->value = -game->value;
+		float null_value = -minimax(game, null_depth, zobrist_numbers, move_number, max_depth, -beta - NULL_WINDOW, -beta,
+			nodes, transposition_table, table_hits, &null_node);
+		unmake_null_move(game);
+
+		if (out_of_time()) {
+			return -2000;
+		}
+		if (null_value > beta) {
+			// at high depths the cutoff is checked with a search of the real moves at the reduced depth, which catches most zugzwangs
+			if (null_move_verification_depth > 0 && depth >= null_move_verification_depth) {
+				null_move_disabled = true;
+				null_value = minimax(game, null_depth, zobrist_numbers, move_number, max_depth, alpha, beta, 
+					nodes, transposition_table, table_hits, node);
+				null_move_disabled = false;
+			}
+			// mates found after a null move aren't real, as passing isn't allowed
+			if (null_value > beta) {
+				if (null_value >= 1000) {
+					null_value = beta + NULL_WINDOW;
+				}
+				node->value = -null_value;
+				node->evaluated = true;
+				return null_value;
+			}
+		}
 	}
 
-	unsigned long long removed_hash[1];
 	int child_move_number[1] = { 0 };
 
-	// if the node.children array hasn't been filled with the child nodes, this has to now be completed.
-	if (node->children == 0) {
-		unsigned long long moves[220][3];
-		int num_moves = legal_moves(game, moves);
-		node->children = (struct Node*)calloc(num_moves, sizeof(struct Node));
-		if (!node->children) {
+	// if there is a hash table (transposition table) move, this sets ht_move to the index of its child so that it can be searched first.
+	unsigned int hash_table_move = 0;
+	if (hash_table_entry) {
+		hash_table_move = entry->move;
+	}
+
+	// children in the scratch stack may have been overwritten by another node since this node was last searched, so they are generated again
+	if (in_scratch_stack(node_arena, node->children)) {
+		node->children = NULL;
+		node->num_moves = 0;
+		node->generated = 0;
+	}
+
+	// The child nodes are generated in stages: first the captures and promotions, and then the quiet moves once the captures have been searched,
+	// so that if a capture produces a cutoff, the quiet moves never have to be generated.
+	// If the hash table move is a quiet move, all the moves are generated straight away so that it can still be searched first.
+	if (node->generated == 0 && !add_child_nodes(game, node, CAPTURE_MOVES)) {
+		return 0;
+	}
+	int ht_move = find_hash_table_move(node, hash_table_move);
+	if (ht_move == -1 && hash_table_move != 0 && node->generated != ALL_MOVES) {
+		if (!add_child_nodes(game, node, QUIET_MOVES)) {
 			return 0;
 		}
-		node->num_moves = num_moves;
-		// adds the parent moves of each of the nodes
-		for (i = 0; i < num_moves; i++) {
-			memcpy(node->children[i].parent_move, moves[i], 3 * sizeof(moves[i][0]));
-		}
+		ht_move = find_hash_table_move(node, hash_table_move);
 	}
 
 	// initializes the value of this node to a really bad value so that it will be immediately replaced
 	float node_value;
 	node_value = -2000;
 
-	// if there is a hash table (transposition table) move, this sets ht_move to it so that it can be searched first.
-	int ht_move = -1;
-	if (hash_table_entry && entry->move_number < node->num_moves) {
-		ht_move = entry->move_number;
-	}
-
-	// produces a move order array containing the order in which the moves are to be evaluated
-	int* move_order = malloc(220 * sizeof(int));
-	if (!move_order) {
-		return 0;
-	}
-	order_moves(move_order, game->to_play, node, node->num_moves, ht_move);
+	// scores the moves so that they can be picked in the order in which they are to be evaluated
+	int move_order[220];
+	int scores[220];
+	int first_move = 0;
+	score_moves(game, node, move_order, scores, first_move, node->num_moves, ht_move);
 
-	// initializes variables which allow the moves to be undone.
+	// initializes variables needed to update the value after each move (make/unmake handle everything else).
 	float child_value;
-	float prev_value = game->value;
 	float prev_material = game->current_np_material;
 	int captured_piece;
-	int previous_castling = game->castling;
-	int previous_ply_counter = game->ply_counter;
-	unsigned long long previous_last_move[3];
-	memcpy(previous_last_move, game->last_move, 3 * sizeof(game->last_move[0]));
 	int current_index;
-	int depth_searched = depth - 1;
-	bool needs_full_search = true;
-	float reduced_search_value;
+	int best_index = 0;
+	int depth_searched;
 	unsigned long long last_pawn_board_white = game->board[0];
 	unsigned long long last_pawn_board_black = game->board[6];
+	// quiet moves which have been searched, whose history scores go down if a later quiet move causes a cutoff
+	unsigned int quiets_searched[220];
+	int num_quiets = 0;
+	unsigned int move;
+	bool quiet_move;
+	bool gives_check;
+	int reduction;
+	// the killer moves at this ply, which aren't reduced as they are likely to be good moves
+	int ply = search_ply(game);
+	unsigned int killer_1 = ply < MAX_PLY ? killer_moves[ply][0] : 0;
+	unsigned int killer_2 = ply < MAX_PLY ? killer_moves[ply][1] : 0;
+	// in a MultiPV search, the moves already found are skipped at the root, so the first move searched is the first one which isn't skipped
+	bool excluding_moves = ply == 0 && num_root_excluded > 0;
+	int moves_skipped = 0;
+
+	// Futility pruning: close to the leaves, if the static evaluation is so far below alpha that a quiet move is unlikely to bring it back up,
+	// the quiet moves after the first one are skipped (apart from checks). This isn't done in check, at the root or when a mate has been found.
+	// See https://www.chessprogramming.org/Futility_Pruning
+	float futility_value = static_eval + futility_margin * depth;
+	bool futility_pruning = depth <= futility_depth && depth < max_depth && !in_check && alpha > -1000 && alpha < 1000 && futility_value <= alpha;
 
 	// Loops through the legal moves, calculating the value for each move.
-	for (i = 0; i < node->num_moves; i++) {
-		current_index = move_order[i];
+	for (i = 0; i < node->num_moves || node->generated != ALL_MOVES; i++) {
+		// once the captures have all been searched, the quiet moves are generated and ordered
+		if (i == node->num_moves) {
+			first_move = node->num_moves;
+			if (!add_child_nodes(game, node, QUIET_MOVES)) {
+				return node_value;
+			}
+			if (first_move == node->num_moves) {
+				break;
+			}
+			score_moves(game, node, move_order, scores, first_move, node->num_moves, -1);
+		}
+		current_index = pick_move(move_order, scores, i, node->num_moves);
+		move = node->children[current_index].parent_move;
+		if (excluding_moves && root_move_excluded(move)) {
+			moves_skipped++;
+			continue;
+		}
 		// applies the move and updates the value held by game
-		captured_piece = apply(game, node->children[current_index].parent_move, zobrist_numbers, removed_hash);
-		update_value(game, node->children[current_index].parent_move, captured_piece, last_pawn_board_white, last_pawn_board_black, prev_material);
-
-		// the depth searched is reduced for later moves as they are less likely to produce a good move
-		if ((i >= late_move_reduction_threshold) && (depth >= 2)) {
-			needs_full_search = false;
-			depth_searched = depth - 2;
-			reduced_search_value = -minimax(game, depth_searched, zobrist_numbers, child_move_number, start_time, time_allowed,
-				max_depth, -beta, -alpha, nodes, transposition_table, table_hits, &(node->children[current_index]));
-			// good moves are searched to the full depth
-			if (reduced_search_value > node_value) {
-				needs_full_search = true;
-				depth_searched = depth - 1;
+		captured_piece = make(game, move, zobrist_numbers);
+		update_value(game, move, captured_piece, last_pawn_board_white, last_pawn_board_black, prev_material);
+		// captures and promotions are never pruned or reduced, so whether the move gives check is only needed for quiet moves
+		quiet_move = (move_flag(move) & 12) == 0;
+		gives_check = quiet_move && is_attacked(game->board, game->to_play, game->piece_list[15 + 16 * game->to_play].loc);
+
+		// skips the quiet moves which can't reach alpha (see futility pruning above), as long as they don't give check.
+		// The value of the node can still be as high as futility_value, which is below alpha, so it is kept as an upper bound.
+		if (futility_pruning && i > 0 && quiet_move && !gives_check) {
+			unmake(game);
+			if (futility_value > node_value) {
+				node_value = futility_value;
 			}
+			continue;
 		}
-		// The first move is fully searched, as are later moves which the reduced search has shown to be strong
-		if (needs_full_search) {
-			// We are using NegaMax (same as minimax, but the maximiser is always the player to play),
-			// so the value flips at every depth, along with alpha and beta, see https://www.chessprogramming.org/Negamax
-			child_value = -minimax(game, depth_searched, zobrist_numbers, child_move_number, start_time, time_allowed,
+
+		// We are using NegaMax (same as minimax, but the maximiser is always the player to play),
+		// so the value flips at every depth, along with alpha and beta, see https://www.chessprogramming.org/Negamax
+		// The first move is searched with the full window, as with good move ordering it is usually the best move.
+		if (i == moves_skipped) {
+			child_value = -minimax(game, depth - 1, zobrist_numbers, child_move_number,
 				max_depth, -beta, -alpha, nodes, transposition_table, table_hits, &(node->children[current_index]));
 		}
+		// Principal variation search: the later moves are searched with a null window, which only shows whether the move is better than alpha,
+		// but is much quicker than a full search. See https://www.chessprogramming.org/Principal_Variation_Search
+		else {
+			// Late move reductions: with good move ordering the later moves are less likely to be good, so they are searched to a lower depth,
+			// see https://www.chessprogramming.org/Late_Move_Reductions. Captures, promotions, checks, killer moves and the moves of a player 
+			// in check aren't reduced, as those are where reducing would miss tactics, and nodes on the principal variation are reduced by 1 less.
+			depth_searched = depth - 1;
+			if (quiet_move && !gives_check && !in_check && move != killer_1 && move != killer_2) {
+				reduction = late_move_reductions[depth < REDUCTION_TABLE_SIZE ? depth : REDUCTION_TABLE_SIZE - 1][i < REDUCTION_TABLE_SIZE ? i : REDUCTION_TABLE_SIZE - 1];
+				if (pv_node && reduction > 0) {
+					reduction--;
+				}
+				depth_searched -= reduction;
+				if (depth_searched < 0) {
+					depth_searched = 0;
+				}
+			}
+			child_value = -minimax(game, depth_searched, zobrist_numbers, child_move_number,
+				max_depth, -alpha - NULL_WINDOW, -alpha, nodes, transposition_table, table_hits, &(node->children[current_index]));
+			// moves which beat alpha in the reduced search are searched again to the full depth
+			if (child_value > alpha && depth_searched < depth - 1) {
+				child_value = -minimax(game, depth - 1, zobrist_numbers, child_move_number,
+					max_depth, -alpha - NULL_WINDOW, -alpha, nodes, transposition_table, table_hits, &(node->children[current_index]));
+			}
+			// and if the move still beats alpha, but not beta, it is searched again with the full window to find its actual value
+			if (child_value > alpha && child_value < beta && beta - alpha > NULL_WINDOW) {
+				child_value = -minimax(game, depth - 1, zobrist_numbers, child_move_number,
+					max_depth, -beta, -alpha, nodes, transposition_table, table_hits, &(node->children[current_index]));
+			}
+		}
 		// returns values and position of board to what they were previously
-		game->value = prev_value;
-		game->current_np_material = prev_material;
-		unapply(game, node->children[current_index].parent_move, removed_hash[0], captured_piece, previous_castling,
-			previous_ply_counter, previous_last_move);
+		unmake(game);
 
 		// quits the function if the time allowed has been passed
-		if (((double)clock() - (double)start_time) / CLOCKS_PER_SEC > time_allowed) {
-			free(move_order);
+		if (out_of_time()) {
 			return node_value;
 		}
 		if (child_value > node_value) {
 			node_value = child_value;
 			move_number[0] = current_index;
+			best_index = current_index;
 			// alpha beta pruning: if the other player can already guarantee themselves a better score higher up the tree, they won't need to search this path.
 			if (node_value > beta) {
-				add_hash_table_entry(transposition_table, game->hash, depth, 1, node_value, current_index);
+				search_counters.beta_cutoffs++;
+				if (i == moves_skipped) {
+					search_counters.first_move_cutoffs++;
+				}
+				// the value found when some of the moves at the root are skipped isn't the real value of the position, so it isn't stored
+				if (!excluding_moves) {
+					add_hash_table_entry(transposition_table, game->hash, depth, 1, node_value, node->children[current_index].parent_move);
+				}
 				node->value = -node_value;
 				node->evaluated = true;
-				free(move_order);
-				// updates the killer moves
-				memcpy(killer_moves[1], killer_moves[0], 3 * sizeof(killer_moves[0][0]));
-				memcpy(killer_moves[0], node->children[current_index].parent_move, 3 * sizeof(node->children[current_index].parent_move[0]));
+				// updates the killer moves, history and countermoves if the move is a quiet move (the captures are already ordered well by MVV-LVA)
+				if (quiet_move) {
+					update_quiet_move_tables(game, move, depth, quiets_searched, num_quiets);
+				}
 				return node_value;
 			}
 			else if (node_value > alpha) {
 				alpha = node_value;
 			}
 		}
+		if (quiet_move) {
+			quiets_searched[num_quiets] = move;
+			num_quiets++;
+		}
+	}
+	// if there are no legal moves, the position is checkmate if the king is in check and stalemate if it isn't.
+	// Mate returns a very high value, which is slightly higher if it is at lower depth (as the depth variable holds the depth yet to search 
+	// as opposed to the current depth, the sign is the same as that of the returned value) to reward shorter mates
+	if (node->num_moves == 0) {
+		if (in_check) {
+			node->value = (float)(1000 + depth);
+		}
+		else {
+			node->value = 0;
+		}
+		node->evaluated = true;
+		return -node->value;
+	}
+
+	// if none of the moves beat alpha, the value is only an upper bound for the value of the position
+	if (!excluding_moves) {
+		add_hash_table_entry(transposition_table, game->hash, depth, node_value > original_alpha ? 0 : 2, node_value, node->children[best_index].parent_move);
 	}
-	add_hash_table_entry(transposition_table, game->hash, depth, 0, node_value, move_number[0]);
 	node->value = -node_value;
 	node->evaluated = true;
-	free(move_order);
 	return node_value;
 }
 
-float run_quiescence(struct Game* game, unsigned long long* zobrist_numbers, int move_number[1], clock_t start_time, double time_allowed,
-	int max_depth, float alpha, float beta, unsigned long long nodes[1], struct HashTableEntry* transposition_table, int table_hits[1],
-	struct Node* node, unsigned long long* move) {
+float run_quiescence(struct Game* game, unsigned long long* zobrist_numbers, int move_number[1],
+	int max_depth, float alpha, float beta, unsigned long long nodes[1], struct HashTableBucket* transposition_table, int table_hits[1],
+	struct Node* node, unsigned int move) {
 
-	int i;
 	float value = 0;
-	// in order to return the game to its original state after applying a move, certain values have to be stored so that they can be quickly regained.
-	float prev_value = game->value;
+	// the game's undo stack restores the position after the move, only the values needed by update_value are stored here.
 	float prev_material = game->current_np_material;
-	int previous_castling = game->castling;
-	int previous_ply_counter = game->ply_counter;
-	unsigned long long previous_last_move[3];
-	memcpy(previous_last_move, game->last_move, 3 * sizeof(game->last_move[0]));
 
 	int captured_piece;
-	unsigned long long removed_hash[1];
 	unsigned long long last_pawn_board_white = game->board[0];
 	unsigned long long last_pawn_board_black = game->board[6];
 
 	nodes[0]++;
-	captured_piece = apply(game, move, zobrist_numbers, removed_hash);
+	search_counters.quiescence_nodes++;
+	check_time(nodes[0]);
+	captured_piece = make(game, move, zobrist_numbers);
 	//printf("Quiescence move: ");
 	//print_move(move);
 	update_value(game, move, captured_piece, last_pawn_board_white, last_pawn_board_black, prev_material);
-	value = -quiescence(game, zobrist_numbers, move_number, start_time, time_allowed, max_depth, -beta, -alpha, nodes, transposition_table, table_hits, node);
-	game->value = prev_value;
-	game->current_np_material = prev_material;
-	unapply(game, move, removed_hash[0], captured_piece, previous_castling, previous_ply_counter, previous_last_move);
+	value = -quiescence(game, zobrist_numbers, move_number, max_depth, -beta, -alpha, nodes, transposition_table, table_hits, node);
+	unmake(game);
 
 	return value;
 }
 /*
 Function used to perform a quiescence search (i.e verify that the position is quiet before being evaluated)
+Only the captures and promotions are generated, unless the side to play is in check, in which case it searches all the moves with minimax.
 
-Last Modified: 25/7/2022
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-float quiescence(struct Game* game, unsigned long long* zobrist_numbers, int move_number[1], clock_t start_time, double time_allowed,
-	int max_depth, float alpha, float beta, unsigned long long nodes[1], struct HashTableEntry* transposition_table, int table_hits[1],
+float quiescence(struct Game* game, unsigned long long* zobrist_numbers, int move_number[1],
+	int max_depth, float alpha, float beta, unsigned long long nodes[1], struct HashTableBucket* transposition_table, int table_hits[1],
 	struct Node* node) {
 
 
 	// if in check, increases the depth by 1.
 	if (is_attacked(game->board, game->to_play, game->piece_list[15 + 16 * game->to_play].loc)) {
-		return minimax(game, 1, zobrist_numbers, move_number, start_time, time_allowed, max_depth, alpha, beta, nodes, transposition_table, table_hits, node);
+		return minimax(game, 1, zobrist_numbers, move_number, max_depth, alpha, beta, nodes, transposition_table, table_hits, node);
 	}
 	/*
 	Gets current evaluation: we assume that the current position is not zugzwang and so there will be a move that will improve the evaluation.
@@ -761,27 +1599,26 @@ float quiescence(struct Game* game, unsigned long long* zobrist_numbers, int mov
 		return stand_pat;
 	}
 
-	if ((((double)clock() - (double)start_time) / CLOCKS_PER_SEC) > time_allowed) {
+	if (out_of_time()) {
 		return 0;
 	}
 
-	// gets the legal moves for the position
+	// Delta pruning: if capturing a queen still couldn't take the position above alpha, then no capture can, so none are searched.
+	// This isn't done if the player to play has a pawn about to promote, as the promotion adds to the value of the capture.
+	// See https://www.chessprogramming.org/Delta_Pruning
+	unsigned long long promotion_rank = game->to_play == 0 ? 0xFF000000000000ULL : 0xFF00ULL;
+	if (stand_pat + values[4] + quiescence_safety_margin <= alpha && (game->board[6 * game->to_play] & promotion_rank) == 0) {
+		return stand_pat;
+	}
+
+	// gets the captures and promotions for the position, as these are the only moves which are searched.
+	// They aren't stored in the tree, as the quiescence search doesn't use the results of previous searches to order its moves.
 	int i;
 	int j;
-
-	// if the node.children array hasn't been filled with the child nodes, this has to now be completed.
-	if (node->children == 0) {
-		unsigned long long moves[220][3];
-		int num_moves = legal_moves(game, moves);
-		node->children = (struct Node*)calloc(num_moves, sizeof(struct Node));
-		if (!node->children) {
-			return stand_pat;
-		}
-		node->num_moves = num_moves;
-		for (i = 0; i < num_moves; i++) {
-			memcpy(node->children[i].parent_move, moves[i], 3 * sizeof(moves[i][0]));
-		}
-	}
+	unsigned int moves[220];
+	int num_moves = generate_legal_moves(game->board, game->to_play, game->castling, game->last_move, game->piece_list, CAPTURE_MOVES, moves);
+	// node used for the search of each move, which is only needed if the search goes back into minimax because of a check
+	struct Node child;
 
 	int shift = 6 * (1 - game->to_play);
 
@@ -791,9 +1628,10 @@ float quiescence(struct Game* game, unsigned long long* zobrist_numbers, int mov
 	float new_value = stand_pat;
 	float best_value = stand_pat;
 
-	for (i = 0; i < node->num_moves; i++) {
+	for (i = 0; i < num_moves; i++) {
 		// the flag indicates the type of move
-		flag = (int)(node->children[i].parent_move[2] & 15);
+		flag = move_flag(moves[i]);
+		memset(&child, 0, sizeof(child));
 
 		/*
 		The position will be expanded if:
@@ -801,27 +1639,27 @@ float quiescence(struct Game* game, unsigned long long* zobrist_numbers, int mov
 		2. A piece is attacking another with higher value, high enough to compete with the best move searched higher up.
 		*/
 		if ((flag & 11) == 11) {
-			new_value = run_quiescence(game, zobrist_numbers, move_number, start_time, time_allowed, max_depth, alpha, beta, nodes,
-				transposition_table, table_hits, &(node->children[i]), node->children[i].parent_move);
+			new_value = run_quiescence(game, zobrist_numbers, move_number, max_depth, alpha, beta, nodes,
+				transposition_table, table_hits, &child, moves[i]);
 		}
 		// if the move is a capture, it looks to see if the capture is of a piece more valuable than itself.
 		else if ((flag & 4) != 0) {
 			// type of piece captured, 0 for pawn through to 5 for king in order of value
-			piece = (int)((node->children[i].parent_move[2] >> 4) & 15) % 6;
+			piece = move_piece(moves[i]) % 6;
 			// finds pieces which are higher value than the piece doing the capturing, and verifies that the capture is going to provide a value 
 			// which might compare with the best score than it can guarantee itself higher up (otherwise there is no use in searching)
 			for (j = piece + 1; j < 5; j++) {
 				if (stand_pat + quiescence_safety_margin + values[j] > alpha) {
 					// if any of the higher value pieces is the one captured by this move, the move is expanded.
-					if ((game->board[j + shift] & node->children[i].parent_move[1]) != 0) {
-						new_value = run_quiescence(game, zobrist_numbers, move_number, start_time, time_allowed, max_depth, alpha, beta, nodes, transposition_table, table_hits, &(node->children[i]), node->children[i].parent_move);
+					if (((game->board[j + shift] >> move_to(moves[i])) & 1) != 0) {
+						new_value = run_quiescence(game, zobrist_numbers, move_number, max_depth, alpha, beta, nodes, transposition_table, table_hits, &child, moves[i]);
 						break;
 					}
 				}
 			}
 		}
 
-		if ((((double)clock() - (double)start_time) / CLOCKS_PER_SEC) > time_allowed) {
+		if (out_of_time()) {
 			return 0;
 		}
 
@@ -841,127 +1679,594 @@ float quiescence(struct Game* game, unsigned long long* zobrist_numbers, int mov
 }
 
 /*
-Frees the memory allocated to the nodes by recursively looking into the children of the parent node
-
-Last Modified: 24/7/2022
+Information used by each thread of the search. Every thread searches the same root position with its own copy of the game, its own tree of nodes,
+killer moves and node counters, sharing only the transposition table (this is known as Lazy SMP, see https://www.chessprogramming.org/Lazy_SMP).
+The threads help each other out through the transposition table, as the positions searched by one thread can then be skipped by the others.
+game: the thread's copy of the game
+arena: the thread's node arena, which holds its tree of nodes
+main_thread: whether this is the main thread, which is the only one whose statistics are recorded (see SearchStats)
+depth: depth the thread is going to search to next
+completed_depth: deepest depth the thread has finished searching (0 if it hasn't finished any)
+move_number: index of the best move found in the last search which returned a value (-1 if there hasn't been one yet)
+value: value found by the last search which returned a value, from the perspective of the player to play
+nodes, table_hits: number of nodes searched and hash table hits by this thread
+
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-void free_node(struct Node* root_node) {
-	for (int i = 0; i < root_node->num_moves; i++) {
-		free_node(&(root_node->children[i]));
-	}
-	free(root_node->children);
-}
+struct SearchThread {
+	struct Thread thread;
+	struct Game* game;
+	struct NodeArena* arena;
+	unsigned long long* zobrist_numbers;
+	struct HashTableBucket* transposition_table;
+	bool main_thread;
+	int depth;
+	int completed_depth;
+	int move_number;
+	float value;
+	unsigned long long nodes;
+	int table_hits;
+};
 
 /*
-Frees all the memory which has been allocated during the search.
+Function run by each thread of the search. It works by looping through, starting at a low depth until it reaches the allocated time.
+This is actually an efficient way to do it, as when using alpha-beta pruning, the order in which the moves are search heavily
+affects the number of nodes which can be pruned, and hence we can use the results from previous depths to optimise the move ordering
+so that the overall search is more efficient.
+search_thread: pointer to the SearchThread struct for this thread.
 
-Last Modified: 24/7/2022
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-void free_stuff(struct HashTableEntry* transposition_table, struct Node* root_node) {
-	free(transposition_table);
-	free_node(root_node);
+void iterative_deepening(void* search_thread) {
+	struct SearchThread* thread = search_thread;
+	float value;
+	float alpha;
+	float beta;
+	float window;
+	int move_number[1] = { 0 };
+	unsigned long long nodes[1] = { 0 };
+	int table_hits[1] = { 0 };
+	double iteration_start_time;
+	double last_iteration_time = 0;
+	double previous_iteration_time = 0;
+	unsigned long long iteration_start_nodes;
+	int iteration_start_table_hits;
+	struct SearchStats* stats;
+
+	// the tree of nodes from the previous move is thrown away by emptying the arena
+	node_arena = thread->arena;
+	reset_node_arena(node_arena, thread->game);
+	age_quiet_move_tables();
+	struct Node* root_node = &node_arena->root;
+	if (thread->main_thread) {
+		num_search_stats = 0;
+	}
+
+	// as long as there is time for another depth (see start_next_iteration), the program will keep on calculating the minimax value at greater and greater depth
+	while (thread->depth <= time_manager.max_depth && start_next_iteration(last_iteration_time, previous_iteration_time)) {
+		iteration_start_time = wall_clock();
+		iteration_start_nodes = nodes[0];
+		iteration_start_table_hits = table_hits[0];
+		memset(&search_counters, 0, sizeof(search_counters));
+
+		// Aspiration windows: the value is unlikely to change much from one depth to the next, so the search is done with a window around the
+		// last value, which allows more cutoffs. If the value falls outside the window, the window is widened on that side and the search is 
+		// done again. See https://www.chessprogramming.org/Aspiration_Windows
+		alpha = -2000;
+		beta = 2000;
+		window = aspiration_window;
+		if (thread->move_number >= 0) {
+			alpha = thread->value - window;
+			beta = thread->value + window;
+		}
+		while (true) {
+			value = minimax(thread->game, thread->depth, thread->zobrist_numbers, move_number, thread->depth, 
+				alpha, beta, nodes, thread->transposition_table, table_hits, root_node);
+			if (out_of_time() || (value > alpha && value <= beta)) {
+				break;
+			}
+			window *= 2;
+			if (value <= alpha) {
+				alpha = value - window < -2000 ? -2000 : value - window;
+			}
+			else {
+				beta = value + window > 2000 ? 2000 : value + window;
+			}
+		}
+		previous_iteration_time = last_iteration_time;
+		last_iteration_time = wall_clock() - iteration_start_time;
+
+		// records the statistics for this depth
+		if (thread->main_thread) {
+			stats = &search_stats[num_search_stats];
+			memcpy(stats, &search_counters, sizeof(struct SearchStats));
+			stats->depth = thread->depth;
+			stats->value = thread->game->to_play == 0 ? value : -value;
+			stats->completed = !out_of_time();
+			stats->time = last_iteration_time;
+			stats->nodes = nodes[0] - iteration_start_nodes;
+			stats->hash_cutoffs = (unsigned long long)(table_hits[0] - iteration_start_table_hits);
+			num_search_stats++;
+		}
+		thread->depth++;
+
+		// if the evaluation of the first node was cut short, it will return -2000 as a value and this search should be disregarded, as should a search 
+		// which was cut short while failing low, since the best move it found may be worse than the move from the last depth.
+		if (value != -2000 && value > alpha) {
+			thread->value = value;
+			thread->move_number = move_number[0];
+			if (!out_of_time()) {
+				thread->completed_depth = thread->depth - 1;
+			}
+
+			// if it has found a mate, plays the move which leads to mate.
+			if (value > 1000 || value < -1000) {
+				break;
+			}
+		}
+	}
+	thread->nodes = nodes[0];
+	thread->table_hits = table_hits[0];
 }
 
 /*
-Function to get the move of the engine in a particular position, using the minimax funtion.
-It works by looping through, starting at depth 1 until it reaches the allocated time.
-This is actually an efficient way to do it, as when using alpha-beta pruning, the order in which the moves are search heavily
-affects the number of nodes which can be pruned, and hence we can use the results from previous depths to optimise the move ordering
-so that the overall search is more efficient.
+Searches a position using the minimax funtion until the time manager or stop_search stops it, which must both be set up before this is called.
+The search can be split between several threads (see the SearchThread struct), in which case the move is the one found by the main thread,
+while the other threads just help to fill up the transposition table.
 
 INPUTS:
 game: Game struct holding the position from which to get the engine move.
 zobrist_numbers: numbers used to calculate the hash of the position, allowing us to find draws by repetition
 current_move_number: index of the current best move in the moves array, used to return the best move to the main program
-time_allowed: time allowed for the program to make its move.
+current_value: used to return the evaluation of the position (+ good for white)
+depth: depth to start searching from, which is used to return the depth reached by the main thread
+nodes: used to return the total number of nodes searched by all the threads
+threads: number of threads used for the search
 
-Last Modified: 22/9/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-void get_engine_move(struct Game* game, unsigned long long* zobrist_numbers, int* current_move_number, double time_allowed, float current_value[1], int depth[1], unsigned long long nodes[1]) {
+void search_position(struct Game* game, unsigned long long* zobrist_numbers, int* current_move_number, float current_value[1], int depth[1], 
+	unsigned long long nodes[1], int threads) {
 	srand((unsigned)time(NULL));
-	clock_t start_time;
-	start_time = clock();
-	float value;
+	int i;
 	fully_evaluate(game);
-	unsigned long long moves[220][3];
-	int move_number[1] = { 0 };
-	int table_hits[1] = { 0 };
-	struct HashTableEntry* transposition_table = (struct HashTableEntry*)malloc(hash_table_size * sizeof(struct HashTableEntry));
+	unsigned int moves[220];
 
 	int num_moves = legal_moves(game, moves);
 
-	bool hash_table_generated = false;
-	while (!hash_table_generated) {
-		if (transposition_table == NULL) {
-			hash_table_size >>= 1;
-			hash_table_index_bits -= 1;
-			printf("Transposition table generation failed, now trying with size %d.\n", hash_table_index_bits);
-			transposition_table = (struct HashTableEntry*)malloc(hash_table_size * sizeof(struct HashTableEntry));
-		}
-		else {
-			hash_table_generated = true;
-		}
-	}
-
-	clock_t current_time;
-	double time_taken;
-	double time_change;
-	clock_t previous_time;
-	current_time = clock();
-	time_taken = ((double)current_time - (double)start_time) / CLOCKS_PER_SEC;
-
-	struct Node* root_node = &(struct Node) {
-		.value = 0,
-			.evaluated = false,
-			.children = 0,
-			.num_moves = num_moves,
-			.parent_move = { game->last_move[0], game->last_move[1], game->last_move[2] }
-	};
-
-	// as long as the time hasn't elapsed, the program will keep on calculating the minimax value at greater and greater depth
-	while (time_taken < time_allowed) {
-		//printf("Depth: %d\n", depth[0]);
-		value = minimax(game, depth[0], zobrist_numbers, move_number, start_time, time_allowed, depth[0], (float)-2000, (float)2000, nodes, transposition_table, table_hits, root_node);
-		//printf("Value: %f\n", value);
-		previous_time = current_time;
-		current_time = clock();
-		time_change = ((double)current_time - (double)previous_time) / CLOCKS_PER_SEC;
-		time_taken = ((double)current_time - (double)start_time) / CLOCKS_PER_SEC;
-		depth[0]++;
-
-		// if the evaluation of the first node was cut short, it will return -2000 as a value and this search should be disregarded.
-		if (value != -2000) {
-			if (game->to_play == 0) {
-				current_value[0] = value;
-			}
-			else {
-				current_value[0] = -value;
-			}
-			current_move_number[0] = move_number[0];
+	set_late_move_reductions();
 
-			// if it has found a mate, plays the move which leads to mate.
-			// equally if the time remaining is less than the time taken for the previous depth, 
-			// it is assumed that it will not make it to the next depth and so returns
-			if (value > 1000 || value < -1000) {
-				free_stuff(transposition_table, root_node);
-				return;
+	// the transposition table is kept from the previous moves, with a new generation so that the entries from them are replaced first
+	if (!allocate_hash_table()) {
+		return;
+	}
+	hash_table_generation++;
+
+	// sets up the threads, with half of the helper threads starting a depth deeper than the main thread so that they spend less time
+	// searching exactly the same thing. The main thread uses the game passed in, while the others each get their own copy.
+	if (threads < 1) {
+		threads = 1;
+	}
+	if (!allocate_node_arenas(threads)) {
+		return;
+	}
+	struct SearchThread* search_threads = calloc(threads, sizeof(struct SearchThread));
+	if (search_threads == NULL) {
+		return;
+	}
+	for (i = 0; i < threads; i++) {
+		search_threads[i].game = game;
+		search_threads[i].arena = &node_arenas[i];
+		if (i > 0) {
+			// if the memory for another copy of the game can't be found, the search goes ahead with the threads which already have one
+			search_threads[i].game = malloc(sizeof(struct Game));
+			if (search_threads[i].game == NULL) {
+				threads = i;
+				break;
 			}
+			memcpy(search_threads[i].game, game, sizeof(struct Game));
 		}
+		search_threads[i].zobrist_numbers = zobrist_numbers;
+		search_threads[i].transposition_table = transposition_table;
+		search_threads[i].main_thread = i == 0;
+		search_threads[i].depth = depth[0] + (i & 1);
+		search_threads[i].move_number = -1;
 	}
-	free_stuff(transposition_table, root_node);
-	if (move_number[0] >= num_moves) {
+
+	// runs the helper threads, with this thread being the main thread
+	int threads_started = 1;
+	while (threads_started < threads && start_thread(&search_threads[threads_started].thread, iterative_deepening, &search_threads[threads_started])) {
+		threads_started++;
+	}
+	iterative_deepening(&search_threads[0]);
+	stop_search = true;
+	for (i = 1; i < threads_started; i++) {
+		join_thread(&search_threads[i].thread);
+	}
+
+	for (i = 0; i < threads_started; i++) {
+		nodes[0] += search_threads[i].nodes;
+	}
+	for (i = 1; i < threads; i++) {
+		free(search_threads[i].game);
+	}
+
+	depth[0] = search_threads[0].completed_depth;
+	if (search_threads[0].move_number >= 0) {
+		if (game->to_play == 0) {
+			current_value[0] = search_threads[0].value;
+		}
+		else {
+			current_value[0] = -search_threads[0].value;
+		}
+		current_move_number[0] = search_threads[0].move_number;
+	}
+	if (search_threads[0].move_number >= num_moves) {
 		printf("Move out of range\n");
 		printf("Board:\n");
 		print_board(game->board);
-		printf("Move number: %d\n", move_number[0]);
+		printf("Move number: %d\n", search_threads[0].move_number);
 		printf("Moves: \n");
-		for (int i = 0; i < num_moves; i++) {
+		for (i = 0; i < num_moves; i++) {
 			print_move(moves[i]);
 		}
 	}
+	free(search_threads);
+}
+
+/*
+Function to get the move of the engine in a particular position, which is called by the python.
+INPUTS:
+time_allowed: time allowed for the program to make its move.
+the rest: see search_position
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+void get_engine_move(struct Game* game, unsigned long long* zobrist_numbers, int* current_move_number, double time_allowed, float current_value[1], int depth[1], 
+	unsigned long long nodes[1], int threads) {
+	stop_pondering();
+	start_time_manager(time_allowed);
+	stop_search = false;
+	search_position(game, zobrist_numbers, current_move_number, current_value, depth, nodes, threads);
+}
+
+/*
+Search run in the background by start_pondering while the opponent is thinking about their move. It searches the position after the reply
+the engine expects, with no time limit, until the opponent moves: if they play the expected move (a ponder hit), the search carries on with a 
+time limit (see ponder_hit), and otherwise it is stopped (see stop_pondering), with the positions it has searched kept in the transposition table.
+See https://www.chessprogramming.org/Pondering
+thread: thread running the search
+game, zobrist_numbers: copies of the position being searched and the zobrist numbers, as the ones passed in by the python aren't kept
+threads: number of threads used for the search
+running: whether the search has been started and not yet joined
+move_number, value, depth, nodes: results of the search, as returned by get_engine_move
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+struct PonderSearch {
+	struct Thread thread;
+	struct Game game;
+	unsigned long long zobrist_numbers[793];
+	int threads;
+	bool running;
+	int move_number[1];
+	float value[1];
+	int depth[1];
+	unsigned long long nodes[1];
+};
+
+struct PonderSearch ponder_search;
+
+// Function run by the pondering thread, which just runs the search.
+// Last Modified: 18/10/2026
+// Last Modified by: Arkleseisure
+void ponder(void* search) {
+	struct PonderSearch* ponder = search;
+	search_position(&ponder->game, ponder->zobrist_numbers, ponder->move_number, ponder->value, ponder->depth, ponder->nodes, ponder->threads);
+}
+
+/*
+Starts pondering in the background after the engine has made its move, returning straight away so that the python can get the opponent's move.
+The reply expected from the opponent is the best move stored in the transposition table for the position.
+INPUTS:
+game: position after the engine's move, with the opponent to play
+zobrist_numbers: numbers used to calculate the hash of the position
+threads: number of threads used for the search
+
+OUTPUT:
+index of the expected reply in the legal moves of the position, or -1 if the engine isn't pondering (e.g because it doesn't expect any reply)
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+int start_pondering(struct Game* game, unsigned long long* zobrist_numbers, int threads) {
+	stop_pondering();
+	struct HashTableData entry;
+	if (transposition_table == NULL || !get_hash_table_entry(transposition_table, game->hash, &entry) || entry.move == 0) {
+		return -1;
+	}
+
+	unsigned int moves[220];
+	int num_moves = legal_moves(game, moves);
+	int reply;
+	for (reply = 0; reply < num_moves; reply++) {
+		if ((moves[reply] & 0xFFFF) == entry.move) {
+			break;
+		}
+	}
+	if (reply == num_moves) {
+		return -1;
+	}
+
+	memcpy(&ponder_search.game, game, sizeof(struct Game));
+	memcpy(ponder_search.zobrist_numbers, zobrist_numbers, sizeof(ponder_search.zobrist_numbers));
+	make(&ponder_search.game, moves[reply], ponder_search.zobrist_numbers);
+	// if the expected reply ends the game, there is nothing to search
+	if (legal_moves(&ponder_search.game, moves) == 0) {
+		return -1;
+	}
+
+	ponder_search.threads = threads;
+	ponder_search.move_number[0] = 0;
+	ponder_search.value[0] = 0;
+	ponder_search.depth[0] = 1;
+	ponder_search.nodes[0] = 0;
+	// there is no time limit while pondering, so that the search is only stopped by ponder_hit or stop_pondering. The depth and node limits
+	// are cleared as well, as the ones left from an earlier fixed depth or node search would otherwise stop it early.
+	set_search_limits(0, 0);
+	start_time_manager(NO_TIME_LIMIT);
+	stop_search = false;
+	if (!start_thread(&ponder_search.thread, ponder, &ponder_search)) {
+		return -1;
+	}
+	ponder_search.running = true;
+	return reply;
+}
+
+/*
+Called when the opponent has played the reply the engine was pondering on. The search carries on for time_allowed more seconds, on top of the
+time it has already spent pondering, and then returns its results like get_engine_move. Returns false if the engine wasn't pondering.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+bool ponder_hit(double time_allowed, int* current_move_number, float current_value[1], int depth[1], unsigned long long nodes[1]) {
+	if (!ponder_search.running) {
+		return false;
+	}
+	double time_used = wall_clock() - time_manager.start_time;
+	time_manager.hard_limit = time_used + time_allowed;
+	time_manager.soft_limit = time_used + time_allowed * soft_time_limit;
+	join_thread(&ponder_search.thread);
+	ponder_search.running = false;
+
+	current_move_number[0] = ponder_search.move_number[0];
+	current_value[0] = ponder_search.value[0];
+	depth[0] = ponder_search.depth[0];
+	nodes[0] = ponder_search.nodes[0];
+	return true;
+}
+
+/*
+Stops the search started by start_pondering (e.g when the opponent didn't play the expected reply), if there is one.
+The transposition table is kept, as many of the positions searched can still come up in the next search.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+void stop_pondering() {
+	if (ponder_search.running) {
+		stop_search = true;
+		join_thread(&ponder_search.thread);
+		ponder_search.running = false;
+	}
+}
+
+/*
+Copies the statistics for each depth searched by the last search into stats (see SearchStats), which is called from python by get_engine_move
+in c_interface. Returns the number of depths copied, which is at most max_stats.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+int get_search_stats(struct SearchStats* stats, int max_stats) {
+	int num_stats = num_search_stats < max_stats ? num_search_stats : max_stats;
+	memcpy(stats, search_stats, num_stats * sizeof(struct SearchStats));
+	return num_stats;
+}
+
+/*
+Finds the principal variation starting with a move, by following the best moves stored in the transposition table from the position after it.
+The variation stops early if a position isn't in the table, or if it repeats a position, as the moves would then go round in circles.
+INPUTS:
+game: position the variation starts from, which is put back the way it was before returning
+zobrist_numbers: numbers used to calculate the hash of the position
+move: first move of the variation
+pv: used to return the moves of the variation
+max_length: most moves to put in pv
+
+OUTPUT:
+number of moves in the variation
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+int get_principal_variation(struct Game* game, unsigned long long* zobrist_numbers, unsigned int move, unsigned int* pv, int max_length) {
+	struct HashTableData entry;
+	unsigned int moves[220];
+	int num_moves;
+	int i;
+	int length = 0;
+
+	while (length < max_length) {
+		make(game, move, zobrist_numbers);
+		pv[length] = move;
+		length++;
+		if (is_repetition(game) || !get_hash_table_entry(transposition_table, game->hash, &entry) || entry.move == 0) {
+			break;
+		}
+		// the table only holds the first 16 bits of the move, so the full move is found in the legal moves (which also checks it is legal)
+		num_moves = legal_moves(game, moves);
+		for (i = 0; i < num_moves; i++) {
+			if ((moves[i] & 0xFFFF) == entry.move) {
+				break;
+			}
+		}
+		if (i == num_moves) {
+			break;
+		}
+		move = moves[i];
+	}
+
+	for (i = 0; i < length; i++) {
+		unmake(game);
+	}
+	return length;
+}
+
+/*
+MultiPV search, used for analysis: finds the best num_pv moves in the position, with their values and principal variations.
+At each depth of iterative deepening, the position is searched once for each line, with the moves found by the earlier searches at that depth
+skipped at the root (see root_excluded_moves), so that each search finds the next best move. The searches share the transposition table
+and the tree of nodes, so the later ones are much quicker than the first, and each line is searched with an aspiration window around its value 
+from the depth before (see iterative_deepening). The search is run on one thread, and stops when the time manager says so, like get_engine_move
+(so a depth or node limit must be set with set_search_limits if time_allowed is 0).
+See https://www.chessprogramming.org/Multiple_PV
+INPUTS:
+game: Game struct holding the position to analyse
+zobrist_numbers: numbers used to calculate the hash of the position
+num_pv: number of lines to find, which is cut down to the number of legal moves if there are fewer
+time_allowed: time allowed for the search in seconds (0 for no time limit)
+pv_moves: used to return the first move of each line, best first, as given by legal_moves
+pv_values: used to return the value of each line (+ good for white)
+pvs: used to return the principal variation of each line, with MAX_PV_LENGTH moves kept for each line one after the other
+pv_lengths: used to return the number of moves in each principal variation
+depth: used to return the deepest depth which was completed for all the lines
+nodes: used to return the number of nodes searched
+
+OUTPUT:
+number of lines found, which is 0 if no depth was completed
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+int get_multi_pv(struct Game* game, unsigned long long* zobrist_numbers, int num_pv, double time_allowed, unsigned int* pv_moves, float* pv_values,
+	unsigned int* pvs, int* pv_lengths, int depth[1], unsigned long long nodes[1]) {
+	stop_pondering();
+	start_time_manager(time_allowed);
+	stop_search = false;
+	depth[0] = 0;
+
+	unsigned int moves[220];
+	int num_moves = legal_moves(game, moves);
+	if (num_pv > num_moves) {
+		num_pv = num_moves;
+	}
+	if (num_pv < 1) {
+		return 0;
+	}
+
+	fully_evaluate(game);
+	set_late_move_reductions();
+	if (!allocate_hash_table() || !allocate_node_arenas(1)) {
+		return 0;
+	}
+	hash_table_generation++;
+	node_arena = &node_arenas[0];
+	reset_node_arena(node_arena, game);
+	age_quiet_move_tables();
+	// no statistics are recorded for MultiPV searches, so the ones from the last search are cleared rather than being left to look like this one's
+	num_search_stats = 0;
+	struct Node* root_node = &node_arena->root;
+
+	// lines found at the depth being searched, which are only returned once all of them have been searched to that depth
+	unsigned int line_moves[220];
+	float line_values[220];
+	unsigned int swap_move;
+	float swap_value;
+	int j;
+	int move_number[1] = { 0 };
+	int table_hits[1] = { 0 };
+	float value;
+	float alpha;
+	float beta;
+	float window;
+	int lines_found = 0;
+	int current_depth;
+	int i;
+	double iteration_start_time;
+	double last_iteration_time = 0;
+	double previous_iteration_time = 0;
+
+	for (current_depth = 1; current_depth <= time_manager.max_depth && start_next_iteration(last_iteration_time, previous_iteration_time); current_depth++) {
+		iteration_start_time = wall_clock();
+		for (i = 0; i < num_pv; i++) {
+			num_root_excluded = i;
+			// the value of the root is reset, as if the last line found was a mate, minimax would return it straight away (see minimax)
+			// each line is searched with an aspiration window around its value from the depth before, widened if the value falls outside it 
+			// (see iterative_deepening)
+			alpha = -2000;
+			beta = 2000;
+			window = aspiration_window;
+			if (lines_found > 0) {
+				alpha = (game->to_play == 0 ? pv_values[i] : -pv_values[i]) - window;
+				beta = (game->to_play == 0 ? pv_values[i] : -pv_values[i]) + window;
+			}
+			while (true) {
+				root_node->value = 0;
+				value = minimax(game, current_depth, zobrist_numbers, move_number, current_depth, alpha, beta, nodes, transposition_table, table_hits, root_node);
+				if (out_of_time() || (value > alpha && value <= beta)) {
+					break;
+				}
+				window *= 2;
+				if (value <= alpha) {
+					alpha = value - window < -2000 ? -2000 : value - window;
+				}
+				else {
+					beta = value + window > 2000 ? 2000 : value + window;
+				}
+			}
+			if (out_of_time()) {
+				break;
+			}
+			line_moves[i] = root_node->children[move_number[0]].parent_move;
+			line_values[i] = game->to_play == 0 ? value : -value;
+			root_excluded_moves[i] = line_moves[i];
+		}
+		previous_iteration_time = last_iteration_time;
+		last_iteration_time = wall_clock() - iteration_start_time;
+		if (i < num_pv) {
+			break;
+		}
+		// a later line can come out slightly better than an earlier one (e.g when its search used better information from the transposition table), 
+		// so the lines are sorted, best first for the player to play
+		for (i = 1; i < num_pv; i++) {
+			for (j = i; j > 0 && (game->to_play == 0 ? line_values[j] > line_values[j - 1] : line_values[j] < line_values[j - 1]); j--) {
+				swap_move = line_moves[j];
+				line_moves[j] = line_moves[j - 1];
+				line_moves[j - 1] = swap_move;
+				swap_value = line_values[j];
+				line_values[j] = line_values[j - 1];
+				line_values[j - 1] = swap_value;
+			}
+		}
+		memcpy(pv_moves, line_moves, num_pv * sizeof(unsigned int));
+		memcpy(pv_values, line_values, num_pv * sizeof(float));
+		lines_found = num_pv;
+		depth[0] = current_depth;
+	}
+	num_root_excluded = 0;
+
+	for (i = 0; i < lines_found; i++) {
+		pv_lengths[i] = get_principal_variation(game, zobrist_numbers, pv_moves[i], &pvs[i * MAX_PV_LENGTH], 
+			depth[0] < MAX_PV_LENGTH ? depth[0] : MAX_PV_LENGTH);
+	}
+	return lines_found;
 }
 
 /*
@@ -2,7 +2,7 @@
 #include <stdio.h>
 #include <stdbool.h>
 #include <time.h>
-#include "game_mechanics_v1.c"
+#include "game_mechanics_v0.c"
 
 float values[12] = { 1, 3, 3, 5, 9, 4, -1, -3, -3, -5, -9, -4 };
 
@@ -1,13 +1,26 @@
 #include <stdlib.h>
 #include <stdio.h>
 #include <stdbool.h>
+#include <string.h>
+#if defined(_MSC_VER)
+#include <intrin.h>
+#endif
+#if defined(__BMI2__)
+#include <immintrin.h>
+#endif
+#if defined(_WIN32)
+#define WIN32_LEAN_AND_MEAN
+#include <windows.h>
+#else
+#include <pthread.h>
+#endif
 
 // Function to confirm that the file is being imported properly
 // Last Modified: 7/9/2021
 // Last Modified by: Arkleseisure
 void confirm_it_works() {
 	printf("\n It's working!!!\n");
-	printf(" This is game mechanics version 309.\n");
+	printf(" This is game mechanics version 320.\n");
 }
 
 // structure defining the key elements for each piece
@@ -22,68 +35,219 @@ struct Piece {
 	bool captured;
 };
 
+// Number of entries in the history held in the Game struct (must be a power of 2). The history is used as a ring buffer, so games can be 
+// any length, as long as the search never has to undo more than this many moves or look back further than this for repetitions.
+enum { HISTORY_SIZE = 1024 };
+
+// Slots of the counts held in the material key (see the Game struct). Each count takes 4 bits, starting with white's pawns in the lowest 4 bits,
+// and black's counts are held in the 6 slots above white's. Bishops are counted separately depending on the colour of the square they are on,
+// as bishops which are all on the same colour of square can never checkmate.
+enum { MATERIAL_PAWN = 0, MATERIAL_KNIGHT = 1, MATERIAL_DARK_BISHOP = 2, MATERIAL_LIGHT_BISHOP = 3, MATERIAL_ROOK = 4, MATERIAL_QUEEN = 5, MATERIAL_SLOTS = 6 };
+
+/*
+Structure holding the information needed to undo a move, which can't be worked out from the position after the move.
+move: move which was made
+captured: index of the piece captured by the move in the piece_list (32 if nothing was captured)
+castling, ply_counter, last_move, value, current_np_material, material_key: values of these variables in the Game struct before the move was made
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+struct Undo {
+	unsigned int move;
+	int captured;
+	int castling;
+	int ply_counter;
+	unsigned int last_move;
+	float value;
+	float current_np_material;
+	unsigned long long material_key;
+};
+
 /*
 Structure holding all the information about the current position in a game
 piece_list: list holding piece structs, holding the type and location of each piece, along with whether or not the piece has been captured yet.
 board: list of 12 bitboards, holding the board according to each piece (more explanations in the initialize_game function in play_game)
 hash: hash of the position, used for testing for draw by repetition, and also could be used for opening databases, etc in future
-past_hash_list: list of the hashes of past positions, back to the last time an irreversible move was made, as the previous positions cannot possibly cause a draw by repetition
-last_move: last move to be played, used to detect potential en-passant.
+material_key: number of each type of piece for each player, 4 bits per count in the order given by the MATERIAL_ slots (see calculate_material_key).
+		Kept up to date by make and unmake, so draws by lack of material can be found without looking at the pieces, and could be used to look up
+		endgame specific handling.
+past_hash_list: list of the hashes of past positions, used for draw by repetition and to get the hash back when a move is unmade. 
+		The hash of the position after n moves is held at index n % HISTORY_SIZE.
+last_move: last move to be played as a packed 32 bit move (see make_move), used to detect potential en-passant. 0 if there is no last move.
 to_play: player to move, 0 (white) or 1 (black)
 ply_counter: number of ply (one move for one player) since the last irreversible move, used to detect draw by 50 move rule.
 castling: although int is 4 bytes, only 4 bits are used, to hold the castling legality of the position (based only on whether the rooks or king have moved...
 		 checks and so forth still need to be verified). The bits hold the legality of castling kingside/queenside for black (8/4 in terms of int value of the bits),
 		 then kingside/queenside for white.
+value, current_np_material: evaluation of the position and amount of non-pawn material, used by the engine.
+history_length: number of moves which have been made since the position the game was set up with.
+undo_stack: information needed to unmake each of the moves made, with the move made from the position after n moves at index n % HISTORY_SIZE.
 
-Last Modified: 16/9/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
 struct Game {
 	struct Piece piece_list[32];
 	unsigned long long board[12];
 	unsigned long long hash;
-	unsigned long long past_hash_list[100];
-	unsigned long long last_move[3];
+	unsigned long long material_key;
+	unsigned long long past_hash_list[HISTORY_SIZE];
+	unsigned int last_move;
 	int to_play;
 	int ply_counter;
 	int castling;
 	float value;
 	float current_np_material;
+	int history_length;
+	struct Undo undo_stack[HISTORY_SIZE];
 };
 
-// returns the rank given by a single bit on a bitboard (or if there is more than one bit, the rank of the bit with the highest rank)
-// Last Modified: 10/8/2021
+/*
+Returns the index (0 for a1, 1 for b1, ... 63 for h8) of the lowest set bit of a bitboard. For bitboards holding a single piece this
+is just the square the piece is on. Uses the hardware instruction where the compiler gives us access to it.
+loc: bitboard, must not be 0.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+int get_square(unsigned long long loc) {
+#if defined(__GNUC__) || defined(__clang__)
+	return __builtin_ctzll(loc);
+#elif defined(_MSC_VER) && defined(_WIN64)
+	unsigned long square;
+	_BitScanForward64(&square, loc);
+	return (int)square;
+#elif defined(_MSC_VER) && defined(_M_IX86)
+	// 32 bit MSVC only has the 32 bit scan, so look in the lower half first and only go to the upper half if it is empty.
+	unsigned long square;
+	if (_BitScanForward(&square, (unsigned long)loc)) {
+		return (int)square;
+	}
+	_BitScanForward(&square, (unsigned long)(loc >> 32));
+	return (int)square + 32;
+#else
+	int square = 0;
+	while ((loc & 1) == 0) {
+		loc >>= 1;
+		square++;
+	}
+	return square;
+#endif
+}
+
+/*
+Returns the number of bits set in a bitboard (e.g the number of pieces on it).
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+int count_bits(unsigned long long bitboard) {
+#if defined(__GNUC__) || defined(__clang__)
+	return __builtin_popcountll(bitboard);
+#elif defined(_MSC_VER) && defined(_WIN64)
+	return (int)__popcnt64(bitboard);
+#elif defined(_MSC_VER) && defined(_M_IX86)
+	// 32 bit MSVC only has the 32 bit popcount, so the two halves of the bitboard are counted separately.
+	return (int)(__popcnt((unsigned int)bitboard) + __popcnt((unsigned int)(bitboard >> 32)));
+#else
+	int num_bits = 0;
+	while (bitboard != 0) {
+		bitboard &= bitboard - 1;
+		num_bits++;
+	}
+	return num_bits;
+#endif
+}
+
+/*
+Returns the square of the lowest set bit of a bitboard and removes that bit from the bitboard. Used for looping through the pieces or squares held
+in a bitboard one at a time.
+bitboard: pointer to the bitboard, must not hold 0.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+int pop_lowest_square(unsigned long long* bitboard) {
+	int square = get_square(bitboard[0]);
+	bitboard[0] &= bitboard[0] - 1;
+	return square;
+}
+
+/*
+Returns the amount which a piece adds to the material key of the Game struct (0 for kings, which are not counted).
+type: type of the piece (0 - 11, as in the board array)
+square: square the piece is on (only needed to tell which colour of square a bishop is on)
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+unsigned long long material_unit(int type, int square) {
+	// slot of each type of piece, with bishops on the dark squares (where the rank and the file add up to an even number) by default
+	static const int slots[6] = { MATERIAL_PAWN, MATERIAL_KNIGHT, MATERIAL_DARK_BISHOP, MATERIAL_ROOK, MATERIAL_QUEEN, -1 };
+	int slot = slots[type % 6];
+	if (slot < 0) {
+		return 0;
+	}
+	if (slot == MATERIAL_DARK_BISHOP) {
+		slot += ((square >> 3) + (square & 7)) & 1;
+	}
+	return (unsigned long long)1 << (4 * (slot + MATERIAL_SLOTS * (type / 6)));
+}
+
+/*
+Returns the number of pieces of one type held by one player in a material key.
+material_key: material key from the Game struct
+colour: 0 for white, 1 for black
+slot: one of the MATERIAL_ slots, e.g MATERIAL_KNIGHT
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+int material_count(unsigned long long material_key, int colour, int slot) {
+	return (int)((material_key >> (4 * (slot + MATERIAL_SLOTS * colour))) & 15);
+}
+
+/*
+Calculates the material key for a position from scratch. This needs to be done whenever a Game struct is set up, after which make and unmake
+keep it up to date.
+board: array of the 12 bitboards from the Game struct.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+unsigned long long calculate_material_key(unsigned long long* board) {
+	int type;
+	unsigned long long pieces;
+	unsigned long long material_key = 0;
+	for (type = 0; type < 12; type++) {
+		pieces = board[type];
+		while (pieces != 0) {
+			material_key += material_unit(type, pop_lowest_square(&pieces));
+		}
+	}
+	return material_key;
+}
+
+// returns the rank given by a single bit on a bitboard (or if there is more than one bit, the rank of the lowest bit)
+// Last Modified: 18/10/2026
 // Last Modified by: Arkleseisure
 int rank(unsigned long long loc) {
-	int i = 0;
-	int rank_no = 0;
-	unsigned long long loc_shift = loc >> 8;
-
-	while (loc_shift != 0 && loc_shift < loc) {
-		rank_no++;
-		loc_shift >>= 8;
+	if (loc == 0) {
+		return 0;
 	}
-	return rank_no;
+	return get_square(loc) >> 3;
 }
 
-// returns the file given by a single bit on a bitboard (or if there is more than one bit, the file of the bit with the lowest file)
-// Last Modified: 10/8/2021
+// returns the file given by a single bit on a bitboard (or if there is more than one bit, the file of the lowest bit)
+// Last Modified: 18/10/2026
 // Last Modified by: Arkleseisure
 int file(unsigned long long loc) {
-	int i = 0;
-	int file_no = 0;
-	unsigned long long mask = 0x0101010101010101;
-
 	// returns an error value if there is no bit there
 	if (loc == 0) {
 		return 8;
 	}
-
-	while ((mask & loc) == 0) {
-		file_no++;
-		mask <<= 1;
-	}
-	return file_no;
+	return get_square(loc) & 7;
 }
 
 /*
@@ -105,22 +269,341 @@ unsigned long long shift_bitboard(unsigned long long bitboard, int amount, int d
 }
 
 /*
-Function to add a move to an array
-moves: array the move should be added to
-piece_loc: current location of the piece as a bitboard
-piece_dest: destination of the piece as a bitboard
+Magic bitboards are used to look up the squares attacked by a bishop or rook (and hence a queen) in one go, rather than walking out from the
+piece one square at a time. For each square, the squares which could block the piece (the mask) are taken from the bitboard of all the pieces,
+multiplied by a "magic" number and shifted, giving a unique index into a table of precalculated attacks for that arrangement of blockers.
+More info here: https://www.chessprogramming.org/Magic_Bitboards
+If the code is compiled with BMI2 enabled (e.g -mbmi2), the pext instruction is used to calculate the index instead of the magic multiplication.
+
+mask: squares which can block the piece, not including the edge of the board as a piece there doesn't block anything.
+magic: magic number used to calculate the index.
+attacks: pointer to the part of the attack table used by this square.
+shift: 64 - number of bits in the mask.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+struct Magic {
+	unsigned long long mask;
+	unsigned long long magic;
+	unsigned long long* attacks;
+	int shift;
+};
+
+struct Magic bishop_magics[64];
+struct Magic rook_magics[64];
+
+// attack tables, the sizes being the total number of blocker arrangements summed over all squares.
+unsigned long long bishop_attack_table[5248];
+unsigned long long rook_attack_table[102400];
+
+/*
+Gets the index in the attack table for a particular square given the bitboard of all the pieces on the board.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+unsigned int magic_index(struct Magic* magic, unsigned long long all_pieces) {
+#if defined(__BMI2__)
+	return (unsigned int)_pext_u64(all_pieces, magic->mask);
+#else
+	return (unsigned int)(((all_pieces & magic->mask) * magic->magic) >> magic->shift);
+#endif
+}
+
+/*
+Returns the bitboard of squares attacked by a bishop on square, given the bitboard of all the pieces on the board.
+The squares attacked include the first piece hit in each direction, whatever its colour.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+unsigned long long bishop_attacks(int square, unsigned long long all_pieces) {
+	return bishop_magics[square].attacks[magic_index(&bishop_magics[square], all_pieces)];
+}
+
+/*
+Same as bishop_attacks, but for the rook.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+unsigned long long rook_attacks(int square, unsigned long long all_pieces) {
+	return rook_magics[square].attacks[magic_index(&rook_magics[square], all_pieces)];
+}
+
+/*
+Calculates the attacks of a sliding piece the slow way, by walking outward one square at a time. This is only used to fill the attack tables.
+square: square of the piece
+all_pieces: bitboard of the pieces which may block the piece
+is_rook: true for rook directions, false for bishop directions
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+unsigned long long sliding_attacks(int square, unsigned long long all_pieces, bool is_rook) {
+	int i;
+	int new_rank;
+	int new_file;
+	unsigned long long new_position;
+	unsigned long long attacks = 0;
+	int rook_directions[4][2] = { {1, 0}, {-1, 0}, {0, 1}, {0, -1} };
+	int bishop_directions[4][2] = { {1, 1}, {1, -1}, {-1, 1}, {-1, -1} };
+
+	for (i = 0; i < 4; i++) {
+		new_rank = square / 8;
+		new_file = square % 8;
+		while (true) {
+			new_rank += is_rook ? rook_directions[i][0] : bishop_directions[i][0];
+			new_file += is_rook ? rook_directions[i][1] : bishop_directions[i][1];
+			// stops once it has gone off the side of the board
+			if (new_rank < 0 || new_rank > 7 || new_file < 0 || new_file > 7) {
+				break;
+			}
+			new_position = (unsigned long long)1 << (8 * new_rank + new_file);
+			attacks |= new_position;
+			// stops after the first piece in the way
+			if ((new_position & all_pieces) != 0) {
+				break;
+			}
+		}
+	}
+	return attacks;
+}
+
+/*
+Pseudorandom number generator (xorshift64*) used to search for the magic numbers. It is seeded the same way every time, so the
+magic numbers found are the same every time the library is loaded.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+unsigned long long magic_random(unsigned long long* seed) {
+	seed[0] ^= seed[0] >> 12;
+	seed[0] ^= seed[0] << 25;
+	seed[0] ^= seed[0] >> 27;
+	return seed[0] * 2685821657736338717ULL;
+}
+
+/*
+Fills in the masks, magic numbers and attack tables for one type of sliding piece.
+For each square, every arrangement of blockers within the mask is enumerated (using the Carry-Rippler trick, see
+https://www.chessprogramming.org/Traversing_Subsets_of_a_Set), then random sparse numbers are tried until one is found
+which maps every arrangement to an index holding the right attacks.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+void init_magics(struct Magic* magics, unsigned long long* attack_table, bool is_rook) {
+	int square;
+	int i;
+	int size;
+	int attempt = 0;
+	unsigned int index;
+	unsigned long long edges;
+	unsigned long long subset;
+	// seeds for each rank which are known to find magics quickly
+	unsigned long long seeds[8] = { 728, 10316, 55013, 32803, 12281, 15100, 16645, 255 };
+	unsigned long long seed[1];
+	unsigned long long blockers[4096];
+	unsigned long long reference[4096];
+	// records which attempt last wrote to each index, so the table doesn't need clearing between attempts
+	int epoch[4096] = { 0 };
+	unsigned long long* next_attacks = attack_table;
+
+	for (square = 0; square < 64; square++) {
+		// the edges of the board are excluded from the mask unless the piece is on that edge
+		edges = ((0xFFULL | 0xFF00000000000000ULL) & ~(0xFFULL << (8 * (square / 8)))) |
+			((0x0101010101010101ULL | 0x8080808080808080ULL) & ~(0x0101010101010101ULL << (square % 8)));
+
+		magics[square].mask = sliding_attacks(square, 0, is_rook) & ~edges;
+		magics[square].shift = 64 - count_bits(magics[square].mask);
+		magics[square].attacks = next_attacks;
+
+		// enumerates every subset of the mask and the attacks given by that set of blockers
+		size = 0;
+		subset = 0;
+		do {
+			blockers[size] = subset;
+			reference[size] = sliding_attacks(square, subset, is_rook);
+#if defined(__BMI2__)
+			magics[square].attacks[_pext_u64(subset, magics[square].mask)] = reference[size];
+#endif
+			size++;
+			subset = (subset - magics[square].mask) & magics[square].mask;
+		} while (subset != 0);
+		next_attacks += size;
+
+#if !defined(__BMI2__)
+		seed[0] = seeds[square / 8];
+		i = 0;
+		while (i < size) {
+			// sparse random numbers (few bits set) make much better magic candidates
+			magics[square].magic = 0;
+			while (count_bits((magics[square].magic * magics[square].mask) >> 56) < 6) {
+				magics[square].magic = magic_random(seed) & magic_random(seed) & magic_random(seed);
+			}
+
+			// checks that no two sets of blockers with different attacks end up at the same index
+			attempt++;
+			for (i = 0; i < size; i++) {
+				index = magic_index(&magics[square], blockers[i]);
+				if (epoch[index] < attempt) {
+					epoch[index] = attempt;
+					magics[square].attacks[index] = reference[i];
+				}
+				else if (magics[square].attacks[index] != reference[i]) {
+					break;
+				}
+			}
+		}
+#endif
+	}
+}
+
+// Precalculated attacks for the pieces which jump to their squares rather than slide, indexed by square.
+// The pawn table is also indexed by colour (0 white, 1 black), giving the two squares diagonally in front of the pawn.
+unsigned long long knight_attack_table[64];
+unsigned long long king_attack_table[64];
+unsigned long long pawn_attack_table[2][64];
+
+/*
+Returns the bitboard of the squares reached from square by each of the (rank, file) steps given, ignoring any which go off the side of the board.
+Only used to fill the knight, king and pawn attack tables.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+unsigned long long step_attacks(int square, int steps[][2], int num_steps) {
+	int i;
+	int new_rank;
+	int new_file;
+	unsigned long long attacks = 0;
+
+	for (i = 0; i < num_steps; i++) {
+		new_rank = square / 8 + steps[i][0];
+		new_file = square % 8 + steps[i][1];
+		if (new_rank >= 0 && new_rank <= 7 && new_file >= 0 && new_file <= 7) {
+			attacks |= (unsigned long long)1 << (8 * new_rank + new_file);
+		}
+	}
+	return attacks;
+}
+
+/*
+Fills in the knight, king and pawn attack tables.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+void init_step_attacks() {
+	int square;
+	int knight_steps[8][2] = { {1, 2}, {2, 1}, {2, -1}, {1, -2}, {-1, -2}, {-2, -1}, {-2, 1}, {-1, 2} };
+	int king_steps[8][2] = { {1, 0}, {1, 1}, {0, 1}, {-1, 1}, {-1, 0}, {-1, -1}, {0, -1}, {1, -1} };
+	int pawn_steps[2][2][2] = { { {1, -1}, {1, 1} }, { {-1, -1}, {-1, 1} } };
+
+	for (square = 0; square < 64; square++) {
+		knight_attack_table[square] = step_attacks(square, knight_steps, 8);
+		king_attack_table[square] = step_attacks(square, king_steps, 8);
+		pawn_attack_table[0][square] = step_attacks(square, pawn_steps[0], 2);
+		pawn_attack_table[1][square] = step_attacks(square, pawn_steps[1], 2);
+	}
+}
+
+// Squares strictly between two squares which share a rank, file or diagonal (0 if they don't), indexed by the two squares.
+// Used to find the squares which can block a check, and the squares a pinned piece can move along.
+unsigned long long between_table[64][64];
+
+/*
+Fills in the between table using the sliding attacks from each end of the line.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+void init_between_table() {
+	int square_1;
+	int square_2;
+	unsigned long long loc_1;
+	unsigned long long loc_2;
+
+	for (square_1 = 0; square_1 < 64; square_1++) {
+		loc_1 = (unsigned long long)1 << square_1;
+		for (square_2 = 0; square_2 < 64; square_2++) {
+			loc_2 = (unsigned long long)1 << square_2;
+			// the squares between are the ones attacked from both ends when each end blocks the other
+			if ((rook_attacks(square_1, 0) & loc_2) != 0) {
+				between_table[square_1][square_2] = rook_attacks(square_1, loc_2) & rook_attacks(square_2, loc_1);
+			}
+			else if ((bishop_attacks(square_1, 0) & loc_2) != 0) {
+				between_table[square_1][square_2] = bishop_attacks(square_1, loc_2) & bishop_attacks(square_2, loc_1);
+			}
+			else {
+				between_table[square_1][square_2] = 0;
+			}
+		}
+	}
+}
+
+/*
+Initialises all the precalculated tables used by the game mechanics. This is called automatically when the library is loaded, so the tables
+are only ever built once.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+#if defined(_MSC_VER)
+void initialise_tables();
+#pragma section(".CRT$XCU", read)
+__declspec(allocate(".CRT$XCU")) static void (*initialise_tables_pointer)() = initialise_tables;
+#else
+__attribute__((constructor))
+#endif
+void initialise_tables() {
+	init_magics(bishop_magics, bishop_attack_table, false);
+	init_magics(rook_magics, rook_attack_table, true);
+	init_step_attacks();
+	init_between_table();
+}
+
+/*
+Function to pack a move into 32 bits. The bits hold, from the lowest:
+from_square: 6 bits, square the piece moves from (8 * rank + file, so 0 for a1 up to 63 for h8)
+to_square: 6 bits, square the piece moves to
 flag: 4 bits telling us the type of move (documented in play_game)
 piece: 4 bits referring to the type of piece being moved (also documented in play_game)
-index: part of the flag, refers to the index of the piece in the piece_list. This is often more convenient to keep separate, which is why this
-		is calculated within the function. 7 bits. Should be set to 0 if the index is already included within the flag.
-Last Modified: 10/8/2021
+index: 5 bits, index of the piece in the piece_list.
+Everything from the flag upwards is laid out the same way as the flag of the moves as they are described in play_game, so move >> 12 gives that flag.
+A move of 0 is used when there is no move, e.g for the last move at the start of a game.
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-void add_move(unsigned long long* moves, unsigned long long piece_loc, unsigned long long piece_dest, unsigned long long flag,
-	unsigned long long piece, unsigned long long index) {
-	moves[0] = piece_loc;
-	moves[1] = piece_dest;
-	moves[2] = flag + (piece << 4) + (index << 8);
+unsigned int make_move(int from_square, int to_square, int flag, int piece, int index) {
+	return (unsigned int)from_square | ((unsigned int)to_square << 6) | ((unsigned int)flag << 12) | ((unsigned int)piece << 16) | ((unsigned int)index << 20);
+}
+
+/*
+Functions to get the parts of a packed move back out of it (see make_move).
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+int move_from(unsigned int move) {
+	return move & 63;
+}
+
+int move_to(unsigned int move) {
+	return (move >> 6) & 63;
+}
+
+int move_flag(unsigned int move) {
+	return (move >> 12) & 15;
+}
+
+int move_piece(unsigned int move) {
+	return (move >> 16) & 15;
+}
+
+int move_index(unsigned int move) {
+	return move >> 20;
 }
 
 /*
@@ -157,32 +640,34 @@ void print_board(unsigned long long* board) {
 }
 
 /*
-Given a move in bitboard form, returns the equivalent move in format a1a2
+Given a move, returns the equivalent move in format a1a2
 
-Last Modified: 11/9/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-void get_move_string(unsigned long long* move, char* output_move) {
-	output_move[0] = file(move[0]) + 'a';
-	output_move[1] = rank(move[0]) + '1';
-	output_move[2] = file(move[1]) + 'a';
-	output_move[3] = rank(move[1]) + '1';
+void get_move_string(unsigned int move, char* output_move) {
+	int first_square = move_from(move);
+	int second_square = move_to(move);
+	output_move[0] = (first_square & 7) + 'a';
+	output_move[1] = (first_square >> 3) + '1';
+	output_move[2] = (second_square & 7) + 'a';
+	output_move[3] = (second_square >> 3) + '1';
 }
 
 /*
 Prints out a move in terms of the squares of the move, so that it is human readable.
-Last Modified: 11/9/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-void print_move(unsigned long long* move) {
+void print_move(unsigned int move) {
 	char move_string[4];
 	char promotions[4] = { 'N', 'B', 'R', 'Q' };
 	get_move_string(move, move_string);
 	for (int i = 0; i < 4; i++) {
 		printf("%c", move_string[i]);
 	}
-	if ((move[2] & 8) != 0) {
-		printf("%c", promotions[move[2] & 3]);
+	if ((move_flag(move) & 8) != 0) {
+		printf("%c", promotions[move_flag(move) & 3]);
 	}
 	printf("\n");
 }
@@ -190,25 +675,23 @@ void print_move(unsigned long long* move) {
 /*
 Checks whether the square held by loc is attacked by the player who isn't to play
 
-Last Modified: 5/9/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
 bool is_attacked(unsigned long long* board, int player_attacked, unsigned long long loc) {
 	int i;
-	int j;
 
 	// holds 0 if the current player is black, and 6 if white.
 	// This can then be added to the number of the piece looked for (pawn = 0, knight = 1, ...) to find the bitboard representing that piece for the other player
 	int colour_shift = 6 * (1 - player_attacked);
+	int square = get_square(loc);
 
-	// rank of the target square
-	int loc_rank = rank(loc);
-
-	// encodes the directions the queen can move in.
-	int queen_shifts[] = { 1, 7, 8, 9 };
-	int directions[] = { -1, 1 };
-	int shift;
-	int direction;
+	// attacks from knights, the king and pawns are looked up directly. A pawn of the other colour attacks this square if it is on one of the squares
+	// which a pawn of the player attacked would attack from this square.
+	if ((knight_attack_table[square] & board[1 + colour_shift]) != 0 || (king_attack_table[square] & board[5 + colour_shift]) != 0 ||
+		(pawn_attack_table[player_attacked][square] & board[colour_shift]) != 0) {
+		return true;
+	}
 
 	// bitboard holding the positions of all the pieces
 	unsigned long long all_pieces = 0;
@@ -216,63 +699,54 @@ bool is_attacked(unsigned long long* board, int player_attacked, unsigned long l
 		all_pieces ^= board[i];
 	}
 
-	// first bitboard encodes pieces of the opposite colour which can move horizontally/vertically, and the second diagonally
-	unsigned long long movers[2] = { board[3 + colour_shift] ^ board[4 + colour_shift], board[2 + colour_shift] ^ board[4 + colour_shift] };
-	unsigned long long new_position;
-	int new_rank;
-
-	// loops through each of the eight directions in which it can move
-	for (i = 0; i < 8; i++) {
-		direction = directions[i / 4];
-		shift = queen_shifts[i % 4];
-
-		// loops though moving one square at a time
-		for (j = 1; j < 8; j++) {
-			new_position = shift_bitboard(loc, shift * j, direction);
-			new_rank = rank(new_position);
-			// checks whether the loop should be stopped due to going off the side of the board
-			// first checks it hasn't gone off the top or bottom of the board
-			// second checks it hasn't moved horizontally off the side of the board (when i % 4 == 0, the shift is 1, so we are looking horizontally)
-			// third checks it hasn't moved diagonally off the side of the board (the diagonal moves occupy the odd positions in the list)
-			if ((new_position == 0) || ((i % 4 == 0) && (new_rank != loc_rank)) || ((i % 2 == 1) && (abs(new_rank - loc_rank) != j))) {
-				break;
-			}
-			// movers holds the bitboard with pieces of the opposite colour able to move in the relevant direction, so the first statement looks for checks from bishops/rooks/queens. 
-			// (some_bitboard & new_position) != 0 returns true if the new position has landed on some square present in the bitboard
-			else if ((movers[i % 2] & new_position) != 0) {
-				return true;
-			}
-			// Handles attacks from the king
-			else if (j == 1 && ((board[5 + colour_shift] & new_position) != 0)) {
-				return true;
-			}
-			// Handles attacks from pawns (if i % 2 == 1, then the direction is diagonal, and if i / 4 == (1 - player_attacked), the direction up/down is correct as well)
-			else if (j == 1 && (i % 2 == 1 && i / 4 == (1 - player_attacked) && ((board[colour_shift] & new_position) != 0))) {
-				return true;
-			}
-			// if there is a piece in the way, it breaks
-			else if ((new_position & all_pieces) != 0) {
-				break;
-			}
-		}
+	// attacks from rooks/queens along ranks and files, then from bishops/queens along diagonals, using the precalculated attack tables
+	if ((rook_attacks(square, all_pieces) & (board[3 + colour_shift] ^ board[4 + colour_shift])) != 0) {
+		return true;
 	}
+	return (bishop_attacks(square, all_pieces) & (board[2 + colour_shift] ^ board[4 + colour_shift])) != 0;
+}
 
-	// The next section checks for attacks from knights
+/*
+Returns a bitboard of all the pieces of the player who isn't player_attacked which attack a square.
+all_pieces is passed in separately from the board so that pieces can be taken off it, e.g the king, when checking
+whether the squares it moves to are attacked by sliding pieces which are currently blocked by the king itself.
 
-	// array holding the amount a bit has to be shifted to make each knight move in the positive direction (this is then reflected for the negative)
-	int knight_shifts[] = { 6, 10, 15, 17 };
-	int rank_changes[] = { 1, 1, 2, 2, 1, 1, 2, 2 };
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+unsigned long long attackers_to(unsigned long long* board, int player_attacked, int square, unsigned long long all_pieces) {
+	int colour_shift = 6 * (1 - player_attacked);
 
-	// loops through the possible shifts
-	for (i = 0; i < 8; i++) {
-		new_position = shift_bitboard(loc, knight_shifts[i % 4], directions[i / 4]);
+	return (knight_attack_table[square] & board[1 + colour_shift]) | (king_attack_table[square] & board[5 + colour_shift]) |
+		(pawn_attack_table[player_attacked][square] & board[colour_shift]) |
+		(rook_attacks(square, all_pieces) & (board[3 + colour_shift] | board[4 + colour_shift])) |
+		(bishop_attacks(square, all_pieces) & (board[2 + colour_shift] | board[4 + colour_shift]));
+}
 
-		// if it hasn't gone off the side and there is a knight on that square, then that knight attacks the square
-		if (abs(rank(new_position) - loc_rank) == rank_changes[i] && (new_position & board[1 + colour_shift]) != 0) {
-			return true;
-		}
+/*
+Adds a move to the moves array for each of the destination squares in a bitboard. Destinations holding a piece of the other colour are added as captures.
+moves: array to put the moves found into
+square: square the piece is on
+destinations: bitboard of the squares the piece can move to (must not include squares occupied by its own pieces)
+other_pieces: bitboard containing the pieces of the opposite colour as the piece
+piece_type: type of the piece moving (0 - 11)
+index: index of the piece in the piece_list
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+int add_moves_from_bitboard(unsigned int* moves, int square, unsigned long long destinations, unsigned long long other_pieces,
+	int piece_type, int index) {
+	int num_moves = 0;
+	int new_square;
+
+	// loops through the destinations, taking off the lowest bit each time. Captures have a flag of 4, other moves 0.
+	while (destinations != 0) {
+		new_square = pop_lowest_square(&destinations);
+		moves[num_moves] = make_move(square, new_square, (int)((other_pieces >> new_square) & 1) << 2, piece_type, index);
+		num_moves++;
 	}
-	return false;
+	return num_moves;
 }
 
 /*
@@ -283,60 +757,56 @@ loc: bitboard with the location of the pawn
 moves: array to put the moves found into
 index: index of the piece in the piece_list
 to_play: player to move (0: white, 1: black)
-last_move: last move to be played as 2 bitboards, 1 for the starting position, 1 for the finish,
-			and 1 flag containing extra information about the move (for more info see play_game)
+last_move: last move to be played (see make_move)
 
-Last Modified: 10/8/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-int get_pawn_moves(unsigned long long same_pieces, unsigned long long other_pieces, unsigned long long loc, unsigned long long moves[28][3],
-	unsigned long long index, int to_play, unsigned long long* last_move) {
+int get_pawn_moves(unsigned long long same_pieces, unsigned long long other_pieces, unsigned long long loc, unsigned int* moves,
+	int index, int to_play, unsigned int last_move) {
 	int i;
 	int j;
 	int num_moves = 0;
-	int direction = 1 - 2 * to_play;
 	// used for updating the flag when promotion occurs
-	unsigned long long original_flag;
+	unsigned int original_move;
 
-	unsigned long long piece_type = 6 * (unsigned long long)to_play;
+	int piece_type = 6 * to_play;
+	unsigned long long all_pieces = same_pieces | other_pieces;
 
-	// variable holding the rank the pawn is on for ease of calculation for double moves at the start and promotion
-	int piece_rank = rank(loc);
-	// variable holding the file the pawn is on so that it doesn't skip across the side of the board	
-	int piece_file = file(loc);
+	// variable holding the square the pawn is on, and its rank for ease of calculation for double moves at the start and promotion
+	int square = get_square(loc);
+	int piece_rank = square >> 3;
+	// pawns move up the board (+8 squares) for white and down it for black
+	int direction = 8 - 16 * to_play;
+
+	// square in front of the pawn, and then the squares it could capture on (taken from the attack table so that it doesn't skip across the side of the board)
+	int new_square = square + direction;
+	unsigned long long captures = pawn_attack_table[to_play][square] & other_pieces;
 
 	// checks if the square in front of the pawn is occupied
-	if ((shift_bitboard(loc, 8, direction) & (same_pieces | other_pieces)) == 0) {
-		add_move(moves[0], loc, shift_bitboard(loc, 8, direction), 0, piece_type, index);
+	if (((all_pieces >> new_square) & 1) == 0) {
+		moves[0] = make_move(square, new_square, 0, piece_type, index);
 		num_moves = 1;
 
 		// checks for double moves (first term checks if the rank of the piece is 1 for white or 6 for black (due to indexing from 0), second for a piece on the next square)
-		if (piece_rank == to_play * 5 + 1 && ((shift_bitboard(loc, 16, direction) & (same_pieces | other_pieces)) == 0)) {
-			add_move(moves[1], loc, shift_bitboard(loc, 16, direction), 1, piece_type, index);
+		new_square += direction;
+		if (piece_rank == to_play * 5 + 1 && ((all_pieces >> new_square) & 1) == 0) {
+			moves[1] = make_move(square, new_square, 1, piece_type, index);
 			num_moves = 2;
 		}
 	}
 
-	// captures... first checks whether there is an opponent's piece on the relevant square, then if it is on a file for which that capture is possible 
-	// (as we are using single numbers as bitboards, there is no inbuilt idea of edges of the board)
-	if ((shift_bitboard(loc, 7, direction) & other_pieces) != 0 && piece_file != 7 * to_play) {
-		add_move(moves[num_moves], loc, shift_bitboard(loc, 7, direction), 4, piece_type, index);
-		num_moves++;
-	}
-	if ((shift_bitboard(loc, 9, direction) & other_pieces) != 0 && piece_file != 7 * (1 - to_play)) {
-		add_move(moves[num_moves], loc, shift_bitboard(loc, 9, direction), 4, piece_type, index);
+	// captures
+	while (captures != 0) {
+		moves[num_moves] = make_move(square, pop_lowest_square(&captures), 4, piece_type, index);
 		num_moves++;
 	}
 
-	// en passant (if statement translates to: if (last move was a double pawn push) and then the next two check 
-	// whether it is to the left or right of the current pawn)
-	if ((last_move[2] & 15) == 1) {
-		if (last_move[1] >> 1 == loc && piece_file != 7) {
-			add_move(moves[num_moves], loc, shift_bitboard(loc, 9 - 2 * to_play, direction), 5, piece_type, index);
-			num_moves++;
-		}
-		else if (last_move[1] << 1 == loc && piece_file != 0) {
-			add_move(moves[num_moves], loc, shift_bitboard(loc, 7 + 2 * to_play, direction), 5, piece_type, index);
+	// en passant (if the last move was a double pawn push, the pawn can capture onto the square that pawn skipped over, as long as it attacks it)
+	if (move_flag(last_move) == 1) {
+		new_square = move_to(last_move) + direction;
+		if (((pawn_attack_table[to_play][square] >> new_square) & 1) != 0) {
+			moves[num_moves] = make_move(square, new_square, 5, piece_type, index);
 			num_moves++;
 		}
 	}
@@ -345,11 +815,11 @@ int get_pawn_moves(unsigned long long same_pieces, unsigned long long other_piec
 	if (piece_rank == 6 - (to_play * 5)) {
 		// loops through each move found for the pawn
 		for (i = 0; i < num_moves; i++) {
-			original_flag = moves[i][2];
+			original_move = moves[i];
 			// 4 possible promotions for each move
 			for (j = 0; j < 4; j++) {
 				// edits the move to add promotion to the flag
-				add_move(moves[i + j * num_moves], moves[i][0], moves[i][1], original_flag + 8 + j, 0, 0);
+				moves[i + j * num_moves] = original_move + ((unsigned int)(8 + j) << 12);
 			}
 		}
 		num_moves *= 4;
@@ -366,41 +836,15 @@ moves: array to put the moves found into
 index: index of the piece in the piece_list
 to_play: player to move (0: white, 1: black)
 
-Last Modified: 11/8/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-int get_knight_moves(unsigned long long same_pieces, unsigned long long other_pieces, unsigned long long loc, unsigned long long moves[28][3],
-	unsigned long long index, int to_play) {
-	int i;
-	int num_moves = 0;
-	// array holding the amount a bit has to be shifted to make each knight move in the positive direction (this is then reflected for the negative)
-	int knight_shifts[] = { 6, 10, 15, 17 };
-	int directions[] = { -1, 1 };
-	int rank_changes[] = { 1, 1, 2, 2, 1, 1, 2, 2 };
-	int piece_rank = rank(loc);
-
-	int piece_type = 1 + 6 * (unsigned long long)to_play;
-
-
-	unsigned long long new_pos;
-	// loops through the possible shifts
-	for (i = 0; i < 8; i++) {
-		new_pos = shift_bitboard(loc, knight_shifts[i % 4], directions[i / 4]);
-		// checks if the move takes it off the side of the board
-		if (new_pos != 0 && abs(rank(new_pos) - piece_rank) == rank_changes[i]) {
-			// captures
-			if ((new_pos & other_pieces) != 0) {
-				add_move(moves[num_moves], loc, new_pos, 4, piece_type, index);
-				num_moves++;
-			}
-			// normal moves
-			else if ((new_pos & same_pieces) == 0) {
-				add_move(moves[num_moves], loc, new_pos, 0, piece_type, index);
-				num_moves++;
-			}
-		}
-	}
-	return num_moves;
+int get_knight_moves(unsigned long long same_pieces, unsigned long long other_pieces, unsigned long long loc, unsigned int* moves,
+	int index, int to_play) {
+	int piece_type = 1 + 6 * to_play;
+	unsigned long long destinations = knight_attack_table[get_square(loc)] & ~same_pieces;
+
+	return add_moves_from_bitboard(moves, get_square(loc), destinations, other_pieces, piece_type, index);
 }
 
 /*
@@ -412,39 +856,16 @@ moves: array to put the moves found into
 index: index of the piece in the piece_list
 to_play: player to move (0: white, 1: black)
 
-Last Modified: 12/8/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-int get_bishop_moves(unsigned long long same_pieces, unsigned long long other_pieces, unsigned long long loc, unsigned long long moves[28][3],
-	unsigned long long index, int to_play) {
-	int i;
-	int j;
-	int num_moves = 0;
-	int piece_rank = rank(loc);
-	int piece_shifts[] = { 7, 9 };
-	int directions[] = { -1, 1 };
-	unsigned long long new_position;
-	unsigned long long piece_type = 2 + 6 * (unsigned long long)to_play;
+int get_bishop_moves(unsigned long long same_pieces, unsigned long long other_pieces, unsigned long long loc, unsigned int* moves,
+	int index, int to_play) {
+	int piece_type = 2 + 6 * to_play;
+	// the attack table gives every square up to and including the first piece in each direction, so only the squares of its own pieces need removing
+	unsigned long long destinations = bishop_attacks(get_square(loc), same_pieces | other_pieces) & ~same_pieces;
 
-	// loops through each of the four directions in which it can move
-	for (i = 0; i < 4; i++) {
-		for (j = 1; j < 8; j++) {
-			new_position = shift_bitboard(loc, piece_shifts[i % 2] * j, directions[i / 2]);
-			// checks the move doesn't take the piece off the side of the board or onto one of their own pieces
-			if (new_position == 0 || (new_position & same_pieces) != 0 || abs(rank(new_position) - piece_rank) != j) {
-				break;
-			}
-			// if the move is a capture, it adds that move and then breaks to the next loop
-			else if ((new_position & other_pieces) != 0) {
-				add_move(moves[num_moves], loc, new_position, 4, piece_type, index);
-				num_moves++;
-				break;
-			}
-			add_move(moves[num_moves], loc, new_position, 0, piece_type, index);
-			num_moves++;
-		}
-	}
-	return num_moves;
+	return add_moves_from_bitboard(moves, get_square(loc), destinations, other_pieces, piece_type, index);
 }
 
 /*
@@ -456,39 +877,15 @@ moves: array to put the moves found into
 index: index of the piece in the piece_list
 to_play: player to move (0: white, 1: black)
 
-Last Modified: 12/8/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-int get_rook_moves(unsigned long long same_pieces, unsigned long long other_pieces, unsigned long long loc, unsigned long long moves[28][3],
-	unsigned long long index, int to_play) {
-	int i;
-	int j;
-	int num_moves = 0;
-	int piece_rank = rank(loc);
-	int piece_shifts[] = { 1, 8 };
-	int directions[] = { -1, 1 };
-	unsigned long long new_position;
-	unsigned long long piece_type = 3 + 6 * (unsigned long long)to_play;
+int get_rook_moves(unsigned long long same_pieces, unsigned long long other_pieces, unsigned long long loc, unsigned int* moves,
+	int index, int to_play) {
+	int piece_type = 3 + 6 * to_play;
+	unsigned long long destinations = rook_attacks(get_square(loc), same_pieces | other_pieces) & ~same_pieces;
 
-	// loops through each of the four directions in which it can move
-	for (i = 0; i < 4; i++) {
-		for (j = 1; j < 8; j++) {
-			new_position = shift_bitboard(loc, piece_shifts[i % 2] * j, directions[i / 2]);
-			// checks the move doesn't take the piece off the side of the board or onto one of their own pieces
-			if (new_position == 0 || (new_position & same_pieces) != 0 || (piece_shifts[i % 2] == 1 && rank(new_position) != piece_rank)) {
-				break;
-			}
-			// if the move is a capture, it adds that move and then breaks to the next loop
-			else if ((new_position & other_pieces) != 0) {
-				add_move(moves[num_moves], loc, new_position, 4, piece_type, index);
-				num_moves++;
-				break;
-			}
-			add_move(moves[num_moves], loc, new_position, 0, piece_type, index);
-			num_moves++;
-		}
-	}
-	return num_moves;
+	return add_moves_from_bitboard(moves, get_square(loc), destinations, other_pieces, piece_type, index);
 }
 
 /*
@@ -500,45 +897,18 @@ moves: array to put the moves found into
 index: index of the piece in the piece_list
 to_play: player to move (0: white, 1: black)
 
-Last Modified: 12/8/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-int get_queen_moves(unsigned long long same_pieces, unsigned long long other_pieces, unsigned long long loc, unsigned long long moves[28][3],
-	unsigned long long index, int to_play) {
-	int i;
-	int j;
-	int num_moves = 0;
-	int piece_rank = rank(loc);
-	int piece_shifts[] = { 1, 7, 8, 9 };
-	int directions[] = { -1, 1 };
-	unsigned long long new_position;
-	unsigned long long piece_type = 4 + 6 * (unsigned long long)to_play;
-
-	// loops through each of the eight directions in which it can move
-	for (i = 0; i < 8; i++) {
-		// loops though moving one square at a time
-		for (j = 1; j < 8; j++) {
-			new_position = shift_bitboard(loc, piece_shifts[i % 4] * j, directions[i / 4]);
-			// checks the move doesn't take the piece off the side of the board or onto one of their own pieces
-			// first checks it hasn't gone off the top or bottom of the board
-			// second checks it hasn't landed on a friendly piece
-			// third checks it hasn't moved horizontally off the side of the board (horizontal moves occur when the shift is 1, so i % 4 = 0)
-			// fourth checks it hasn't moved diagonally off the side of the board (diagonal moves take up the odd positions in the list)
-			if (new_position == 0 || (new_position & same_pieces) != 0 || ((i % 4 == 0) && rank(new_position) != piece_rank) ||
-				((i % 2 == 1) && abs(rank(new_position) - piece_rank) != j)) {
-				break;
-			}
-			// if the move is a capture, it adds that move and then breaks to the next loop
-			else if ((new_position & other_pieces) != 0) {
-				add_move(moves[num_moves], loc, new_position, 4, piece_type, index);
-				num_moves++;
-				break;
-			}
-			add_move(moves[num_moves], loc, new_position, 0, piece_type, index);
-			num_moves++;
-		}
-	}
-	return num_moves;
+int get_queen_moves(unsigned long long same_pieces, unsigned long long other_pieces, unsigned long long loc, unsigned int* moves,
+	int index, int to_play) {
+	int square = get_square(loc);
+	unsigned long long all_pieces = same_pieces | other_pieces;
+	int piece_type = 4 + 6 * to_play;
+	// the queen moves as a rook and bishop combined
+	unsigned long long destinations = (rook_attacks(square, all_pieces) | bishop_attacks(square, all_pieces)) & ~same_pieces;
+
+	return add_moves_from_bitboard(moves, get_square(loc), destinations, other_pieces, piece_type, index);
 }
 
 /*
@@ -552,54 +922,27 @@ index: index of the piece in the piece_list
 to_play: player to move (0: white, 1: black)
 board: board position as 12 bitboards (see play_game)
 
-Last Modified: 13/8/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-int get_king_moves(unsigned long long same_pieces, unsigned long long other_pieces, unsigned long long loc, unsigned long long moves[28][3],
-	unsigned long long index, int to_play, int castling, unsigned long long* board) {
-	int i;
-	int num_moves = 0;
-	int piece_rank = rank(loc);
-	int piece_file = file(loc);
-	int piece_shifts[] = { 1, 7, 8, 9 };
-	int directions[] = { -1, 1 };
-	unsigned long long new_position;
-	unsigned long long piece_type = 5 + 6 * (unsigned long long)to_play;
-
-	// loops through each of the eight directions in which it can move
-	for (i = 0; i < 8; i++) {
-		new_position = shift_bitboard(loc, piece_shifts[i % 4], directions[i / 4]);
-		// checks the move doesn't take the piece off the side of the board or onto one of their own pieces
-		// first checks it hasn't gone off the top or bottom of the board
-		// second checks it hasn't landed on a friendly piece
-		// third checks it hasn't moved horizontally off the side of the board (horizontal moves occur when the shift is 1, so i % 4 = 0)
-		// fourth checks it hasn't moved diagonally off the side of the board (diagonal moves take up the odd positions in the list)
-		if (new_position == 0 || (new_position & same_pieces) != 0 || ((i % 4 == 0) && rank(new_position) != piece_rank) ||
-			((i % 2 == 1) && abs(rank(new_position) - piece_rank) != 1)) {
-		}
-		// if the move is a capture, it adds that move and then breaks to the next loop
-		else if ((new_position & other_pieces) != 0) {
-			add_move(moves[num_moves], loc, new_position, 4, piece_type, index);
-			num_moves++;
-		}
-		else {
-			add_move(moves[num_moves], loc, new_position, 0, piece_type, index);
-			num_moves++;
-		}
-	}
+int get_king_moves(unsigned long long same_pieces, unsigned long long other_pieces, unsigned long long loc, unsigned int* moves,
+	int index, int to_play, int castling, unsigned long long* board) {
+	int piece_type = 5 + 6 * to_play;
+	unsigned long long destinations = king_attack_table[get_square(loc)] & ~same_pieces;
+	int num_moves = add_moves_from_bitboard(moves, get_square(loc), destinations, other_pieces, piece_type, index);
 
 	// if the king is in check, then castling isn't legal
 	if (castling != 0 && !(is_attacked(board, to_play, loc))) {
 		// castling kingside (checks whether the king or rook have moved (held in the castling variable), then verifies the castle would not be moving through check, 
 		// then that it would not be moving through pieces... 96 is 01100000, so represents the squares which must be free for the move to be made)
 		if (((castling & (2 + 6 * to_play)) != 0) && !(is_attacked(board, to_play, loc << 1)) && (((other_pieces ^ same_pieces) & ((unsigned long long)96 << (56 * to_play))) == 0)) {
-			add_move(moves[num_moves], loc, loc << 2, 2, piece_type, index);
+			moves[num_moves] = make_move(get_square(loc), get_square(loc) + 2, 2, piece_type, index);
 			num_moves++;
 		}
 		// castling queenside
 		// generally the same as kingside, but with 00001110 being 14 representing the squares which need to be free
 		if (((castling & (1 + 3 * to_play)) != 0) && !(is_attacked(board, to_play, loc >> 1)) && (((other_pieces ^ same_pieces) & ((unsigned long long)14 << (56 * to_play))) == 0)) {
-			add_move(moves[num_moves], loc, loc >> 2, 3, piece_type, index);
+			moves[num_moves] = make_move(get_square(loc), get_square(loc) - 2, 3, piece_type, index);
 			num_moves++;
 		}
 	}
@@ -607,53 +950,79 @@ int get_king_moves(unsigned long long same_pieces, unsigned long long other_piec
 }
 
 /*
-Function to apply a move to the position
+Returns the part of the hash of the position which comes from the possibility of en passant (0 if en passant isn't possible).
+It is only added to the hash if the last move was a double pawn move and there is a pawn of the opposite colour either side of the arrival square.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+unsigned long long en_passant_hash(struct Game* game, unsigned long long* zobrist_numbers) {
+	int last_move_file = move_to(game->last_move) & 7;
+	unsigned long long last_move_loc = (unsigned long long)1 << move_to(game->last_move);
+	if (move_flag(game->last_move) == 1 &&
+		((((last_move_loc >> 1) & game->board[6 * game->to_play]) != 0 && last_move_file != 0) ||
+			(((last_move_loc << 1) & game->board[6 * game->to_play]) != 0 && last_move_file != 7))) {
+		return zobrist_numbers[784 + last_move_file];
+	}
+	return 0;
+}
+
+/*
+Function to make a move in the position. Everything needed to unmake the move is pushed onto the undo stack in the Game struct,
+so the move can be undone with unmake without the caller having to save anything.
 game: Game struct holding all the information about the position.
-move: move to be applied to the postion, held in 2 bitboards, one with the start of the move and one with the end, and a flag giving details about the move
+move: move to be applied to the postion, packed into 32 bits (see make_move)
 zobrist_numbers: random numbers used to define the hashes, see https://www.chessprogramming.org/Zobrist_Hashing
-removed_hash: used to return the hash which was removed from the past_hash_list, so that it can be undone later.
+Returns the index of the piece captured in the piece_list (32 if no piece was captured).
 
-Last Modified: 8/9/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-int apply(struct Game* game, unsigned long long* move, unsigned long long* zobrist_numbers, unsigned long long* removed_hash) {
+int make(struct Game* game, unsigned int move, unsigned long long* zobrist_numbers) {
+	// saves the parts of the position which can't be worked out again when the move is unmade
+	struct Undo* undo = &game->undo_stack[game->history_length & (HISTORY_SIZE - 1)];
+	undo->move = move;
+	undo->castling = game->castling;
+	undo->ply_counter = game->ply_counter;
+	undo->last_move = game->last_move;
+	undo->value = game->value;
+	undo->current_np_material = game->current_np_material;
+	undo->material_key = game->material_key;
+
 	// the piece which moves is encoded within the flag of the move
 	int i;
-	int index = (int)(move[2] >> 8);
-	int piece = (move[2] >> 4) & 15;
-	int flag = move[2] & 15;
+	int index = move_index(move);
+	int piece = move_piece(move);
+	int flag = move_flag(move);
 	int capture_index = 32;
 
 	// whether a move can be reversed or not (used for 50 move rule and to help the efficiency of draw by repetition searches)
 	// initialised to whether or not the move is a pawn move
 	bool irreversible = (piece % 6 == 0);
 
-	int first_square_rank = rank(move[0]);
-	int first_square_file = file(move[0]);
-	int second_square_rank = rank(move[1]);
-	int second_square_file = file(move[1]);
+	// squares the piece moves from and to (8 * rank + file, which is also the offset of that square in the zobrist numbers for each piece),
+	// and the bitboards for those squares
+	int first_square = move_from(move);
+	int second_square = move_to(move);
+	int first_square_file = first_square & 7;
+	unsigned long long from_loc = (unsigned long long)1 << first_square;
+	unsigned long long to_loc = (unsigned long long)1 << second_square;
 
 	// if there was the possibility of en passant this move, then that must be removed from the hash
-	// the first statement checks for a double pawn move last move, the second for a pawn of the opposite colour either side of the arrival square
-	int last_move_file = file(game->last_move[1]);
-	if ((game->last_move[2] & 15) == 1 &&
-		(((((game->last_move[1] >> 1) & game->board[6 * game->to_play]) != 0) && last_move_file != 0) ||
-			((((game->last_move[1] << 1) & game->board[6 * game->to_play]) != 0) && last_move_file != 7))) {
-		game->hash ^= zobrist_numbers[784 + last_move_file];
-	}
+	game->hash ^= en_passant_hash(game, zobrist_numbers);
 
 	// applies the move to the bitboard for that piece
-	game->board[piece] ^= move[0] | move[1];
-	game->piece_list[index].loc ^= move[0] | move[1];
+	game->board[piece] ^= from_loc | to_loc;
+	game->piece_list[index].loc ^= from_loc | to_loc;
 
 	// applies the movement of the piece to the hash of the position
-	game->hash ^= zobrist_numbers[64 * piece + 8 * first_square_rank + first_square_file];
-	game->hash ^= zobrist_numbers[64 * piece + 8 * second_square_rank + second_square_file];
+	game->hash ^= zobrist_numbers[64 * piece + first_square];
+	game->hash ^= zobrist_numbers[64 * piece + second_square];
 
 	// if the move is a double pawn move and there is a pawn on one of the sides then the possibility of en passant must be added to the hash
 	if (flag == 1 &&
-		(((((move[1] >> 1) & game->board[6 * (1 - game->to_play)]) != 0) && first_square_file != 0) ||
-			((((move[1] << 1) & game->board[6 * (1 - game->to_play)]) != 0) && first_square_file != 7))) {
+		(((((to_loc >> 1) & game->board[6 * (1 - game->to_play)]) != 0) && first_square_file != 0) ||
+			((((to_loc << 1) & game->board[6 * (1 - game->to_play)]) != 0) && first_square_file != 7))) {
 		// 784 = 12 * 64 + 16 is the initial index of the en passant files.
 		game->hash ^= zobrist_numbers[784 + first_square_file];
 	}
@@ -687,53 +1056,55 @@ int apply(struct Game* game, unsigned long long* move, unsigned long long* zobri
 	else if (flag == 5) {
 		unsigned long long target_pos;
 		if (game->to_play == 0) {
-			target_pos = move[1] >> 8;
+			target_pos = to_loc >> 8;
 		}
 		else {
-			target_pos = move[1] << 8;
+			target_pos = to_loc << 8;
 		}
 		// loops through the pawns in the piece_list to find the one which has been captured
 		for (i = (1 - game->to_play) * 16; i < 16 * (1 - game->to_play) + 8; i++) {
 			if (!game->piece_list[i].captured && (game->piece_list[i].loc & target_pos) != 0) {
 				game->piece_list[i].captured = true;
 				game->board[game->piece_list[i].type] ^= target_pos;
+				game->material_key -= material_unit(game->piece_list[i].type, second_square);
 				capture_index = i;
 				break;
 			}
 		}
 
 		// updates the hash... the piece taken will be on the same rank as the first part of the move and the same file as the second.
-		game->hash ^= zobrist_numbers[64 * game->piece_list[capture_index].type + 8 * first_square_rank + second_square_file];
+		game->hash ^= zobrist_numbers[64 * game->piece_list[capture_index].type + 8 * (first_square >> 3) + (second_square & 7)];
 	}
 	// other captures
 	else if ((flag & 4) != 0) {
 		// loops through the piece_list to find the piece which has been captured.
 		for (i = (1 - game->to_play) * 16; i < 16 * (1 - game->to_play) + 16; i++) {
-			if (!game->piece_list[i].captured && (game->piece_list[i].loc & move[1]) != 0) {
+			if (!game->piece_list[i].captured && (game->piece_list[i].loc & to_loc) != 0) {
 				game->piece_list[i].captured = true;
-				game->board[game->piece_list[i].type] ^= move[1];
+				game->board[game->piece_list[i].type] ^= to_loc;
+				game->material_key -= material_unit(game->piece_list[i].type, second_square);
 				capture_index = i;
 				irreversible = true;
 
 				// removes queenside castling for white if the rook on a1 is taken
-				if (game->piece_list[i].type == 3 && move[1] == (unsigned long long)1) {
+				if (game->piece_list[i].type == 3 && second_square == 0) {
 					game->castling &= 14;
 				}
 				// removes kingside castling for white if the rook on h1 is taken
-				else if (game->piece_list[i].type == 3 && move[1] == (unsigned long long)1 << 7) {
+				else if (game->piece_list[i].type == 3 && second_square == 7) {
 					game->castling &= 13;
 				}
 				// removes queenside castling for black if the rook on a8 is taken
-				else if (game->piece_list[i].type == 9 && move[1] == (unsigned long long)1 << 56) {
+				else if (game->piece_list[i].type == 9 && second_square == 56) {
 					game->castling &= 11;
 				}
 				// removes kingside castling for black if the rook on h8 is taken
-				else if (game->piece_list[i].type == 9 && move[1] == (unsigned long long)1 << 63) {
+				else if (game->piece_list[i].type == 9 && second_square == 63) {
 					game->castling &= 7;
 				}
 
 				// updates the hash
-				game->hash ^= zobrist_numbers[64 * game->piece_list[i].type + 8 * second_square_rank + second_square_file];
+				game->hash ^= zobrist_numbers[64 * game->piece_list[i].type + second_square];
 				break;
 			}
 		}
@@ -745,15 +1116,16 @@ int apply(struct Game* game, unsigned long long* move, unsigned long long* zobri
 		int promotion_type = (flag & 3) + 1 + 6 * game->to_play;
 
 		// removes the pawn
-		game->board[piece] ^= move[1];
+		game->board[piece] ^= to_loc;
 		// adds the new piece
-		game->board[promotion_type] ^= move[1];
+		game->board[promotion_type] ^= to_loc;
 		// changes the type of the piece in the piece_list
 		game->piece_list[index].type = promotion_type;
+		game->material_key += material_unit(promotion_type, second_square) - material_unit(piece, second_square);
 
 		// updates the hash
-		game->hash ^= zobrist_numbers[64 * piece + 8 * second_square_rank + second_square_file];
-		game->hash ^= zobrist_numbers[64 * promotion_type + 8 * second_square_rank + second_square_file];
+		game->hash ^= zobrist_numbers[64 * piece + second_square];
+		game->hash ^= zobrist_numbers[64 * promotion_type + second_square];
 	}
 
 	// changes the value of the castling variable (as it is extras[0], to return it the value of extras needs to be changed)
@@ -770,19 +1142,19 @@ int apply(struct Game* game, unsigned long long* move, unsigned long long* zobri
 			game->castling &= 3;
 		}
 		// removes queenside castling for white if the rook on a1 moves
-		else if (piece == 3 && move[0] == (unsigned long long)1) {
+		else if (piece == 3 && first_square == 0) {
 			game->castling &= 14;
 		}
 		// removes kingside castling for white if the rook on h1 moves
-		else if (piece == 3 && move[0] == (unsigned long long)1 << 7) {
+		else if (piece == 3 && first_square == 7) {
 			game->castling &= 13;
 		}
 		// removes queenside castling for black if the rook on a8 moves
-		else if (piece == 9 && move[0] == (unsigned long long)1 << 56) {
+		else if (piece == 9 && first_square == 56) {
 			game->castling &= 11;
 		}
 		// removes kingside castling for black if the rook on h8 moves
-		else if (piece == 9 && move[0] == (unsigned long long)1 << 63) {
+		else if (piece == 9 && first_square == 63) {
 			game->castling &= 7;
 		}
 		game->hash ^= zobrist_numbers[768 + game->castling];
@@ -794,9 +1166,7 @@ int apply(struct Game* game, unsigned long long* move, unsigned long long* zobri
 	game->hash ^= zobrist_numbers[792];
 
 	// sets the last move to the move which has just been applied
-	for (int i = 0; i < 3; i++) {
-		game->last_move[i] = move[i];
-	}
+	game->last_move = move;
 
 	// changes the value of the ply_counter, which accounts for the 50 move rule
 	if (irreversible) {
@@ -806,39 +1176,39 @@ int apply(struct Game* game, unsigned long long* move, unsigned long long* zobri
 		game->ply_counter++;
 	}
 
-	// records the removed hash so that the past_hash_list can be returned to its original state if the move is unapplied.
-	removed_hash[0] = game->past_hash_list[game->ply_counter];
-	// record of the hashes of past games, used for draw by repetition
-	game->past_hash_list[game->ply_counter] = game->hash;
+	// record of the hashes of past positions, used for draw by repetition
+	game->history_length++;
+	game->past_hash_list[game->history_length & (HISTORY_SIZE - 1)] = game->hash;
 
+	undo->captured = capture_index;
 	return capture_index;
 }
 
 /*
+Function which unmakes the last move made with make, using the information saved on the undo stack.
 game: Game struct, holding the information about the position
-move: move to be unapplied to the postion, held in 2 bitboards, one with the start of the move and one with the end, and a flag giving details about the move
-removed_hash: hash which was replaced at the start of the past_hash_list if the previous move wasn't reversible. This has to be put back to return the past_hash_list to its original state.
-capture_index: index of the piece which was captured in the past_hash_list, so that it can be replaced.
-previous_castling: value of the castling variable before the move was applied.
-previous_ply_counter: value of the ply_counter before the move was applied.
-previous_last_move: the last_move from before move was applied, meaning that the last move variable can be returned to its previous state.
-
-Last Modified: 9/9/2021
+
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-void unapply(struct Game* game, unsigned long long* move, unsigned long long removed_hash, int capture_index, int previous_castling,
-	int previous_ply_counter, unsigned long long* previous_last_move) {
-	int i;
-	int index = (int)(move[2] >> 8);
+void unmake(struct Game* game) {
+	game->history_length--;
+	struct Undo* undo = &game->undo_stack[game->history_length & (HISTORY_SIZE - 1)];
+	unsigned int move = undo->move;
+	int capture_index = undo->captured;
+
+	int index = move_index(move);
 	// the piece which moves is encoded within the flag of the move
-	int piece = (move[2] >> 4) & 15;
-	int flag = move[2] & 15;
+	int piece = move_piece(move);
+	int flag = move_flag(move);
+	unsigned long long from_loc = (unsigned long long)1 << move_from(move);
+	unsigned long long to_loc = (unsigned long long)1 << move_to(move);
 	// as the move has already been applied, the to_play variable now holds the opponent instead of the player who's move we're undoing.
 	game->to_play = 1 - game->to_play;
 
 	// unapplies the move to the bitboard for that piece
-	game->board[piece] ^= move[0] | move[1];
-	game->piece_list[index].loc ^= move[0] | move[1];
+	game->board[piece] ^= from_loc | to_loc;
+	game->piece_list[index].loc ^= from_loc | to_loc;
 
 	// castling kingside
 	if (flag == 2) {
@@ -865,22 +1235,79 @@ void unapply(struct Game* game, unsigned long long* move, unsigned long long rem
 
 		// the pawn will have reappeared on both its starting and finishing square as it is undone, 
 		// so it needs to be removed from its finishing square again.
-		game->board[piece] ^= move[1];
+		game->board[piece] ^= to_loc;
 		// removes the promoted piece
-		game->board[promotion_type] ^= move[1];
+		game->board[promotion_type] ^= to_loc;
 		// changes the type of the piece in the piece_list back to a pawn
 		game->piece_list[index].type = piece;
 	}
 
-	for (i = 0; i < 3; i++) {
-		game->last_move[i] = previous_last_move[i];
-	}
+	// puts back the variables saved when the move was made, and the hash of the position from before the move.
+	game->last_move = undo->last_move;
+	game->castling = undo->castling;
+	game->ply_counter = undo->ply_counter;
+	game->value = undo->value;
+	game->current_np_material = undo->current_np_material;
+	game->material_key = undo->material_key;
+	game->hash = game->past_hash_list[game->history_length & (HISTORY_SIZE - 1)];
+}
+
+/*
+Passes the turn to the other player without moving anything (a null move), which is used by the engine for null move pruning.
+Like make, what is needed to undo it is saved on the undo stack, with a move of 0, and it is undone with unmake_null_move.
+The ply counter is reset as if the null move were irreversible, so that repetitions aren't looked for across it, since the positions before 
+it can't be reached from the positions after it by legal moves.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+void make_null_move(struct Game* game, unsigned long long* zobrist_numbers) {
+	struct Undo* undo = &game->undo_stack[game->history_length & (HISTORY_SIZE - 1)];
+	undo->move = 0;
+	undo->captured = 32;
+	undo->castling = game->castling;
+	undo->ply_counter = game->ply_counter;
+	undo->last_move = game->last_move;
+	undo->value = game->value;
+	undo->current_np_material = game->current_np_material;
+	undo->material_key = game->material_key;
+
+	// en passant is no longer possible once the other player has had a move
+	game->hash ^= en_passant_hash(game, zobrist_numbers);
+	game->to_play = 1 - game->to_play;
+	game->hash ^= zobrist_numbers[792];
+	game->last_move = 0;
+	game->ply_counter = 0;
 
-	// undoes the changes to the castling, ply_counter, hash and past_hash_list variables.
-	game->castling = previous_castling;
-	game->past_hash_list[game->ply_counter] = removed_hash;
-	game->ply_counter = previous_ply_counter;
-	game->hash = game->past_hash_list[game->ply_counter];
+	game->history_length++;
+	game->past_hash_list[game->history_length & (HISTORY_SIZE - 1)] = game->hash;
+}
+
+/*
+Undoes a null move made with make_null_move.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+void unmake_null_move(struct Game* game) {
+	game->history_length--;
+	struct Undo* undo = &game->undo_stack[game->history_length & (HISTORY_SIZE - 1)];
+	game->to_play = 1 - game->to_play;
+	game->last_move = undo->last_move;
+	game->ply_counter = undo->ply_counter;
+	game->value = undo->value;
+	game->hash = game->past_hash_list[game->history_length & (HISTORY_SIZE - 1)];
+}
+
+/*
+Returns true if the last move made was a null move (see make_null_move), which is recorded on the undo stack with a move of 0.
+This is different from the last move being 0, which also happens in a position which has just been set up (e.g from a fen string).
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+bool after_null_move(struct Game* game) {
+	return game->history_length > 0 && game->undo_stack[(game->history_length - 1) & (HISTORY_SIZE - 1)].move == 0;
 }
 
 /*
@@ -888,39 +1315,41 @@ Function which applies the critical changes to the position such that they can b
 board and move take the same form as they do in apply. This should only be used to verify whether or not the resulting position is check, as any changes which
 are not useful for this purpose aren't applied.
 
-Last Modified: 19/9/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-int quick_apply(unsigned long long* board, unsigned long long* move, int to_play, struct Piece* piece_list) {
+int quick_apply(unsigned long long* board, unsigned int move, int to_play, struct Piece* piece_list) {
 	// breaks the last part of the move down into the bit describing the piece, and the bit describing the type of move, or flag
-	int piece = (move[2] >> 4) & 15;
-	int flag = move[2] & 15;
+	int piece = move_piece(move);
+	int flag = move_flag(move);
 	int captured = -1;
+	unsigned long long from_loc = (unsigned long long)1 << move_from(move);
+	unsigned long long to_loc = (unsigned long long)1 << move_to(move);
 
 	// applies the move to the bitboard for that piece
-	board[piece] ^= move[0] | move[1];
+	board[piece] ^= from_loc | to_loc;
 
 	// if the king moves, updates his position as this is the only part of the piece_list which may be used after a quick_apply.
 	if (piece % 6 == 5) {
-		piece_list[15 + 16 * to_play].loc ^= move[0] | move[1];
+		piece_list[15 + 16 * to_play].loc ^= from_loc | to_loc;
 	}
 
 	// applies captures
 	// en passant for white
 	if (flag == 5 && to_play == 0) {
-		board[6] ^= (move[1] >> 8);
+		board[6] ^= (to_loc >> 8);
 		captured = 6;
 	}
 	// en passant for black
 	else if (flag == 5 && to_play == 1) {
-		board[0] ^= (move[1] << 8);
+		board[0] ^= (to_loc << 8);
 		captured = 0;
 	}
 	// other captures
 	else if ((flag & 4) != 0) {
 		for (int i = (1 - to_play) * 6; i < 6 * (1 - to_play) + 6; i++) {
-			if ((board[i] & move[1]) != 0) {
-				board[i] ^= (board[i] & move[1]);
+			if ((board[i] & to_loc) != 0) {
+				board[i] ^= (board[i] & to_loc);
 				captured = i;
 			}
 		}
@@ -932,179 +1361,313 @@ int quick_apply(unsigned long long* board, unsigned long long* move, int to_play
 
 /*
 Function which undoes the changes made by the quick_apply function.
-Last Modified: 19/9/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-void quick_undo(unsigned long long* board, unsigned long long* move, int to_play, int captured, struct Piece* piece_list) {
-	// breaks the last part of the move down into the index (of the piece moving in the piece_list), the piece type and the flag (all documented in play_game)
-	int index = (int)move[2] >> 8;
-	int piece = (move[2] >> 4) & 15;
-	int flag = move[2] & 15;
+void quick_undo(unsigned long long* board, unsigned int move, int to_play, int captured, struct Piece* piece_list) {
+	// breaks the move down into the piece type and the flag (documented in play_game)
+	int piece = move_piece(move);
+	int flag = move_flag(move);
+	unsigned long long from_loc = (unsigned long long)1 << move_from(move);
+	unsigned long long to_loc = (unsigned long long)1 << move_to(move);
 
 	// undoes the move to the bitboard for that piece
-	board[piece] ^= move[0] | move[1];
+	board[piece] ^= from_loc | to_loc;
 
 	// if the king moves, updates his position as this is the only part of the piece_list which is changed by quick_apply.
 	if (piece % 6 == 5) {
-		piece_list[15 + 16 * to_play].loc ^= move[0] | move[1];
+		piece_list[15 + 16 * to_play].loc ^= from_loc | to_loc;
 	}
 
 	// undoes captures
 	// en passant for white
 	if (flag == 5 && to_play == 0) {
-		board[6] ^= (move[1] >> 8);
+		board[6] ^= (to_loc >> 8);
 	}
 	// en passant for black
 	else if (flag == 5 && to_play == 1) {
-		board[0] ^= (move[1] << 8);
+		board[0] ^= (to_loc << 8);
 	}
 	// other captures
 	else if ((flag & 4) != 0) {
-		board[captured] ^= move[1];
+		board[captured] ^= to_loc;
 	}
 }
 
+// stages of the move generation, which can be combined with |. Captures include promotions and quiet moves include castling.
+enum { CAPTURE_MOVES = 1, QUIET_MOVES = 2, ALL_MOVES = 3 };
+
 /*
-Function which returns the legal moves in a position.
-All inputs are the same as for the apply function, except that the castling and to_play variables don't have to be modified and so can be passed normally, and
-the added legal_moves array to put the moves in.
-Last Modified: 10/08/2021
+Generates all the legal moves in a position directly, rather than generating pseudolegal moves and applying each one to see whether it leaves the king in check.
+The pieces giving check and the pieces pinned to the king are found once per position, and the moves of every other piece are masked with them:
+- when in check from one piece, the other pieces can only capture the checking piece or block the check
+- when in double check, only the king can move
+- a pinned piece can only move along the line between the king and the piece pinning it
+Only king moves and en passant still have to be verified (en passant can discover a check along the rank, which the pins don't catch).
+
+The moves can be generated in stages, so that the search only generates the moves it needs:
+stages = CAPTURE_MOVES gives the captures and promotions, QUIET_MOVES gives all the other moves (including castling) and ALL_MOVES gives both.
+The captures and promotions always come before the quiet moves, so the moves from generating both stages separately are in the same order as with ALL_MOVES.
+
+board, to_play, castling, last_move and piece_list are the same as in the Game struct. legal_moves is the array the moves are put into.
+Returns the number of legal moves found.
+
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-int legal_moves(struct Game* game, unsigned long long legal_moves[220][3]) {
+int generate_legal_moves(unsigned long long* board, int to_play, int castling, unsigned int last_move, struct Piece* piece_list,
+	int stages, unsigned int* legal_moves) {
 	// integers used in for loops
 	int i;
 	int j;
 
-	// total number of legal moves generated
+	// total number of captures and promotions generated, and of quiet moves generated
 	int num_moves = 0;
-	// number of pseudolegal moves found for that piece
+	int num_quiet_moves = 0;
+	// number of pseudolegal moves found for a pawn
 	int piece_moves = 0;
-	// holds the piece which has been captured when the move is applied to look for check
+	// holds the piece which has been captured when en passant is applied to look for check
 	int captured;
+	int square;
 
 	// the first 6 bitboards in board hold the white pieces, the next 6 black... These store this shift for white and for black so it doesn't have to be calculated every time.
-	int p = 6 * game->to_play;
-	int other_p = 6 * (1 - game->to_play);
+	int p = 6 * to_play;
+	int other_p = 6 * (1 - to_play);
 
-	// holds the pseudolegal moves for one piece
-	unsigned long long piece_legal_moves[28][3];
+	// holds the pseudolegal moves for a pawn
+	unsigned int piece_legal_moves[28];
+	// holds the quiet moves until all the captures have been generated, so that they can be put after them
+	unsigned int quiet_moves[220];
+	unsigned int move;
 
 	// precalculated bitboards with the locations of each of the pieces for each colour
 	unsigned long long other_pieces = 0;
 	unsigned long long same_pieces = 0;
 
 	for (i = 0; i < 6; i++) {
-		other_pieces ^= game->board[i + other_p];
-		same_pieces ^= game->board[i + p];
+		other_pieces ^= board[i + other_p];
+		same_pieces ^= board[i + p];
+	}
+	unsigned long long all_pieces = same_pieces | other_pieces;
+
+	// squares which the pieces can move to in the stages which are being generated
+	unsigned long long capture_targets = 0;
+	unsigned long long quiet_targets = 0;
+	if ((stages & CAPTURE_MOVES) != 0) {
+		capture_targets = other_pieces;
+	}
+	if ((stages & QUIET_MOVES) != 0) {
+		quiet_targets = ~all_pieces;
+	}
+
+	unsigned long long king_loc = piece_list[15 + 16 * to_play].loc;
+	int king_square = get_square(king_loc);
+	unsigned long long loc;
+	unsigned long long destinations;
+	int piece_type;
+
+	// pieces giving check
+	unsigned long long checkers = attackers_to(board, to_play, king_square, all_pieces);
+	// squares the other pieces must move to: anywhere if not in check, onto the checking piece or in between if in check, and nowhere if in double check
+	unsigned long long check_mask = ~(unsigned long long)0;
+	if (checkers != 0) {
+		if ((checkers & (checkers - 1)) == 0) {
+			check_mask = checkers | between_table[king_square][get_square(checkers)];
+		}
+		else {
+			check_mask = 0;
+		}
 	}
 
+	// finds the pinned pieces by looking at the sliding pieces which would attack the king if none of our pieces were in the way,
+	// and seeing if exactly one of our pieces is between them and the king. pin_rays holds the squares each pinned piece can move to.
+	unsigned long long pinned = 0;
+	unsigned long long pin_rays[64];
+	unsigned long long between;
+	unsigned long long pinners = (rook_attacks(king_square, other_pieces) & (board[3 + other_p] | board[4 + other_p])) |
+		(bishop_attacks(king_square, other_pieces) & (board[2 + other_p] | board[4 + other_p]));
+	while (pinners != 0) {
+		square = pop_lowest_square(&pinners);
+		between = between_table[king_square][square] & all_pieces;
+		if (between != 0 && (between & (between - 1)) == 0 && (between & same_pieces) != 0) {
+			pinned |= between;
+			pin_rays[get_square(between)] = between_table[king_square][square] | ((unsigned long long)1 << square);
+		}
+	}
 
 	// loops through each of the pieces for the side to play, to generate the legal moves for each of them.
-	for (i = game->to_play * 16; i < 16 + game->to_play * 16; i++) {
-		if (!game->piece_list[i].captured) {
-			// generates the legal moves for that piece depending on its piece type.
-			switch (game->piece_list[i].type % 6) {
-			case 0:
-				piece_moves = get_pawn_moves(same_pieces, other_pieces, game->piece_list[i].loc, piece_legal_moves, i, game->to_play, game->last_move);
-				break;
-			case 1:
-				piece_moves = get_knight_moves(same_pieces, other_pieces, game->piece_list[i].loc, piece_legal_moves, i, game->to_play);
-				break;
-			case 2:
-				piece_moves = get_bishop_moves(same_pieces, other_pieces, game->piece_list[i].loc, piece_legal_moves, i, game->to_play);
-				break;
-			case 3:
-				piece_moves = get_rook_moves(same_pieces, other_pieces, game->piece_list[i].loc, piece_legal_moves, i, game->to_play);
-				break;
-			case 4:
-				piece_moves = get_queen_moves(same_pieces, other_pieces, game->piece_list[i].loc, piece_legal_moves, i, game->to_play);
-				break;
-			case 5:
-				piece_moves = get_king_moves(same_pieces, other_pieces, game->piece_list[i].loc, piece_legal_moves, i, game->to_play, game->castling, game->board);
-				break;
+	for (i = to_play * 16; i < 16 + to_play * 16; i++) {
+		if (piece_list[i].captured) {
+			continue;
+		}
+		loc = piece_list[i].loc;
+		square = get_square(loc);
+		piece_type = piece_list[i].type;
+
+		// the king's moves are checked individually, with the king taken off the board so that it doesn't block the attacks of sliding pieces
+		if (piece_type % 6 == 5) {
+			destinations = king_attack_table[square] & (capture_targets | quiet_targets);
+			while (destinations != 0) {
+				j = pop_lowest_square(&destinations);
+				if (attackers_to(board, to_play, j, all_pieces ^ king_loc) == 0) {
+					if (((other_pieces >> j) & 1) != 0) {
+						legal_moves[num_moves] = make_move(square, j, 4, piece_type, i);
+						num_moves++;
+					}
+					else {
+						quiet_moves[num_quiet_moves] = make_move(square, j, 0, piece_type, i);
+						num_quiet_moves++;
+					}
+				}
 			}
 
-			// loops through each of the moves generated to see if it's in check.
-			for (j = 0; j < piece_moves; j++) {
-				// move is applied to the position efficiently (factors which don't change whether the resulting position is check aren't applied)
-				captured = quick_apply(game->board, piece_legal_moves[j], game->to_play, game->piece_list);
+			// castling is only legal when not in check, and the king can't pass through or land on an attacked square.
+			// Squares which must be empty are 01100000 (96) for kingside and 00001110 (14) for queenside, shifted up 7 ranks for black.
+			if (castling != 0 && checkers == 0 && (stages & QUIET_MOVES) != 0) {
+				if (((castling & (2 + 6 * to_play)) != 0) && ((all_pieces & ((unsigned long long)96 << (56 * to_play))) == 0) &&
+					!(is_attacked(board, to_play, loc << 1)) && !(is_attacked(board, to_play, loc << 2))) {
+					quiet_moves[num_quiet_moves] = make_move(square, square + 2, 2, piece_type, i);
+					num_quiet_moves++;
+				}
+				if (((castling & (1 + 3 * to_play)) != 0) && ((all_pieces & ((unsigned long long)14 << (56 * to_play))) == 0) &&
+					!(is_attacked(board, to_play, loc >> 1)) && !(is_attacked(board, to_play, loc >> 2))) {
+					quiet_moves[num_quiet_moves] = make_move(square, square - 2, 3, piece_type, i);
+					num_quiet_moves++;
+				}
+			}
+			continue;
+		}
+
+		// in double check only the king can move
+		if (check_mask == 0) {
+			continue;
+		}
 
-				// if the resulting position is not check, the move is added to the array of legal moves. (the position passed in is that of the king of the relevant colour)
-				if (!(is_attacked(game->board, game->to_play, game->piece_list[15 + 16 * game->to_play].loc))) {
-					// the index and piece are already included within the flag so we don't need to add them.
-					add_move(legal_moves[num_moves], piece_legal_moves[j][0], piece_legal_moves[j][1], piece_legal_moves[j][2], 0, 0);
+		switch (piece_type % 6) {
+		case 0:
+			piece_moves = get_pawn_moves(same_pieces, other_pieces, loc, piece_legal_moves, i, to_play, last_move);
+			for (j = 0; j < piece_moves; j++) {
+				move = piece_legal_moves[j];
+				// the destination of the move must block any check, and keep the pawn on its pin ray if it is pinned
+				destinations = ((unsigned long long)1 << move_to(move)) & check_mask;
+				if ((pinned & loc) != 0) {
+					destinations &= pin_rays[square];
+				}
+				// flags 0 and 1 are the quiet pawn moves, every other flag is a capture or promotion
+				if ((move_flag(move) & 12) == 0) {
+					if ((stages & QUIET_MOVES) != 0 && destinations != 0) {
+						quiet_moves[num_quiet_moves] = move;
+						num_quiet_moves++;
+					}
+				}
+				else if ((stages & CAPTURE_MOVES) == 0) {
+					continue;
+				}
+				// en passant is verified by applying it, as it takes two pieces off the same rank at once
+				else if (move_flag(move) == 5) {
+					captured = quick_apply(board, move, to_play, piece_list);
+					if (!(is_attacked(board, to_play, king_loc))) {
+						legal_moves[num_moves] = move;
+						num_moves++;
+					}
+					quick_undo(board, move, to_play, captured, piece_list);
+				}
+				else if (destinations != 0) {
+					legal_moves[num_moves] = move;
 					num_moves++;
 				}
-
-				// the move is undone from the position
-				quick_undo(game->board, piece_legal_moves[j], game->to_play, captured, game->piece_list);
 			}
+			continue;
+		case 1:
+			destinations = knight_attack_table[square];
+			break;
+		case 2:
+			destinations = bishop_attacks(square, all_pieces);
+			break;
+		case 3:
+			destinations = rook_attacks(square, all_pieces);
+			break;
+		default:
+			destinations = rook_attacks(square, all_pieces) | bishop_attacks(square, all_pieces);
+			break;
+		}
+
+		destinations &= check_mask;
+		if ((pinned & loc) != 0) {
+			destinations &= pin_rays[square];
 		}
+		num_moves += add_moves_from_bitboard(&legal_moves[num_moves], square, destinations & capture_targets, other_pieces, piece_type, i);
+		num_quiet_moves += add_moves_from_bitboard(&quiet_moves[num_quiet_moves], square, destinations & quiet_targets, other_pieces, piece_type, i);
 	}
 
+	// puts the quiet moves after the captures
+	memcpy(&legal_moves[num_moves], quiet_moves, num_quiet_moves * sizeof(quiet_moves[0]));
+
 	// returns the final number of legal moves, so that the code only uses the part of the legal_moves list which holds actual moves (as it is declared 
 	// in advance, it by default will have a size significantly larger than the number of moves it will usually return)
-	return num_moves;
+	return num_moves + num_quiet_moves;
 }
 
 /*
-Looks for a draw by lack of material, by looking through the piece list and checking whether there are enough pieces to carry on playing
-inputs: piece_list: List of structs of each piece, holding piece location, type and whether it has been captured.
-Last Modified: 17/8/2021
+Function which returns the legal moves in a position.
+game: Game struct holding the position
+legal_moves: array to put the moves in, which must have room for 220 moves.
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-bool draw_by_lack_of_material(struct Piece* piece_list) {
-	int i;
-	int num_minor_pieces = 0;
-	int num_bishops[2] = { 0, 0 };
-	int bishop_rank;
-	int bishop_file;
-	int bishop_type;
-
-	for (i = 0; i < 32; i++) {
-		if (!piece_list[i].captured) {
-			switch (piece_list[i].type % 6) {
-				// a pawn is always enough material to win
-			case 0:
-				return false;
-				// a knight will be enough to win if there is at least another piece on the board
-			case 1:
-				num_minor_pieces++;
-				if (num_minor_pieces >= 2) {
-					return false;
-				}
-				break;
-				// a bishop will be enough to win if there is at least another piece on the board which is not a bishop of the same colour
-			case 2:
-				num_minor_pieces++;
-				bishop_rank = rank(piece_list[i].loc);
-				bishop_file = file(piece_list[i].loc);
-				if (bishop_rank % 2 == bishop_file % 2) {
-					num_bishops[0]++;
-					bishop_type = 0;
-				}
-				else {
-					num_bishops[1]++;
-					bishop_type = 1;
-				}
+int legal_moves(struct Game* game, unsigned int* legal_moves) {
+	return generate_legal_moves(game->board, game->to_play, game->castling, game->last_move, game->piece_list, ALL_MOVES, legal_moves);
+}
 
-				if (num_minor_pieces >= 2 && num_minor_pieces != num_bishops[bishop_type]) {
-					return false;
-				}
-				break;
-				// a rook is always enough to win
-			case 3:
-				return false;
-				// a queen is always enough to win
-			case 4:
-				return false;
-			default:
-				break;
-			}
+/*
+Looks for a draw by lack of material using the material key, so it takes the same time however many pieces there are.
+There is enough material to carry on playing if either player has a pawn, rook or queen, or if there are at least 2 minor pieces on the board,
+unless these are all bishops on the same colour of square.
+inputs: material_key: material key from the Game struct (see calculate_material_key)
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+bool insufficient_material(unsigned long long material_key) {
+	int colour;
+	int knights = 0;
+	int dark_bishops = 0;
+	int light_bishops = 0;
+
+	// pawns, rooks and queens are always enough material to win
+	for (colour = 0; colour < 2; colour++) {
+		if (material_count(material_key, colour, MATERIAL_PAWN) + material_count(material_key, colour, MATERIAL_ROOK) 
+			+ material_count(material_key, colour, MATERIAL_QUEEN) != 0) {
+			return false;
 		}
+		knights += material_count(material_key, colour, MATERIAL_KNIGHT);
+		dark_bishops += material_count(material_key, colour, MATERIAL_DARK_BISHOP);
+		light_bishops += material_count(material_key, colour, MATERIAL_LIGHT_BISHOP);
 	}
-	return true;
+
+	// a single minor piece can never win
+	if (knights + dark_bishops + light_bishops <= 1) {
+		return true;
+	}
+	// any number of bishops which are all on the same colour can't win either
+	return knights == 0 && (dark_bishops == 0 || light_bishops == 0);
+}
+
+/*
+Returns true if the current position has already occured since the last irreversible move. In the search, a position which repeats
+can be scored as a draw straight away, as if the repetition was good for either player they could have played the same moves again.
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+bool is_repetition(struct Game* game) {
+	int i;
+	// the same position can only come back after at least 4 ply, and only with the same player to play.
+	// Positions from before the last irreversible move, or from before the game was set up, can't be the same.
+	for (i = 4; i <= game->ply_counter && i <= game->history_length; i += 2) {
+		if (game->hash == game->past_hash_list[(game->history_length - i) & (HISTORY_SIZE - 1)]) {
+			return true;
+		}
+	}
+	return false;
 }
 
 /*
@@ -1112,79 +1675,17 @@ Looks to see if there is checkmate or stalemate... First checks that there are n
 INPUTS:
 board: same as usual, 12 x bitboards documented in play_game
 to_play: 0 (white is the one being mated) or 1 (black is the one being mated)
-last_move: last move to be played, using the standard notation used in play_game
+last_move: last move to be played (see make_move)
 piece_list: array of 32 pieces, each one containing the piece type, their location and whether or not they have been captured yet.
-Last Modified: 17/8/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
-UNTESTED
 */
-int look_for_mates(unsigned long long* board, int to_play, unsigned long long* last_move, struct Piece* piece_list) {
-	int i;
-	int j;
-
-	// number of pseudolegal moves found for each piece when its moves are generated
-	int piece_moves = 0;
-	// holds the piece which has been captured when the move is applied to look for check
-	int captured;
-
-	// holds the pseudolegal moves for one piece
-	unsigned long long piece_legal_moves[28][3];
-
-	// precalculated bitboards with the locations of each of the pieces for each colour
-	unsigned long long other_pieces = 0;
-	unsigned long long same_pieces = 0;
-
-
-	// the first 6 bitboards in board hold the white pieces, the next 6 black... These store this shift for white and for black so it doesn't have to be calculated every time.
-	int p = 6 * to_play;
-	int other_p = 6 * (1 - to_play);
-
-	for (i = 0; i < 6; i++) {
-		other_pieces ^= board[i + other_p];
-		same_pieces ^= board[i + p];
-	}
-
-	// tries to find a single legal move for the player. If this is found, it is neither checkmate nor stalemate
-	for (i = 16 * to_play; i < 16 * to_play + 16; i++) {
-		if (!piece_list[i].captured) {
-			// generates the legal moves for that piece depending on its piece type.
-			switch (piece_list[i].type % 6) {
-			case 0:
-				piece_moves = get_pawn_moves(same_pieces, other_pieces, piece_list[i].loc, piece_legal_moves, i, to_play, last_move);
-				break;
-			case 1:
-				piece_moves = get_knight_moves(same_pieces, other_pieces, piece_list[i].loc, piece_legal_moves, i, to_play);
-				break;
-			case 2:
-				piece_moves = get_bishop_moves(same_pieces, other_pieces, piece_list[i].loc, piece_legal_moves, i, to_play);
-				break;
-			case 3:
-				piece_moves = get_rook_moves(same_pieces, other_pieces, piece_list[i].loc, piece_legal_moves, i, to_play);
-				break;
-			case 4:
-				piece_moves = get_queen_moves(same_pieces, other_pieces, piece_list[i].loc, piece_legal_moves, i, to_play);
-				break;
-			case 5:
-				piece_moves = get_king_moves(same_pieces, other_pieces, piece_list[i].loc, piece_legal_moves, i, to_play, 0, board);
-				break;
-			}
-
-
-			// loops through each of the moves generated to see if it's in check.
-			for (j = 0; j < piece_moves; j++) {
-				// move is applied to the position efficiently (factors which don't change whether the resulting position is check aren't applied)
-				captured = quick_apply(board, piece_legal_moves[j], to_play, piece_list);
+int look_for_mates(unsigned long long* board, int to_play, unsigned int last_move, struct Piece* piece_list) {
+	unsigned int moves[220];
 
-				// if the resulting position is not check, then it is neither checkmate nor stalemate
-				if (!(is_attacked(board, to_play, piece_list[15 + 16 * to_play].loc))) {
-					quick_undo(board, piece_legal_moves[j], to_play, captured, piece_list);
-					return 0;
-				}
-
-				// the move is undone from the position
-				quick_undo(board, piece_legal_moves[j], to_play, captured, piece_list);
-			}
-		}
+	// if there is a single legal move, it is neither checkmate nor stalemate (castling is never the only legal move, so it isn't generated)
+	if (generate_legal_moves(board, to_play, 0, last_move, piece_list, ALL_MOVES, moves) != 0) {
+		return 0;
 	}
 
 	// if there are no moves and it is check, then it is checkmate, if not then it is stalemate
@@ -1198,7 +1699,7 @@ int look_for_mates(unsigned long long* board, int to_play, unsigned long long* l
 Function which determines whether or not the game is in a terminal state... Returns 0 if a win for black, 1 if draw, 2 if win for white and 3 if the position is not terminal
 INPUTS:
 game: Game struct holding all the information needed about the game.
-Last Modified: 16/9/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
 int terminal(struct Game* game) {
@@ -1214,9 +1715,9 @@ int terminal(struct Game* game) {
 	// and threefold repetition can only occur at least 3 moves after the reset, so we check that the move counter is at least 4 for efficiency purposes
 	else if (game->ply_counter >= 8) {
 		// it is only a repetition if it is the same player to play, and so we only look at the moves where it is this player to play
-		for (i = game->ply_counter % 2; i < game->ply_counter; i += 2) {
+		for (i = 2; i <= game->ply_counter && i <= game->history_length; i += 2) {
 			// increments the repetition counter if this position is a repetition of the past board
-			if (game->hash == game->past_hash_list[i]) {
+			if (game->hash == game->past_hash_list[(game->history_length - i) & (HISTORY_SIZE - 1)]) {
 				repetitions++;
 				// if this position has occured 2 times in the past then this is the third repetition and so it is a draw
 				if (repetitions == 2) {
@@ -1227,7 +1728,7 @@ int terminal(struct Game* game) {
 	}
 
 	// gets draw by lack of material
-	if (draw_by_lack_of_material(game->piece_list)) {
+	if (insufficient_material(game->material_key)) {
 		return 1;
 	}
 
@@ -1245,34 +1746,187 @@ int terminal(struct Game* game) {
 	return 3;
 }
 
+// Marks a global variable as having a separate copy for each thread (e.g the killer moves in the engine, as each thread searches different positions)
+#if defined(_MSC_VER)
+#define THREAD_LOCAL __declspec(thread)
+#else
+#define THREAD_LOCAL _Thread_local
+#endif
+
+/*
+Structure holding a thread, along with the function it runs and the argument passed to it. This hides the differences between windows threads
+and pthreads, so that the rest of the code can use start_thread and join_thread on any platform.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+struct Thread {
+#if defined(_WIN32)
+	HANDLE handle;
+#else
+	pthread_t handle;
+#endif
+	void (*function)(void*);
+	void* argument;
+};
+
+// Function actually run by the new thread, which just calls the function held in the Thread struct
+// Last Modified: 18/10/2026
+// Last Modified by: Arkleseisure
+#if defined(_WIN32)
+DWORD WINAPI thread_entry(LPVOID thread) {
+	((struct Thread*)thread)->function(((struct Thread*)thread)->argument);
+	return 0;
+}
+#else
+void* thread_entry(void* thread) {
+	((struct Thread*)thread)->function(((struct Thread*)thread)->argument);
+	return NULL;
+}
+#endif
+
+/*
+Starts a new thread running function(argument). Returns false if the thread couldn't be created.
+thread: Thread struct to hold the thread, which must stay in the same place in memory until join_thread has been called for it.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+bool start_thread(struct Thread* thread, void (*function)(void*), void* argument) {
+	thread->function = function;
+	thread->argument = argument;
+#if defined(_WIN32)
+	thread->handle = CreateThread(NULL, 0, thread_entry, thread, 0, NULL);
+	return thread->handle != NULL;
+#else
+	return pthread_create(&thread->handle, NULL, thread_entry, thread) == 0;
+#endif
+}
+
+// Waits for a thread started by start_thread to finish
+// Last Modified: 18/10/2026
+// Last Modified by: Arkleseisure
+void join_thread(struct Thread* thread) {
+#if defined(_WIN32)
+	WaitForSingleObject(thread->handle, INFINITE);
+	CloseHandle(thread->handle);
+#else
+	pthread_join(thread->handle, NULL);
+#endif
+}
+
+// Adds 1 to a value shared between threads, returning what it was before, without any other thread being able to change it in between.
+// Last Modified: 18/10/2026
+// Last Modified by: Arkleseisure
+long atomic_fetch_increment(volatile long* value) {
+#if defined(_MSC_VER)
+	return InterlockedIncrement(value) - 1;
+#else
+	return __atomic_fetch_add(value, 1, __ATOMIC_SEQ_CST);
+#endif
+}
+
+/*
+Hash table used to store the results of perft from positions which have already been counted, as the same positions are reached through 
+many different move orders. Each entry takes num_counts + 1 numbers: a check, followed by the counts for the position (just the number of nodes 
+for perft_nodes, and all 7 answers for perft_all). The check is the key (hash of the position, with the depth in the lowest 6 bits) xored with
+each of the counts, so that if two threads write to the same entry at the same time, the mixed up entry will just fail the check instead of
+giving the wrong answer.
+entries: array of num_entries * (num_counts + 1) numbers, all 0 to start with.
+mask: num_entries - 1, where num_entries is a power of 2, used to get the index of an entry from its key.
+num_counts: number of counts held in each entry.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+struct PerftTable {
+	unsigned long long* entries;
+	unsigned long long mask;
+	int num_counts;
+};
+
+// Returns the key used for a position at a certain depth in the perft hash table.
+// Last Modified: 18/10/2026
+// Last Modified by: Arkleseisure
+unsigned long long perft_key(unsigned long long hash, int depth) {
+	return (hash & ~(unsigned long long)63) | depth;
+}
+
+/*
+Looks for a position in the perft hash table, adding its counts to answers and returning true if it is there.
+table: perft hash table, or NULL if no table is being used.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+bool probe_perft_table(struct PerftTable* table, unsigned long long key, unsigned long long* answers) {
+	int i;
+	if (table == NULL) {
+		return false;
+	}
+	unsigned long long* entry = table->entries + ((key >> 6) & table->mask) * (table->num_counts + 1);
+	unsigned long long counts[7];
+	unsigned long long check = entry[0];
+	for (i = 0; i < table->num_counts; i++) {
+		counts[i] = entry[i + 1];
+		check ^= counts[i];
+	}
+	if (check != key) {
+		return false;
+	}
+	for (i = 0; i < table->num_counts; i++) {
+		answers[i] += counts[i];
+	}
+	return true;
+}
+
+// Stores the counts for a position in the perft hash table, replacing whatever was in that entry before
+// Last Modified: 18/10/2026
+// Last Modified by: Arkleseisure
+void store_perft_table(struct PerftTable* table, unsigned long long key, unsigned long long* counts) {
+	int i;
+	if (table == NULL) {
+		return;
+	}
+	unsigned long long* entry = table->entries + ((key >> 6) & table->mask) * (table->num_counts + 1);
+	unsigned long long check = key;
+	for (i = 0; i < table->num_counts; i++) {
+		entry[i + 1] = counts[i];
+		check ^= counts[i];
+	}
+	entry[0] = check;
+}
+
 /*
 Perft function: calculates the number of nodes, captures, en passant captures, castles, promotions, checks and checkmates at a certain depth.
 These values are then compared to generally accepted values in order to check the functioning of the game mechanics code.
+table: perft hash table holding the answers for positions which have already been counted, or NULL to count every position.
 
-Last Modified: 9/9/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-void perft_all(struct Game* game, unsigned long long* answers, unsigned long long* zobrist_numbers, int depth) {
+void perft_all(struct Game* game, unsigned long long* answers, unsigned long long* zobrist_numbers, int depth, struct PerftTable* table) {
 	// checks if the position is at the final depth. if so, it adds the values to the answers, the order of these being: 
 	// Nodes, Captures, En passant, Castling, Promotion, Checks, Checkmates
 	if (depth == 0) {
+		int flag = move_flag(game->last_move);
 		answers[0]++;
 		// captures are noted in the 3rd bit of the flag
-		if ((game->last_move[2] & 4) != 0) {
+		if ((flag & 4) != 0) {
 			answers[1]++;
 			// denotes the previous move being en passant
-			if ((game->last_move[2] & 15) == 5) {
+			if (flag == 5) {
 				answers[2]++;
 			}
 		}
 
 		// checks for kingside or queenside castling
-		if (((game->last_move[2] & 15) == 2) || ((game->last_move[2] & 15) == 3)) {
+		if (flag == 2 || flag == 3) {
 			answers[3]++;
 		}
 
 		// looks for promotions
-		if ((game->last_move[2] & 8) != 0) {
+		if ((flag & 8) != 0) {
 			answers[4]++;
 		}
 
@@ -1287,63 +1941,232 @@ void perft_all(struct Game* game, unsigned long long* answers, unsigned long lon
 		return;
 	}
 
-	unsigned long long moves[220][3];
-	unsigned long long previous_last_move[3];
-	int previous_ply_counter = game->ply_counter;
-	int previous_castling = game->castling;
+	// the answers from a position only depend on the position once at least one more move has been made 
+	// (at depth 0 they depend on the move which was made to get there)
+	unsigned long long key = perft_key(game->hash, depth);
+	if (probe_perft_table(table, key, answers)) {
+		return;
+	}
+
+	unsigned int moves[220];
+	unsigned long long counts[7] = { 0, 0, 0, 0, 0, 0, 0 };
 	int num_moves;
-	int captured;
 	int i;
-	// single variables are passed as arrays so that their values are returned automatically.
-	unsigned long long removed_hash[1] = { 0 };
-
-	// this is required in order to be able to undo the move properly, as otherwise the last move is changed and there is no way to get it back.
-	for (i = 0; i < 3; i++) {
-		previous_last_move[i] = game->last_move[i];
-	}
 
 	num_moves = legal_moves(game, moves);
 
 	for (i = 0; i < num_moves; i++) {
-		captured = apply(game, moves[i], zobrist_numbers, removed_hash);
-		perft_all(game, answers, zobrist_numbers, depth - 1);
-		unapply(game, moves[i], removed_hash[0], captured, previous_castling, previous_ply_counter, previous_last_move);
+		make(game, moves[i], zobrist_numbers);
+		perft_all(game, counts, zobrist_numbers, depth - 1, table);
+		unmake(game);
+	}
+
+	store_perft_table(table, key, counts);
+	for (i = 0; i < 7; i++) {
+		answers[i] += counts[i];
 	}
 }
 
 /*
 Same as perft_all, but doesn't return all the debugging statistics and is instead more streamlined and used for benchmarking
+table: perft hash table holding the number of nodes for positions which have already been counted, or NULL to count every position.
 
-Last Modified: 9/9/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 */
-void perft_nodes(struct Game* game, int depth, unsigned long long* answers, unsigned long long* zobrist_numbers) {
-	unsigned long long moves[220][3];
-	unsigned long long previous_last_move[3];
-	int previous_ply_counter = game->ply_counter;
-	int previous_castling = game->castling;
+void perft_nodes(struct Game* game, int depth, unsigned long long* answers, unsigned long long* zobrist_numbers, struct PerftTable* table) {
+	unsigned int moves[220];
 	int num_moves;
-	int captured;
 	int i;
-	// single variables are passed as arrays so that their values are returned automatically.
-	unsigned long long removed_hash[1];
 
-	// this is required in order to be able to undo the move properly, as otherwise the last move is changed and there is no way to get it back.
-	for (i = 0; i < 3; i++) {
-		previous_last_move[i] = game->last_move[i];
+	// the number of legal moves is all that is needed at depth 1, so it isn't worth using the hash table there
+	if (depth == 1) {
+		answers[0] += legal_moves(game, moves);
+		return;
 	}
 
+	unsigned long long key = perft_key(game->hash, depth);
+	if (probe_perft_table(table, key, answers)) {
+		return;
+	}
 
+	unsigned long long nodes[1] = { 0 };
 	num_moves = legal_moves(game, moves);
 
-	if (depth == 1) {
-		answers[0] += num_moves;
-		return;
+	for (i = 0; i < num_moves; i++) {
+		make(game, moves[i], zobrist_numbers);
+		perft_nodes(game, depth - 1, nodes, zobrist_numbers, table);
+		unmake(game);
 	}
 
-	for (i = 0; i < num_moves; i++) {
-		captured = apply(game, moves[i], zobrist_numbers, removed_hash);
-		perft_nodes(game, depth - 1, answers, zobrist_numbers);
-		unapply(game, moves[i], removed_hash[0], captured, previous_castling, previous_ply_counter, previous_last_move);
+	store_perft_table(table, key, nodes);
+	answers[0] += nodes[0];
+}
+
+/*
+Information shared by all the threads running a parallel perft. The work is split up into the positions reached after the first 2 moves,
+which the threads take one at a time from the list until there are none left.
+game: position the perft is being run from
+splits: list of the pairs of moves leading to each of the positions to be counted
+num_splits: number of pairs of moves in splits
+next_split: index of the next pair of moves to be taken by a thread
+count_all: true if running perft_all, false if running perft_nodes
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+struct PerftJob {
+	struct Game* game;
+	unsigned long long* zobrist_numbers;
+	int depth;
+	bool count_all;
+	struct PerftTable* table;
+	unsigned int (*splits)[2];
+	int num_splits;
+	volatile long next_split;
+};
+
+// Information used by each of the threads running a parallel perft, with the answers each thread has counted kept separately until they finish.
+// Last Modified: 18/10/2026
+// Last Modified by: Arkleseisure
+struct PerftWorker {
+	struct PerftJob* job;
+	struct Thread thread;
+	unsigned long long answers[7];
+};
+
+/*
+Function run by each thread in a parallel perft. Each thread has its own copy of the game, so that the threads can make and unmake moves 
+without getting in the way of each other.
+worker: pointer to the PerftWorker struct for this thread.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+void perft_worker(void* worker) {
+	struct PerftWorker* perft_worker = worker;
+	struct PerftJob* job = perft_worker->job;
+	struct Game* game = malloc(sizeof(struct Game));
+	long split;
+
+	memcpy(game, job->game, sizeof(struct Game));
+	for (split = atomic_fetch_increment(&job->next_split); split < job->num_splits; split = atomic_fetch_increment(&job->next_split)) {
+		make(game, job->splits[split][0], job->zobrist_numbers);
+		make(game, job->splits[split][1], job->zobrist_numbers);
+		if (job->count_all) {
+			perft_all(game, perft_worker->answers, job->zobrist_numbers, job->depth - 2, job->table);
+		}
+		else {
+			perft_nodes(game, job->depth - 2, perft_worker->answers, job->zobrist_numbers, job->table);
+		}
+		unmake(game);
+		unmake(game);
+	}
+	free(game);
+}
+
+/*
+Runs perft from a position, using several threads and a hash table if asked to. This is the function called from python.
+INPUTS:
+game: position to run perft from
+depth: depth to run perft to
+count_all: true to count all the statistics counted by perft_all, false to just count the nodes like perft_nodes
+answers: array to put the answers in (7 numbers if count_all is true, 1 if not), which must start as 0.
+zobrist_numbers: random numbers used to define the hashes, see https://www.chessprogramming.org/Zobrist_Hashing
+threads: number of threads to split the work between
+hash_size_mb: size of the perft hash table in megabytes, 0 to not use one.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+*/
+void perft(struct Game* game, int depth, bool count_all, unsigned long long* answers, unsigned long long* zobrist_numbers, int threads, int hash_size_mb) {
+	int i;
+	int j;
+	int num_counts = count_all ? 7 : 1;
+	struct PerftTable table_struct;
+	struct PerftTable* table = NULL;
+
+	// sets up the hash table, with the number of entries being the largest power of 2 which fits into the size given
+	if (hash_size_mb > 0) {
+		unsigned long long num_entries = 1;
+		while (2 * num_entries * (num_counts + 1) * sizeof(unsigned long long) <= (unsigned long long)hash_size_mb << 20) {
+			num_entries *= 2;
+		}
+		table_struct.entries = calloc(num_entries * (num_counts + 1), sizeof(unsigned long long));
+		table_struct.mask = num_entries - 1;
+		table_struct.num_counts = num_counts;
+		if (table_struct.entries != NULL) {
+			table = &table_struct;
+		}
+	}
+
+	// splitting the work up is only worth it if there are enough moves to be made after the first 2. It needs a list of the pairs of moves the
+	// threads take their work from and a worker for each thread, and if the memory for these can't be found, the work isn't split up (as with the table).
+	unsigned int (*splits)[2] = NULL;
+	struct PerftWorker* workers = NULL;
+	if (threads > 1 && depth >= 3) {
+		splits = malloc(220 * 220 * sizeof(unsigned int[2]));
+		workers = calloc(threads, sizeof(struct PerftWorker));
+		if (splits == NULL || workers == NULL) {
+			free(splits);
+			free(workers);
+			workers = NULL;
+		}
+	}
+
+	if (workers == NULL) {
+		if (count_all) {
+			perft_all(game, answers, zobrist_numbers, depth, table);
+		}
+		else if (depth > 0) {
+			perft_nodes(game, depth, answers, zobrist_numbers, table);
+		}
+		else {
+			answers[0] = 1;
+		}
+	}
+	else {
+		// makes the list of the pairs of moves the threads will take their work from
+		unsigned int first_moves[220];
+		unsigned int second_moves[220];
+		int num_first_moves = legal_moves(game, first_moves);
+		int num_second_moves;
+		struct PerftJob job = { .game = game, .zobrist_numbers = zobrist_numbers, .depth = depth, .count_all = count_all, .table = table, 
+			.splits = splits, .num_splits = 0, .next_split = 0 };
+		for (i = 0; i < num_first_moves; i++) {
+			make(game, first_moves[i], zobrist_numbers);
+			num_second_moves = legal_moves(game, second_moves);
+			for (j = 0; j < num_second_moves; j++) {
+				job.splits[job.num_splits][0] = first_moves[i];
+				job.splits[job.num_splits][1] = second_moves[j];
+				job.num_splits++;
+			}
+			unmake(game);
+		}
+
+		// runs the threads, with this thread doing the work of the first worker while the others run
+		for (i = 0; i < threads; i++) {
+			workers[i].job = &job;
+		}
+		int threads_started = 1;
+		while (threads_started < threads && start_thread(&workers[threads_started].thread, perft_worker, &workers[threads_started])) {
+			threads_started++;
+		}
+		perft_worker(&workers[0]);
+		for (i = 1; i < threads_started; i++) {
+			join_thread(&workers[i].thread);
+		}
+
+		for (i = 0; i < threads_started; i++) {
+			for (j = 0; j < num_counts; j++) {
+				answers[j] += workers[i].answers[j];
+			}
+		}
+		free(workers);
+		free(job.splits);
+	}
+
+	if (table != NULL) {
+		free(table->entries);
 	}
 }
@@ -28,11 +28,8 @@ if __name__ == "__main__":
 Things to do:
 -Tablebase
 -Parallel search
--Magic bitboards
--Stop clearing transposition table after each move
 -Pawn structure
 -Killer move    
--Null move pruning
 
 ------------------------------------
 Perft results: Previous ai/new ai
@@ -0,0 +1,166 @@
+import argparse
+import json
+import os
+import sys
+import time
+from c_interface import setup_game, perft, perft_divide
+
+'''
+Perft suite used to check the game mechanics against a file of positions with known answers and to benchmark the move generation.
+Unlike test_game_mechanics and speed_test in play_game, this doesn't import pygame, so it can be run from the command line on its own, e.g:
+    python perft_suite.py perft_suite.epd --depth 5 --threads 4 --json results.json
+The results can be written to a json file so that the speed can be compared between different versions of game_mechanics.
+More info about perft: https://www.chessprogramming.org/Perft
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+
+default_epd_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'perft_suite.epd')
+
+
+'''
+Reads an epd file of perft positions. Each line holds a fen string (the move counters can be left out), followed by operations separated by
+semicolons: 'D<depth> <nodes>' gives the number of nodes expected at that depth, and 'id "<name>"' gives the name of the position, e.g:
+rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1 ;D1 20 ;D2 400 ;id "Initial position"
+INPUTS:
+epd_path: path of the epd file
+
+OUTPUTS:
+positions: list of dictionaries holding the 'fen', 'id' and 'expected' nodes (a dictionary from depth to nodes) for each position.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+def read_epd(epd_path):
+    positions = []
+    with open(epd_path) as epd_file:
+        for line_number, line in enumerate(epd_file):
+            line = line.strip()
+            if line == '' or line.startswith('#'):
+                continue
+
+            operations = line.split(';')
+            fen = operations[0].strip()
+            # epd positions only hold the first 4 fields of the fen string, so the move counters are added if they aren't there
+            if len(fen.split()) == 4:
+                fen += ' 0 1'
+            position = {'fen': fen, 'id': 'Position ' + str(line_number + 1), 'expected': {}}
+
+            for operation in operations[1:]:
+                operation = operation.strip()
+                if operation.startswith('D'):
+                    depth, nodes = operation[1:].split()
+                    position['expected'][int(depth)] = int(nodes)
+                elif operation.startswith('id'):
+                    position['id'] = operation[2:].strip().strip('"')
+            positions.append(position)
+    return positions
+
+
+'''
+Runs perft on one position at each of the depths with a known answer, up to max_depth.
+If an answer is wrong (or if always_divide is True), the counts for each move at that depth are added to the results, so that the move
+leading to the mistake can be found by comparing them to the counts given by another engine.
+INPUTS:
+position: dictionary holding the 'fen', 'id' and 'expected' nodes for the position (see read_epd)
+max_depth: deepest depth to run perft to
+threads: number of threads used by perft
+hash_size: size of the perft hash table in MB (this makes the speeds much higher than the real speed of the move generation)
+always_divide: whether to add the counts for each move at the deepest depth even when the answer is right.
+
+OUTPUTS:
+results: list of dictionaries holding the results at each depth.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+def run_position(position, max_depth, threads, hash_size, always_divide):
+    game, zobrist_numbers = setup_game(position['fen'])
+    depths = [depth for depth in sorted(position['expected']) if depth <= max_depth]
+    results = []
+
+    for depth in depths:
+        answer_dict, time_taken = perft(game, zobrist_numbers, depth, type='nodes', threads=threads, hash_size=hash_size)
+        result = {'depth': depth, 'nodes': answer_dict['Nodes'], 'expected': position['expected'][depth],
+                  'passed': answer_dict['Nodes'] == position['expected'][depth], 'time': time_taken,
+                  'nodes_per_second': answer_dict['Nodes'] / time_taken if time_taken > 0 else None}
+
+        if not result['passed'] or (always_divide and depth == depths[-1]):
+            divide, divide_time = perft_divide(game, zobrist_numbers, depth, type='nodes', threads=threads, hash_size=hash_size)
+            result['divide'] = {move: answers['Nodes'] for move, answers in divide}
+        results.append(result)
+    return results
+
+
+'''
+Prints the results for one position in a readable form.
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+def print_results(position, results):
+    print(position['id'] + ':', position['fen'])
+    for result in results:
+        speed = 'too fast to tell' if result['nodes_per_second'] is None else str(round(result['nodes_per_second'])) + ' nodes per second'
+        print('    Depth', result['depth'], 'nodes', result['nodes'], 'ok' if result['passed'] else 'WRONG (expected ' + str(result['expected']) + ')',
+              round(result['time'], 3), 's,', speed)
+        if 'divide' in result:
+            for move in result['divide']:
+                print('        ' + move + ':', result['divide'][move])
+    print()
+
+
+'''
+Runs the whole perft suite, printing the results and optionally writing them to a json file.
+Returns True if all the answers were right.
+INPUTS:
+epd_path: path of the epd file holding the positions
+max_depth: deepest depth to run perft to
+threads, hash_size, always_divide: see run_position
+json_path: path of the json file to write the results to, or None to not write them.
+
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+def run_suite(epd_path=default_epd_path, max_depth=4, threads=1, hash_size=0, always_divide=False, json_path=None):
+    suite_results = []
+    total_nodes = 0
+    total_time = 0
+    all_passed = True
+
+    for position in read_epd(epd_path):
+        results = run_position(position, max_depth, threads, hash_size, always_divide)
+        print_results(position, results)
+        suite_results.append({'id': position['id'], 'fen': position['fen'], 'results': results})
+
+        for result in results:
+            total_nodes += result['nodes']
+            total_time += result['time']
+            all_passed = all_passed and result['passed']
+
+    summary = {'epd': epd_path, 'max_depth': max_depth, 'threads': threads, 'hash_size': hash_size, 'date': time.ctime(time.time()),
+               'passed': all_passed, 'total_nodes': total_nodes, 'total_time': total_time,
+               'nodes_per_second': total_nodes / total_time if total_time > 0 else None, 'positions': suite_results}
+    print('Passed!' if all_passed else 'FAILED')
+    print('Total nodes:', total_nodes, 'Total time:', round(total_time, 3), 's')
+    if summary['nodes_per_second'] is not None:
+        print('Speed:', round(summary['nodes_per_second']), 'nodes per second')
+
+    if json_path is not None:
+        with open(json_path, 'w') as json_file:
+            json.dump(summary, json_file, indent=4)
+    return all_passed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Runs perft on a suite of positions with known answers.')
+    parser.add_argument('epd', nargs='?', default=default_epd_path, help='epd file holding the positions and expected node counts')
+    parser.add_argument('--depth', type=int, default=4, help='deepest depth to run perft to')
+    parser.add_argument('--threads', type=int, default=1, help='number of threads used by perft')
+    parser.add_argument('--hash', type=int, default=0, help='size of the perft hash table in MB (not to be used when benchmarking)')
+    parser.add_argument('--divide', action='store_true', help='show the counts for each move at the deepest depth, even when they are right')
+    parser.add_argument('--json', default=None, help='json file to write the results to')
+    args = parser.parse_args()
+
+    passed = run_suite(args.epd, args.depth, args.threads, args.hash, args.divide, args.json)
+    sys.exit(0 if passed else 1)
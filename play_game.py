@@ -11,17 +11,24 @@ from Bits_and_pieces import *
 initial_pos_fen = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
 absolute_path = os.path.dirname(os.path.abspath(__file__))
 ai_time = 5
+# size of the engine's transposition table in MB
+ai_hash_size = 256
+# whether the engine thinks about its next move while the human is thinking about theirs (see start_pondering in c_interface)
+ai_ponder = True
 
 # wandb.init('Gotham-Chess-bot')
 
 '''
 Plays through a full game of chess.
-Last Modified: 17/9/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 '''
 def play_game(colour, other_player):
     # Initializes game
     background, buttons, game, zobrist_numbers = initialize_game(perspective=colour)
+    # sets the size of the engine's transposition table and clears it, as it is otherwise kept from one move to the next
+    set_hash_size(ai_hash_size)
+    new_game()
     game_over = False
     exit = False
 
@@ -30,19 +37,32 @@ def play_game(colour, other_player):
 
     value = 0
     depth = 0
+    # reply the engine expects from the human, which it is searching while waiting for their move, or None if it isn't pondering
+    ponder_move = None
     # Main game loop
     while not game_over:
         # Draws the board
-        draw_board(colour, background, buttons, game.board, game.last_move, current_move=0)
+        draw_board(colour, background, buttons, game.board, unpack_move(game.last_move), current_move=0)
 
         # Gets legal move from player or computer
         moves = legal_moves(game)
         if other_player == 'human' or (other_player == 'ai' and game.to_play == colour):
             move, exit = get_human_move(game, background, buttons, colour, moves, value, depth)
         else:
-            value, depth, nodes, move = get_engine_move(game, zobrist_numbers, ai_time, book)
+            # if the human played the move the engine was pondering on, it carries on with that search (unless the position is in the book),
+            # otherwise the search is stopped and a new one is started.
+            engine_move = None
+            if ponder_move is not None and ponder_move == move and game.hash not in book:
+                engine_move = ponder_hit(game, ai_time)
+            else:
+                stop_pondering()
+            if engine_move is None:
+                engine_move = get_engine_move(game, zobrist_numbers, ai_time, book)
+            value, depth, nodes, move = engine_move
+            ponder_move = None
 
         if exit:
+            stop_pondering()
             return
 
         # Applies the move
@@ -56,9 +76,15 @@ def play_game(colour, other_player):
             game_over = True
             result = (1 - game.to_play) * 2
 
+        # once the engine has moved, it starts thinking about its next move while the human thinks about theirs
+        if other_player == 'ai' and ai_ponder and game.to_play == colour and not game_over:
+            ponder_move = start_pondering(game, zobrist_numbers)
+
+    stop_pondering()
+
     # draws the result then waits for the user to click to exit
     # Draws the board
-    draw_board(colour, background, buttons, game.board, game.last_move, current_move=0)
+    draw_board(colour, background, buttons, game.board, unpack_move(game.last_move), current_move=0)
     draw_result(result)
     get_square(colour, buttons)
 
@@ -69,7 +95,7 @@ Last Modified by: Arkleseisure
 '''
 def get_human_move(game, background, buttons, colour, legal_moves, value=0, depth=0):
     # draws the board to the screen.
-    draw_board(colour, background, buttons, game.board, game.last_move, current_move=0)
+    draw_board(colour, background, buttons, game.board, unpack_move(game.last_move), current_move=0)
     if depth != 0:
         print_engine_eval(1, round(value, 2), depth)
 
@@ -83,7 +109,7 @@ def get_human_move(game, background, buttons, colour, legal_moves, value=0, dept
     # loops until the human has entered a valid move, at which point the program is quit.
     while True:
         # draws the board
-        draw_board(colour, background, buttons, game.board, game.last_move, current_move=move_from)
+        draw_board(colour, background, buttons, game.board, unpack_move(game.last_move), current_move=move_from)
         if depth != 0:
             print_engine_eval(1, round(value, 2), depth)
 
@@ -146,11 +172,9 @@ def get_human_move(game, background, buttons, colour, legal_moves, value=0, dept
 
 
 # initializes items required for playing the game.
-# Last Modified: 15/9/2021
+# Last Modified: 18/10/2026
 # Last Modified by: Arkleseisure
 def initialize_game(fen=initial_pos_fen, perspective=0, using_pygame=True):
-    fen_list = fen.split()
-
     '''
     Creates bitboards for each piece type... The positions of the pieces are each represented by a single unsigned 8 byte integer
     which in binary would spell out the board were we to remove any other piece type, e.g white pawns in the starting position are represented by:
@@ -188,36 +212,13 @@ def initialize_game(fen=initial_pos_fen, perspective=0, using_pygame=True):
     This can be calculated as 8 * row + file and hence the bitboard for each piece can be easily calculated from its coordinates on the board.
     At the time of writing I haven't used this yet, but I may and you may find it useful.
     '''
-    game = Game()
-
-    get_board(game, fen_list[0])
-
-    
-    # The piece_list is an array of 32 piece structures, each containing 3 variables: 
-    # pos: position as a bitboard
-    # type: number from 0-11 referring to the type of piece as explained above
-    # captured: boolean saying whether the piece has been captured yet or not
-    initiate_piece_list(game)
-
-    # player to move, 0 if white to play, 1 if black to play
-    game.to_play = 0 if fen_list[1] == 'w' else 1
+    # the Game struct is set up from the fen string by setup_game in c_interface, so that it can also be done without pygame
+    game, zobrist_numbers = setup_game(fen)
 
     # initializes the pygame sprite group used to display the background (i.e
     # the board and anything around it)
     if using_pygame:
         background, buttons = initialize_pygame_stuff(perspective)
-    
-    # legality of castling, represented by a four bit number,
-    # kingside/queenside for black, then kingside/queenside for white
-    game.castling = 0
-    if 'Q' in fen_list[2]:
-        game.castling += 1
-    if 'K' in fen_list[2]:
-        game.castling += 2
-    if 'q' in fen_list[2]:
-        game.castling += 4
-    if 'k' in fen_list[2]:
-        game.castling += 8
 
     '''
     Moves are represented by two bitboards and a flag. One bitboard represents the original location of the piece, 
@@ -248,20 +249,11 @@ def initialize_game(fen=initial_pos_fen, perspective=0, using_pygame=True):
 
     In front of this are 7 bits referring to the index of the piece in the piece list.
 
+    The c code packs the two bitboards down to the 6 bit numbers of their squares, with the flag above them, so that each move fits in 32 bits.
+    pack_move and unpack_move (in Bits_and_pieces) convert between the two forms.
+
     This also helps make moves easier to reverse, as all the information about the move is easily retrievable.
     '''
-    get_last_move(game, fen_list[3])
-    
-    # initiates the zobrist hashes and zobrist numbers, used to speed up
-    # indexing of positions, more info here:
-    # https://www.chessprogramming.org/Zobrist_Hashing
-    zobrist_numbers = generate_zobrist_stuff(game)
-
-    # half move counter, used to find draws by 50 move rule
-    game.ply_counter = int(fen_list[4])
-
-    # value of the position, as evaluated by the engine.
-    game.value = 0
 
     if using_pygame:
         return background, buttons, game, zobrist_numbers
@@ -271,15 +263,21 @@ def initialize_game(fen=initial_pos_fen, perspective=0, using_pygame=True):
 Function used to test the speed and functionality of the rules. 
 Mainly uses a perft function: https://www.chessprogramming.org/Perft
 Answers are taken from this article: https://www.chessprogramming.org/Perft_Results
-Perft searches are done to depth 4 to save time
+Perft searches are done to depth 4 by default to save time, but deeper searches can be checked quickly by splitting the work between threads
+and using the perft hash table (answers are only compared at the depths for which they are known).
 The 5 positions looked at are the initial position, kiwipete (position specifically crafted for perft functions), 
 a rook endgame position to test the rules closer to the end of the game, and then two positions which are mirrored to check for asymmetry
 between the rules for black and white
 
-Last Modified: 30/8/2021
+INPUTS:
+max_depth: depth to run the perft searches to
+threads: number of threads used by the perft function
+hash_size: size of the perft hash table in MB (0 to not use one)
+
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 '''
-def test_game_mechanics():
+def test_game_mechanics(max_depth=4, threads=1, hash_size=0):
     # declares the fens of the positions, as well as the answers which correctly coded rules should give.
     fen_list = [initial_pos_fen, 
                 'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1', 
@@ -293,49 +291,52 @@ def test_game_mechanics():
                   [6, 264, 9467, 422333, 15833292, 706045033],
                   [6, 264, 9467, 422333, 15833292, 706045033]],
               'Captures': [[0, 0, 34, 1576, 82719, 2812008, 108329926, 3523740106],
-                  [8, 351, 17102, 757163],
-                  [1, 14, 209, 3348],
-                  [0, 87, 1021, 131393],
-                  [0, 87, 1021, 131393]],
+                  [8, 351, 17102, 757163, 35043416],
+                  [1, 14, 209, 3348, 52051, 940350],
+                  [0, 87, 1021, 131393, 2046173, 210369132],
+                  [0, 87, 1021, 131393, 2046173, 210369132]],
               'En passant': [[0, 0, 0, 0, 258, 5248, 319617, 7187977],
-                  [0, 1, 45, 1929],
-                  [0, 0, 2, 123],
-                  [0, 0, 4, 0],
-                  [0, 0, 4, 0]],
+                  [0, 1, 45, 1929, 73365],
+                  [0, 0, 2, 123, 1165, 33325],
+                  [0, 0, 4, 0, 6512, 212],
+                  [0, 0, 4, 0, 6512, 212]],
                'Castling': [[0, 0, 0, 0, 0, 0, 883453, 23605205],
-                  [2, 91, 3162, 128013],
-                  [0, 0, 0, 0],
-                  [0, 6, 0, 7795],
-                  [0, 6, 0, 7795]],
+                  [2, 91, 3162, 128013, 4993637],
+                  [0, 0, 0, 0, 0, 0],
+                  [0, 6, 0, 7795, 0, 10882006],
+                  [0, 6, 0, 7795, 0, 10882006]],
                'Promotion': [[0, 0, 0, 0, 0, 0, 0, 0],
-                  [0, 0, 0, 15172],
-                  [0, 0, 0, 0],
-                  [0, 48, 120, 60032],
-                  [0, 48, 120, 60032]],
+                  [0, 0, 0, 15172, 8392],
+                  [0, 0, 0, 0, 0, 7552],
+                  [0, 48, 120, 60032, 329464, 81102984],
+                  [0, 48, 120, 60032, 329464, 81102984]],
                'Checks': [[0, 0, 12, 469, 27351, 809099, 33103848, 968981593],
-                  [0, 3, 993, 25523],
-                  [2, 10, 267, 1680],
-                  [0, 10, 38, 15492],
-                  [0, 10, 38, 15492]],
+                  [0, 3, 993, 25523, 3309887],
+                  [2, 10, 267, 1680, 52950, 452473],
+                  [0, 10, 38, 15492, 200568, 26973664],
+                  [0, 10, 38, 15492, 200568, 26973664]],
                'Checkmates': [[0, 0, 0, 8, 347, 10828, 435767, 9852036],
-                  [0, 0, 1, 43],
-                  [0, 0, 0, 17],
-                  [0, 0, 22, 5],
-                  [0, 0, 22, 5]]
+                  [0, 0, 1, 43, 30171],
+                  [0, 0, 0, 17, 0, 2733],
+                  [0, 0, 22, 5, 50562, 81076],
+                  [0, 0, 22, 5, 50562, 81076]]
     }
 
     all_tests_passed = True
     for i in range(len(fen_list)):
         background, buttons, game, zobrist_numbers = initialize_game(fen_list[i])
-        draw_board(game.to_play, background, buttons, game.board, game.last_move, current_move=0)
+        draw_board(game.to_play, background, buttons, game.board, unpack_move(game.last_move), current_move=0)
         print(fen_names[i])
         passed = True
-        for j in range(4):
+        for j in range(max_depth):
             print('Depth:', j + 1)
-            answer_dict, time_taken = perft(game, zobrist_numbers, depth=j + 1, type='all')
+            answer_dict, time_taken = perft(game, zobrist_numbers, depth=j + 1, type='all', threads=threads, hash_size=hash_size)
 
             for key in answer_dict:
                 print(key)
+                if j >= len(answers[key][i]):
+                    print('Answer given:', answer_dict[key], 'Actual answer: unknown')
+                    continue
                 if answers[key][i][j] != answer_dict[key]:
                     passed = False
                 print('Answer given:', answer_dict[key], 'Actual answer:', answers[key][i][j])
@@ -545,12 +546,14 @@ def test_draws():
 
 
 '''
-Tests the speed of the apply/unapply and legal_moves functions, using perft (see c_interface for more info)
+Tests the speed of the make/unmake and legal_moves functions, using perft (see c_interface for more info)
 Tests the perft function at different depths as it often works at different speeds at different depths due to differing ratios of things it has to do.
-Last Modified: 16/9/2021
+The perft hash table is never used here, as it would hide the speed of the move generation.
+threads: number of threads used by the perft function
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 '''
-def speed_test():
+def speed_test(threads=1):
     print('Speed test started')
     start_depth = 3
     finish_depth = 5
@@ -562,7 +565,7 @@ def speed_test():
         print('Started depth', depth, 'at', time.ctime(time.time()))
         while time.time() - start_time < 600:
             game, zobrist_numbers = initialize_game(using_pygame=False)
-            answer_dict, time_taken = perft(game, zobrist_numbers, depth=depth, type='nodes')
+            answer_dict, time_taken = perft(game, zobrist_numbers, depth=depth, type='nodes', threads=threads)
             speeds[depth - start_depth].append(answer_dict['Nodes']/time_taken)
             trials += 1
 
@@ -576,7 +579,7 @@ def speed_test():
         
 '''
 Plays a game between 2 engines to test their strength
-Last Modified: 19/9/2021
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 '''
 def play_test_game(engine_1, engine_2, book, drawboard=True):
@@ -585,6 +588,9 @@ def play_test_game(engine_1, engine_2, book, drawboard=True):
         background, buttons, game, zobrist_numbers = initialize_game()
     else:
         game, zobrist_numbers = initialize_game(using_pygame=False)
+    # clears the transposition tables of both engines so that nothing is kept from their previous games
+    new_game(engine_1['code'])
+    new_game(engine_2['code'])
     game_over = False
     white_value = 0
     black_value = 0
@@ -603,7 +609,7 @@ def play_test_game(engine_1, engine_2, book, drawboard=True):
 
 		# Draws the board
         if drawboard:
-            draw_board(0, background, buttons, game.board, game.last_move, current_move=0)
+            draw_board(0, background, buttons, game.board, unpack_move(game.last_move), current_move=0)
 
             # prints the value evaluated by each engine to the screen:
             print_engine_eval(0, round(white_value, 2), white_depth)
@@ -612,8 +618,10 @@ def play_test_game(engine_1, engine_2, book, drawboard=True):
 
         start_time = time.time()
         if game.to_play == 0:
-            white_value, white_depth, nodes, move = get_engine_move(game, zobrist_numbers, engine_1['time'], book, engine_1['code'])
+            stats = []
+            white_value, white_depth, nodes, move = get_engine_move(game, zobrist_numbers, engine_1['time'], book, engine_1['code'], stats=stats)
             time_taken = time.time() - start_time
+            add_search_stats(engine_1, stats)
             if nodes != 0 and time_taken != 0:
                 engine_1['speeds'].append(nodes/time_taken)
                 if white_depth < 50:
@@ -623,8 +631,10 @@ def play_test_game(engine_1, engine_2, book, drawboard=True):
             else:
                 zeros_count = 0
         else:
-            black_value, black_depth, nodes, move = get_engine_move(game, zobrist_numbers, engine_2['time'], book, engine_2['code'])
+            stats = []
+            black_value, black_depth, nodes, move = get_engine_move(game, zobrist_numbers, engine_2['time'], book, engine_2['code'], stats=stats)
             time_taken = time.time() - start_time
+            add_search_stats(engine_2, stats)
             if nodes != 0 and time_taken != 0:
                 engine_2['speeds'].append(nodes/time_taken)
                 if black_depth < 50:
@@ -700,8 +710,48 @@ def run_round_robin(engines, book, draw_board=True):
                 engines[j]['draws'][i] += 1
 
 '''
-Given a list of engines in a round robin tournament, prints their scores out
-Last Modified: 19/9/2021
+Returns the totals used to keep track of the search statistics of an engine over a match (see add_search_stats).
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+def new_search_stats():
+    return {'nodes': 0, 'quiescence nodes': 0, 'hash probes': 0, 'hash hits': 0, 'beta cutoffs': 0, 'first move cutoffs': 0, 
+            'branching factor total': 0, 'branching factors': 0}
+
+'''
+Adds the statistics for each depth of one search (see get_search_stats in c_interface) to the totals kept for an engine.
+Only the depths which were completed are counted, as the ones cut short by the time would make the branching factor look smaller than it is.
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+def add_search_stats(engine, stats):
+    totals = engine['search stats']
+    for depth_stats in stats:
+        if not depth_stats['completed']:
+            continue
+        for key in ['nodes', 'quiescence nodes', 'hash probes', 'hash hits', 'beta cutoffs', 'first move cutoffs']:
+            totals[key] += depth_stats[key]
+        if depth_stats['branching factor'] is not None:
+            totals['branching factor total'] += depth_stats['branching factor']
+            totals['branching factors'] += 1
+
+'''
+Works out the average rates from the search statistics of an engine: the branching factor, hash hit rate, first move cutoff rate and 
+quiescence share (see get_search_stats in c_interface). Returns None if the engine hasn't given any statistics.
+Last Modified: 18/10/2026
+Last Modified by: Arkleseisure
+'''
+def summarise_search_stats(totals):
+    if totals['nodes'] == 0:
+        return None
+    return {'branching factor': totals['branching factor total'] / max(totals['branching factors'], 1),
+            'hash hit rate': totals['hash hits'] / max(totals['hash probes'], 1),
+            'first move cutoff rate': totals['first move cutoffs'] / max(totals['beta cutoffs'], 1),
+            'quiescence share': totals['quiescence nodes'] / totals['nodes']}
+
+'''
+Given a list of engines in a round robin tournament, prints their scores out, along with their speeds, depths and search statistics.
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 '''
 def print_current_scores(engines, test_file='Test results'):
@@ -745,7 +795,15 @@ def print_current_scores(engines, test_file='Test results'):
             print('Depth:', round(np.average(engine['depth']), 2), '+-', depth_error, end=' ')
             
             f.write(' Speed: ' + str(round(np.average(engine['speeds']))) + ' +- ' + str(speed_error))
-            f.write(' Depth: ' + str(round(np.average(engine['depth']), 2)) + '+-' + str(depth_error) + '\n')
+            f.write(' Depth: ' + str(round(np.average(engine['depth']), 2)) + '+-' + str(depth_error))
+
+            # records the search statistics, for engines which give them
+            search_stats = summarise_search_stats(engine['search stats'])
+            if search_stats is not None:
+                for key in search_stats:
+                    print(key.capitalize() + ':', round(search_stats[key], 3), end=' ')
+                    f.write(' ' + key.capitalize() + ': ' + str(round(search_stats[key], 3)))
+            f.write('\n')
 
         except ValueError:
             print('oops', end=' ')
@@ -931,7 +989,7 @@ def test_engines(engine_names, times, elos, draw_board=True, num_games=0, print_
     engines = []
     for i in range(len(engine_names)):
         for j in range(len(times)):
-            engines.append({'name': engine_names[i], 'time': times[j], 'scores': [], 'draws': [], 'matches played': [], 'calculated elo': 0, 'elo difference': [], 'elo error': [], 'total elo error': 0, 'nodes': 0, 'total time': 0, 'speeds': [], 'depth': []})
+            engines.append({'name': engine_names[i], 'time': times[j], 'scores': [], 'draws': [], 'matches played': [], 'calculated elo': 0, 'elo difference': [], 'elo error': [], 'total elo error': 0, 'nodes': 0, 'total time': 0, 'speeds': [], 'depth': [], 'search stats': new_search_stats()})
 
     for i in range(len(engines)):
         if i < len(elos):
@@ -1004,13 +1062,14 @@ def test_engine(other_engines, test_engine, times, elos, elo_errors, book, draw_
     start_time = time.time()
     main_engines = []
     for i in range(len(times)):
-        main_engines.append({'name': test_engine, 'time': times[i], 'scores': [], 'draws': [], 'matches played': [], 'calculated elo': 0, 'elo difference': [], 'elo error': [], 'total elo error': 0, 'nodes': 0, 'total time': 0, 'speeds': [], 'depth': [], 'elo known': False})
+        main_engines.append({'name': test_engine, 'time': times[i], 'scores': [], 'draws': [], 'matches played': [], 'calculated elo': 0, 'elo difference': [], 'elo error': [], 'total elo error': 0, 'nodes': 0, 'total time': 0, 'speeds': [], 'depth': [], 'search stats': new_search_stats(), 'elo known': False})
 
     for i in range(len(other_engines)):
         other_engines[i]['elo known'] = True
         other_engines[i]['elo'] = elos[i]
         other_engines[i]['speeds'] = []
         other_engines[i]['depth'] = []
+        other_engines[i]['search stats'] = new_search_stats()
 
         for j in range(len(times)):
             main_engines[j]['scores'].append(0)
@@ -1060,10 +1119,12 @@ def test_engine(other_engines, test_engine, times, elos, elo_errors, book, draw_
 '''
 Gets the engine moves in a variety of positions... Made to be executed with the engine itself printing things out so that its output 
 can be compared with other engines.
-Last Modified: 02/01/2022
+With max_depth or max_nodes, each position is searched to that depth or number of nodes instead of for time_allowed seconds, which gives the
+same results on every run and every machine, so that the nodes and depths of different engines can be compared exactly.
+Last Modified: 18/10/2026
 Last Modified by: Arkleseisure
 '''
-def test_engine_on_pos(engine_name):
+def test_engine_on_pos(engine_name, max_depth=None, max_nodes=None):
     fen_list = [initial_pos_fen, 
             'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1', 
             '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 0', 
@@ -1072,10 +1133,17 @@ def test_engine_on_pos(engine_name):
     
     fen_names = ['Initial position', 'Kiwipete', 'Rook endgame', 'White to play', 'Black to play']
     time_allowed = 20
+    if max_depth is not None or max_nodes is not None:
+        time_allowed = 0
+    engine_code = get_engine_code(engine_name)
     for i in range(len(fen_list)):
         print('\nNext fen:', fen_names[i])
         game, zobrist_numbers = initialize_game(fen_list[i], using_pygame=False)
-        value, depth, nodes, move = get_engine_move(game, zobrist_numbers, time_allowed, book={}, engine_code=get_engine_code(engine_name))
+        # each position is searched with an empty transposition table, so that the results don't depend on the positions before it
+        new_game(engine_code)
+        value, depth, nodes, move = get_engine_move(game, zobrist_numbers, time_allowed, book={}, engine_code=engine_code, max_depth=max_depth, 
+                                                    max_nodes=max_nodes)
+        print('Move:', convert_to_text(move[0]) + convert_to_text(move[1]), 'Value:', round(value, 2), 'Depth:', depth, 'Nodes:', nodes)
 
 '''
 Returns an opening book from the text file 'Opening book' created with create_opening_book()
@@ -1259,7 +1327,7 @@ def do_test_stuff():
         background, buttons, game, zobrist_numbers = initialize_game()
         for item in game_moves:
             print('applying move', item)
-            draw_board(0, background, buttons, game.board, game.last_move, current_move=0)
+            draw_board(0, background, buttons, game.board, unpack_move(game.last_move), current_move=0)
             # time.sleep(1)
         print('game finished')
 